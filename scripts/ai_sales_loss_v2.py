@@ -5,6 +5,12 @@ import os
 import math
 from datetime import datetime, timedelta
 from config_loader import get_season_end_date, get_sell_through_threshold
+from dtype_policy import apply_dtype_policy, report_memory
+from sku_events import detect_sku_events
+from demand_forecasters import (BASE_WEEKS, TARGET_END_SALES, DecayForecaster, build_panel,
+                                finalize_predictions, opportunity_loss, base_velocity)
+from dashboard_overlay import OVERLAY_COLUMNS, apply_overlay
+from artifact_io import write_json_atomic
 
 # ============================================
 # 0. 설정 및 상수
@@ -14,7 +20,6 @@ ORIGINAL_DATA_FILE = '../data/weekly_dx25s.xlsx'  # 원본 시계열 데이터 
 TARGET_FILE = '../output/25S_TimeSeries_Analysis_Result.xlsx'  # 결과 엑셀 파일명 (같은 파일에 추가)
 JSON_FILE = '../public/dashboard_data.json'  # 대시보드 데이터 파일명
 SEASON_END_DATE = get_season_end_date()  # 시즌 종료일
-TARGET_END_SALES = 5  # 시즌 종료 시점 목표 판매량 (수렴값, 기초체력 기준으로도 사용)
 SELL_THROUGH_THRESHOLD = get_sell_through_threshold()  # 상업적 결품 판매율 기준
 
 print("=" * 60)
@@ -37,6 +42,7 @@ def extract_loss_part_codes():
         # 엑셀 파일 로드
         df = pd.read_excel(ANALYSIS_RESULT_FILE)
         print(f"  * 파일 로드 완료: {len(df)}행")
+        report_memory(df, 'STEP3 분석 결과 로드')
 
         # AI_진단 컬럼 확인
         if 'AI_진단' not in df.columns:
@@ -119,13 +125,13 @@ def load_weekly_data(part_codes):
             print(f"  [오류] 필터링 후 데이터가 없습니다.")
             return None
         
-        # 날짜 변환
-        if 'END_DT' in df.columns:
-            df['END_DT'] = pd.to_datetime(df['END_DT'])
-        else:
+        if 'END_DT' not in df.columns:
             print(f"  [오류] END_DT 컬럼을 찾을 수 없습니다.")
             return None
-        
+
+        # dtype 정책 적용 (날짜 변환, 차원 category, 수량 int32)
+        df = apply_dtype_policy(df, stage='STEP3 주차별 데이터')
+
         # 정렬
         df = df.sort_values(['PART_CD', 'COLOR_CD', 'END_DT'])
         
@@ -141,227 +147,103 @@ def load_weekly_data(part_codes):
         return None
 
 # ============================================
-# 3. 상업적 결품 시점 감지 (판매율 70% 도달)
+# 3. 전체 분석 실행
 # ============================================
-def detect_commercial_stockout(group):
+def build_part_dimension(part_info):
     """
-    주차별 판매율을 추적하여 판매율 70% 도달한 주차를 상업적 결품시점으로 간주
+    PART_CD → ITEM_NM 스타일 마스터 차원 (품번당 첫 번째 행 기준)
     """
-    # 날짜순 정렬
-    group = group.sort_values('END_DT').reset_index(drop=True)
-    
-    # 누적 입고 및 판매 계산
-    if 'STOR_QTY_KR' not in group.columns or 'SALE_QTY_CNS' not in group.columns:
-        return None
-    
-    cum_in = group['STOR_QTY_KR'].cumsum()
-    cum_sale = group['SALE_QTY_CNS'].cumsum()
-    
-    # 판매율 계산 (0 나누기 방지)
-    sell_through = cum_sale.div(cum_in).replace([np.inf, -np.inf], 0).fillna(0)
-    
-    # 판매율 70% 도달 시점 찾기
-    stockout_mask = sell_through >= SELL_THROUGH_THRESHOLD
-    stockout_rows = group[stockout_mask]
-    
-    if len(stockout_rows) == 0:
-        return None
-    
-    # 첫 번째로 70% 도달한 시점
-    stockout_idx = stockout_rows.index[0]
-    stockout_date = group.loc[stockout_idx, 'END_DT']
-    
-    return stockout_idx, stockout_date
+    if part_info is None or part_info.empty:
+        return pd.Series(dtype=object)
+    dim = part_info.drop_duplicates('PART_CD').set_index('PART_CD')['ITEM_NM']
+    dim.index = dim.index.astype(str)
+    return dim
 
-# ============================================
-# 4. 기회비용 계산 (기획서 기반)
-# ============================================
-def calculate_opportunity_loss(group, stockout_idx):
-    """
-    기획서(STEP3_AI수요예측.md)에 따라 기회비용 계산
-    
-    공식:
-    - Base Velocity (P_avg): 결품 직전 4주간 평균 판매량
-    - 감쇠율 (r): r = (10 / P_avg)^(1/W)
-    - 기회비용: max(0, 예측 - 실제)
-    """
-    try:
-        # 1. Base Velocity (P_avg) 산출 - 결품 직전 4주간 평균
-        if stockout_idx < 4:
-            # 데이터가 부족하면 None 반환
-            return None
-        
-        base_sales = group['SALE_QTY_CNS'].iloc[stockout_idx-4:stockout_idx]
-        p_avg = base_sales.mean()
-        
-        # 기초체력이 목표치(10) 이하면 분석 제외
-        if p_avg <= TARGET_END_SALES:
-            return None
-        
-        # 2. 잔여 기간 (W) 산출
-        stockout_date = group['END_DT'].iloc[stockout_idx]
-        if stockout_date >= SEASON_END_DATE:
-            return None
-        
-        days_remaining = (SEASON_END_DATE - stockout_date).days
-        weeks_remaining = days_remaining / 7
-        
-        if weeks_remaining <= 0:
-            return None
-        
-        # 3. 동적 감쇠율 (r) 역산: r = (10 / P_avg)^(1/W)
-        decay_rate = (TARGET_END_SALES / p_avg) ** (1 / weeks_remaining)
-        
-        # 4. 예측 루프 (결품 시점부터 끝까지)
-        results = []
-        current_predicted = p_avg  # 초기값
-        season_end_cutoff = pd.Timestamp('2025-10-30')  # 시즌 마감 기준일
-        
-        for i in range(stockout_idx, len(group)):
-            date = group['END_DT'].iloc[i]
-            actual_sale = group['SALE_QTY_CNS'].iloc[i]
-            
-            # 시즌 마감 이후(10월 30일 이후)는 AI 예측 0으로 설정
-            if date > season_end_cutoff:
-                predicted_int = 0
-                loss = 0
-            else:
-                # 예측값 갱신 (감쇠 적용)
-                current_predicted = current_predicted * decay_rate
-                
-                # 판매량은 정수여야 함
-                predicted_int = int(round(current_predicted))
-                
-                # 기회비용 = max(0, 예측 - 실제)
-                loss = max(0, predicted_int - actual_sale)
-            
-            results.append({
-                'date': date,
-                'actual_sale': actual_sale,
-                'predicted_sale': predicted_int,
-                'loss': loss
-            })
-        
-        return pd.DataFrame(results)
-        
-    except Exception as e:
-        print(f"    [오류] 기회비용 계산 실패: {str(e)}")
-        return None
 
-# ============================================
-# 5. 전체 분석 실행
-# ============================================
 def run_analysis(weekly_df, part_info):
     """
     전체 품번에 대해 기회비용 분석 수행
+    - 결품 감지(detect_sku_events) → (SKU, 주) 패널 → 감쇠 모델 일괄 예측
+    - ITEM_NM은 PART_CD 차원 테이블에서 한 번에 매핑
     """
     print("[3단계] 기회비용 분석 수행 중...")
-    
-    results = []
-    dashboard_updates = {}
-    
-    # PART_CD, COLOR_CD로 그룹화
-    grouped = weekly_df.groupby(['PART_CD', 'COLOR_CD'])
-    
-    count = 0
-    loss_count = 0
-    skipped_short = 0
-    no_stockout = 0
-    low_velocity = 0
-    past_season_end = 0
-    zero_loss = 0
-    error_count = 0
-    
-    for (part_cd, color_cd), group in grouped:
-        count += 1
-        
-        # 데이터가 너무 적으면 스킵
-        if len(group) < 4:
-            skipped_short += 1
-            continue
-        
-        try:
-            # 상업적 결품 시점 감지
-            stockout_result = detect_commercial_stockout(group)
-            
-            if not stockout_result:
-                no_stockout += 1
-                continue
-            
-            stockout_idx, stockout_date = stockout_result
-            
-            # 기회비용 계산
-            loss_df = calculate_opportunity_loss(group, stockout_idx)
-            
-            if loss_df is None or loss_df.empty:
-                # 제외 사유 확인
-                base_sales = group['SALE_QTY_CNS'].iloc[stockout_idx-4:stockout_idx]
-                p_avg = base_sales.mean()
-                
-                if p_avg <= TARGET_END_SALES:
-                    low_velocity += 1
-                elif stockout_date >= SEASON_END_DATE:
-                    past_season_end += 1
-                else:
-                    zero_loss += 1
-                continue
-            
-            # 총 기회비용 합계
-            total_loss = loss_df['loss'].sum()
-            
-            if total_loss <= 0:
-                zero_loss += 1
-                continue
-            
-            # 결과 저장
-            loss_count += 1
-            
-            # ITEM_NM 찾기
-            item_nm = part_info[part_info['PART_CD'] == part_cd]['ITEM_NM'].iloc[0] if len(part_info[part_info['PART_CD'] == part_cd]) > 0 else part_cd
-            
-            # 엑셀 저장용 요약 정보
-            results.append({
-                'ITEM_NM': item_nm,
-                'PART_CD': part_cd,
-                'COLOR_CD': color_cd,
-                '결품유형': '상업적 결품 (Broken Assortment)',
-                '결품시점': stockout_date.strftime('%Y-%m-%d'),
-                '총기회비용(수량)': total_loss
-            })
-            
-            # 대시보드 업데이트용 데이터 준비
-            pred_map = {row['date'].strftime('%m/%d'): row['predicted_sale'] for _, row in loss_df.iterrows()}
-            
-            dashboard_updates[(part_cd, color_cd)] = {
-                'loss_qty': int(total_loss),
-                'type': '상업적 결품 (Broken Assortment)',
-                'predictions': pred_map
-            }
-            
-        except Exception as e:
-            error_count += 1
-            if error_count <= 5:
-                print(f"  [오류] {part_cd}/{color_cd} 분석 중 오류: {str(e)}")
-        
-        if count % 50 == 0:
-            print(f"  ... {count}개 스타일/컬러 분석 완료 (발견된 손실 사례: {loss_count}건)")
-    
+
+    # PART_CD, COLOR_CD별 결품(판매율 임계 돌파) 시점 일괄 감지
+    keys = ['PART_CD', 'COLOR_CD']
+    weekly_df, sku_events = detect_sku_events(weekly_df, keys, SELL_THROUGH_THRESHOLD)
+    panel, weekly_df, starts, _ = build_panel(weekly_df, keys)
+
+    origin = sku_events['cross_idx'].to_numpy()
+    long_enough = panel.lengths >= BASE_WEEKS
+    has_stockout = long_enough & (origin >= 0)
+
+    # 감쇠 모델 일괄 예측 → 정수 예측 / 주차별 기회비용 (SKU, 주) 배열
+    forecaster = DecayForecaster(target_end_sales=TARGET_END_SALES, season_end=SEASON_END_DATE)
+    predicted = finalize_predictions(forecaster.forecast(panel, origin, has_stockout), panel)
+    weekly_loss = opportunity_loss(panel, predicted)
+    total_loss = weekly_loss.sum(axis=1)
+    covered = (predicted >= 0).any(axis=1)
+    has_loss = covered & (total_loss > 0)
+
+    # 제외 사유 (기존 판정 순서와 동일)
+    rows = np.arange(panel.n)
+    s = np.where(has_stockout, origin, 0)
+    p_avg = np.where(s >= BASE_WEEKS, base_velocity(panel, s, BASE_WEEKS), np.nan)
+    stockout_dates = panel.dates[rows, s] if panel.width else np.array([], dtype='datetime64[ns]')
+    excluded = has_stockout & ~covered
+    low_velocity = excluded & (p_avg <= TARGET_END_SALES)
+    past_season_end = excluded & ~low_velocity & (stockout_dates >= np.datetime64(SEASON_END_DATE))
+
+    count = panel.n
+    loss_count = int(has_loss.sum())
+    skipped_short = int((~long_enough).sum())
+    no_stockout = int((long_enough & (origin < 0)).sum())
+    zero_loss = int((has_stockout & ~has_loss).sum() - low_velocity.sum() - past_season_end.sum())
+
+    # 결과 저장 (엑셀 요약 / 대시보드 업데이트 / 예측 오버레이)
+    idx = np.flatnonzero(has_loss)
+    part_codes = sku_events['PART_CD'].astype(str).to_numpy()[idx]
+    color_codes = sku_events['COLOR_CD'].astype(str).to_numpy()[idx]
+    item_names = build_part_dimension(part_info).reindex(part_codes).to_numpy()
+    item_names = np.where(pd.isna(item_names), part_codes, item_names)
+
+    results = pd.DataFrame({
+        'ITEM_NM': item_names,
+        'PART_CD': part_codes,
+        'COLOR_CD': color_codes,
+        '결품유형': '상업적 결품 (Broken Assortment)',
+        '결품시점': pd.DatetimeIndex(stockout_dates[idx]).strftime('%Y-%m-%d'),
+        '총기회비용(수량)': total_loss[idx],
+    })
+
+    dashboard_updates = {
+        (part_cd, color_cd): {'loss_qty': int(loss_qty), 'type': '상업적 결품 (Broken Assortment)'}
+        for part_cd, color_cd, loss_qty in zip(part_codes, color_codes, total_loss[idx])
+    }
+
+    window = has_loss[:, None] & (panel.columns >= origin[:, None]) & panel.observed
+    sku_idx, week_idx = np.nonzero(window)
+    overlay_df = pd.DataFrame({
+        'PART_CD': sku_events['PART_CD'].astype(str).to_numpy()[sku_idx],
+        'COLOR_CD': sku_events['COLOR_CD'].astype(str).to_numpy()[sku_idx],
+        'date': pd.DatetimeIndex(panel.dates[sku_idx, week_idx]).strftime('%m/%d'),
+        'potential_sale': predicted[sku_idx, week_idx],
+    }, columns=OVERLAY_COLUMNS)
+
     print(f"  * 최종 분석 완료: 총 {count}개 중 {loss_count}건에서 기회비용 발생")
     print(f"  * [디버깅] 제외 사유:")
     print(f"    - 데이터 부족(<4주): {skipped_short}건")
     print(f"    - 결품 미감지: {no_stockout}건")
-    print(f"    - 기초체력 부족(P_avg<={TARGET_END_SALES}): {low_velocity}건")
-    print(f"    - 시즌 종료일 지남: {past_season_end}건")
+    print(f"    - 기초체력 부족(P_avg<={TARGET_END_SALES}): {int(low_velocity.sum())}건")
+    print(f"    - 시즌 종료일 지남: {int(past_season_end.sum())}건")
     print(f"    - 기회비용 0: {zero_loss}건")
-    if error_count > 0:
-        print(f"    - 오류 발생: {error_count}건")
-    
-    return pd.DataFrame(results), dashboard_updates
+
+    return results, dashboard_updates, overlay_df
 
 # ============================================
-# 6. 결과 업데이트 (Excel & JSON)
+# 4. 결과 업데이트 (Excel & JSON)
 # ============================================
-def update_results(loss_summary_df, dashboard_updates):
+def update_results(loss_summary_df, dashboard_updates, overlay_df=None):
     print("[4단계] 결과 파일 업데이트 중...")
 
     # [A] 엑셀 업데이트 - 전체 품번에 대해 AI제안 발주량 계산
@@ -433,119 +315,13 @@ def update_results(loss_summary_df, dashboard_updates):
             with open(JSON_FILE, 'r', encoding='utf-8') as f:
                 data = json.load(f)
 
-            updated_count = 0
-
-            def update_style_entry(style_entry, dashboard_updates):
-                """스타일 엔트리의 colors와 total 데이터를 업데이트하는 헬퍼 함수"""
-                nonlocal updated_count
-                colors_data = style_entry.get('colors', {})
-
-                # [1] 각 컬러별 데이터 업데이트
-                for color_key, entry in colors_data.items():
-                    item_info = entry.get('itemInfo', {})
-                    if not item_info: continue
-
-                    code = item_info.get('code')  # PART_CD
-                    color = item_info.get('color')  # COLOR_CD
-
-                    # 업데이트할 데이터가 있는지 확인
-                    if (code, color) in dashboard_updates:
-                        update_info = dashboard_updates[(code, color)]
-                        predictions = update_info['predictions']
-
-                        # analysis 정보 업데이트
-                        if 'analysis' not in entry: entry['analysis'] = {}
-                        entry['analysis']['예상손실수량'] = update_info['loss_qty']
-                        entry['analysis']['AI_진단_상세'] = update_info['type']
-
-                        # chartData 업데이트 (잠재수요 및 Loss 주입)
-                        chart_data = entry.get('chartData', [])
-
-                        for point in chart_data:
-                            date_key = point.get('date')
-
-                            # 해당 날짜에 예측 데이터가 있으면 주입
-                            if date_key in predictions:
-                                point['potential_sale'] = predictions[date_key]
-
-                                try:
-                                    actual_sale = int(point.get('sale', 0))
-                                except:
-                                    actual_sale = 0
-
-                                point['loss'] = max(0, point['potential_sale'] - actual_sale)
-                            else:
-                                try:
-                                    actual_sale = int(point.get('sale', 0))
-                                except:
-                                    actual_sale = 0
-                                point['potential_sale'] = actual_sale
-                                point['loss'] = 0
-
-                        updated_count += 1
-
-                # [2] Total 데이터 업데이트: 각 컬러의 AI 예측과 Loss를 주차별로 합산
-                total_data = style_entry.get('total', {})
-                if total_data and colors_data:
-                    total_chart_data = total_data.get('chartData', [])
-
-                    # 주차별 AI 예측 및 Loss 합산 맵 생성
-                    date_prediction_sum = {}
-                    date_loss_sum = {}
-
-                    for color_key, entry in colors_data.items():
-                        chart_data = entry.get('chartData', [])
-                        for point in chart_data:
-                            date_key = point.get('date')
-                            potential_sale = point.get('potential_sale', 0)
-                            loss = point.get('loss', 0)
-
-                            if date_key:
-                                date_prediction_sum[date_key] = date_prediction_sum.get(date_key, 0) + potential_sale
-                                date_loss_sum[date_key] = date_loss_sum.get(date_key, 0) + loss
-
-                    # Total chartData에 합산된 AI 예측 및 Loss 주입
-                    for point in total_chart_data:
-                        date_key = point.get('date')
-                        if date_key in date_prediction_sum:
-                            point['potential_sale'] = date_prediction_sum[date_key]
-                            point['loss'] = date_loss_sum.get(date_key, 0)
-                        else:
-                            # AI 예측이 없는 주차는 실제 판매량과 동일하게 설정
-                            try:
-                                actual_sale = int(point.get('sale', 0))
-                            except:
-                                actual_sale = 0
-                            point['potential_sale'] = actual_sale
-                            point['loss'] = 0
-
-            # success/failure 카테고리 순회 (진단별 중첩 구조)
-            for category in ['success', 'failure']:
-                if not data.get(category): continue
-
-                category_data = data[category]
-
-                # 진단별 중첩 구조 처리: {"hit": [...], "normal": [...]} 등
-                if isinstance(category_data, dict):
-                    for diagnosis_key, style_list in category_data.items():
-                        if not isinstance(style_list, list):
-                            continue
-                        for style_entry in style_list:
-                            update_style_entry(style_entry, dashboard_updates)
-                else:
-                    # 이전 단일 객체/배열 구조 호환성
-                    category_list = category_data if isinstance(category_data, list) else [category_data]
-                    for style_entry in category_list:
-                        update_style_entry(style_entry, dashboard_updates)
-
-            # 파일 저장
-            with open(JSON_FILE, 'w', encoding='utf-8') as f:
-                json.dump(data, f, ensure_ascii=False, indent=2)
+            # 예측 오버레이를 chartData에 결합 (컬러/Total 포인트 테이블 merge)
+            if overlay_df is None:
+                overlay_df = pd.DataFrame(columns=OVERLAY_COLUMNS)
+            updated_count = apply_overlay(data, overlay_df, dashboard_updates)
 
-            # Public 폴더 업데이트 (React 앱용)
-            if os.path.exists('../public'):
-                with open('../public/dashboard_data.json', 'w', encoding='utf-8') as f:
-                    json.dump(data, f, ensure_ascii=False, indent=2)
+            # 파일 저장 (한 번만 직렬화, 임시 파일 기록 후 원자적 교체)
+            write_json_atomic(JSON_FILE, data)
 
             print(f"  * 대시보드 데이터 업데이트 완료: {updated_count}개 컬러 데이터 반영")
 
@@ -570,12 +346,13 @@ def main():
 
     # 2. 기회비용 계산 대상이 있는 경우 분석 실행
     updates = {}
+    overlay = None
     if part_codes is not None:
         # 원본 시계열 데이터 로드
         weekly_df = load_weekly_data(part_codes)
         if weekly_df is not None:
             # 기회비용 분석 실행
-            loss_summary, updates = run_analysis(weekly_df, part_info)
+            loss_summary, updates, overlay = run_analysis(weekly_df, part_info)
             print(f"  * 기회비용 분석 완료: {len(updates)}건")
         else:
             print("  [경고] 시계열 데이터 로드 실패, 기회비용 없이 발주량만 계산합니다.")
@@ -583,7 +360,7 @@ def main():
         print("  * 기회비용 계산 대상 없음, 발주량만 계산합니다.")
 
     # 3. 결과 저장 (전체 품번에 대해 AI제안 발주량 계산)
-    update_results(None, updates)
+    update_results(None, updates, overlay)
 
     print("=" * 60)
     print("분석 완료")
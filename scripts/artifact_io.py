@@ -0,0 +1,58 @@
+"""
+산출물(JSON) 원자적 저장 및 게시
+- 같은 디렉터리의 임시 파일에 기록 후 os.replace로 교체 → 읽는 쪽(React 앱/API)은
+  항상 완성된 이전 파일 또는 새 파일만 보게 됨 (쓰다 만 파일 노출 없음)
+- 다른 경로로 게시할 때는 다시 직렬화하지 않고 하드링크(불가 시 복사) 후 교체
+"""
+
+import json
+import os
+import shutil
+import tempfile
+
+
+def _temp_path(path: str) -> str:
+    """대상 파일과 같은 디렉터리의 임시 파일 경로 (같은 파일시스템이어야 rename이 원자적)"""
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(prefix=f".{os.path.basename(path)}.", suffix='.tmp', dir=directory)
+    os.close(fd)
+    os.chmod(tmp, 0o644)  # mkstemp 기본 권한(0600) 대신 일반 산출물 권한
+    return tmp
+
+
+def write_json_atomic(path: str, data, indent: int = 2) -> str:
+    """JSON을 한 번 직렬화해 임시 파일에 기록한 뒤 원자적으로 교체"""
+    tmp = _temp_path(path)
+    try:
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False, indent=indent)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+    return path
+
+
+def publish_file(src: str, dst: str) -> str:
+    """
+    완성된 파일을 다른 경로로 게시 (재직렬화 없음)
+
+    하드링크를 임시 이름으로 만든 뒤 교체하고, 파일시스템이 달라 하드링크가 불가하면 복사 후 교체
+    """
+    tmp = _temp_path(dst)
+    os.remove(tmp)
+    try:
+        try:
+            os.link(src, tmp)
+        except OSError:
+            shutil.copy2(src, tmp)
+        os.replace(tmp, dst)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+    return dst
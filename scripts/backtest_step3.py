@@ -0,0 +1,198 @@
+"""
+STEP 3 기회비용 모델 백테스트 (병렬 파라미터 그리드)
+- 결품이 발생하지 않은 SKU에 가상 결품 시점(누적 판매 비중 ORIGIN_SHARE 도달 주차)을 두고
+  이후 실판매를 가린(0으로 마스킹) 상태에서 STEP 3 감쇠 모델을 재실행
+- 가려진 실판매(실제 잠재 수요)와 비교해 수요 예측 오차와 AI제안 발주량의 과부족을 채점
+- 파라미터 그리드: TARGET_END_SALES x Base 구간(주) x 발주 판매율 divisor
+- 주차별 배열은 공유 메모리에 한 번만 올리고, 프로세스 풀 워커는 읽기 전용으로 참조
+
+실행: python backtest_step3.py [워커 수]
+결과: ../output/STEP3_Backtest_Report.xlsx
+"""
+
+import itertools
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+import pandas as pd
+
+from config_loader import get_sell_through_threshold, get_season_end_date
+from sku_events import detect_sku_events
+from weekly_data import load_weekly
+from demand_forecasters import (WeeklyPanel, DecayForecaster, build_panel, pseudo_origin,
+                                finalize_predictions, opportunity_loss)
+
+OUTPUT_FILE = '../output/STEP3_Backtest_Report.xlsx'
+
+SKU_KEYS = ['PART_CD', 'COLOR_CD']
+ORIGIN_SHARE = 0.5  # 가상 결품 시점: 시즌 누적 판매 비중 50% 도달 주차
+
+# 파라미터 그리드 (현재 운영값: 5 / 4주 / 0.75)
+TARGET_END_SALES_GRID = [3, 5, 8, 10]
+BASE_WEEKS_GRID = [2, 3, 4, 6]
+DIVISOR_GRID = [0.65, 0.70, 0.75, 0.80, 0.85]
+
+# 워커 프로세스 전역 (공유 메모리 참조)
+_SHARED = {}
+
+
+def build_backtest_arrays(weekly_df):
+    """
+    백테스트 입력 배열 (결품 미발생 + 가상 결품 이후 주차가 있는 SKU만)
+
+    Returns:
+        {'sales', 'dates'(int64 ns), 'lengths', 'origin'} 배열 딕셔너리
+    """
+    df, events = detect_sku_events(weekly_df, SKU_KEYS, get_sell_through_threshold())
+    panel, _, _, _ = build_panel(df, SKU_KEYS)
+
+    origin = pseudo_origin(panel, ORIGIN_SHARE)
+    keep = (events['cross_idx'].to_numpy() < 0) & (origin < panel.lengths) & (panel.sales.sum(axis=1) > 0)
+    panel = panel.subset(np.flatnonzero(keep))
+    return {
+        'sales': panel.sales,
+        'dates': panel.dates.view(np.int64),
+        'lengths': panel.lengths,
+        'origin': origin[keep].astype(np.int64),
+    }
+
+
+# ═══════════════════════════════════════════════════════════════
+# 공유 메모리
+# ═══════════════════════════════════════════════════════════════
+
+def _share_arrays(arrays):
+    """배열 → 공유 메모리 블록 (블록 목록, 워커 전달용 명세)"""
+    blocks, spec = [], {}
+    for name, arr in arrays.items():
+        arr = np.ascontiguousarray(arr)
+        shm = shared_memory.SharedMemory(create=True, size=max(arr.nbytes, 1))
+        np.ndarray(arr.shape, dtype=arr.dtype, buffer=shm.buf)[...] = arr
+        blocks.append(shm)
+        spec[name] = (shm.name, arr.shape, arr.dtype.str)
+    return blocks, spec
+
+
+def _init_worker(spec, season_end):
+    """워커 초기화: 공유 메모리를 읽기 전용 배열로 연결 (복사 없음)"""
+    views = {}
+    for name, (shm_name, shape, dtype) in spec.items():
+        shm = shared_memory.SharedMemory(name=shm_name)
+        arr = np.ndarray(shape, dtype=np.dtype(dtype), buffer=shm.buf)
+        arr.flags.writeable = False
+        views[name] = arr
+        _SHARED.setdefault('_blocks', []).append(shm)  # 참조 유지
+    _SHARED['arrays'] = views
+    _SHARED['season_end'] = season_end
+
+
+# ═══════════════════════════════════════════════════════════════
+# 채점
+# ═══════════════════════════════════════════════════════════════
+
+def evaluate(arrays, season_end, target_end_sales, base_weeks, divisors):
+    """
+    (TARGET_END_SALES, Base 구간) 조합 1개에 대해 감쇠 모델 재실행 후 divisor별 채점
+
+    Returns:
+        divisor별 지표 딕셔너리 리스트
+    """
+    sales = arrays['sales']
+    origin = arrays['origin']
+    truth = WeeklyPanel(sales, arrays['dates'].view('datetime64[ns]'), arrays['lengths'])
+    post = truth.observed & (truth.columns >= origin[:, None])
+
+    # 가상 결품 이후 실판매 마스킹 (결품이 났다면 관측되지 않았을 판매)
+    masked = WeeklyPanel(np.where(post, 0.0, sales), truth.dates, truth.lengths)
+
+    model = DecayForecaster(target_end_sales=target_end_sales, base_weeks=base_weeks, season_end=season_end)
+    predicted = finalize_predictions(model.forecast(masked, origin), masked)
+    loss = opportunity_loss(masked, predicted)
+    covered = (predicted >= 0).any(axis=1)
+
+    # 수요 예측 오차: 추정 기회비용(= 마스킹 후 예측 수요) vs 가려진 실판매
+    actual_post = np.where(post, sales, 0)
+    weekly_err = np.abs(loss - actual_post)[post].sum()
+    demand_post = actual_post.sum()
+    loss_total = loss.sum(axis=1)
+
+    # 발주량 채점: 시즌 실수요(가려진 판매 포함) 대비 AI제안 발주량
+    pre_sales = np.where(post, 0, sales).sum(axis=1)
+    demand = sales.sum(axis=1)
+
+    rows = []
+    for divisor in divisors:
+        order = np.ceil((pre_sales + loss_total) / divisor / 10) * 10
+        sold = np.minimum(order, demand)
+        rows.append({
+            'TARGET_END_SALES': target_end_sales,
+            'Base 구간(주)': base_weeks,
+            'Divisor': divisor,
+            '대상 SKU': int(len(sales)),
+            '예측 SKU': int(covered.sum()),
+            '수요 WAPE(%)': round(weekly_err / demand_post * 100, 2) if demand_post > 0 else None,
+            '기회비용 오차(%)': round((loss_total.sum() - demand_post) / demand_post * 100, 2) if demand_post > 0 else None,
+            '발주 불일치(%)': round(np.abs(order - demand).sum() / demand.sum() * 100, 2),
+            '결품 SKU 비율(%)': round((demand > order).mean() * 100, 1),
+            '평균 판매율(%)': round(np.mean(np.divide(sold, order, out=np.zeros(len(order)), where=order > 0)) * 100, 1),
+        })
+    return rows
+
+
+def _evaluate_task(params):
+    """워커 작업: 공유 배열로 evaluate 실행"""
+    target_end_sales, base_weeks, divisors = params
+    return evaluate(_SHARED['arrays'], _SHARED['season_end'], target_end_sales, base_weeks, divisors)
+
+
+def run_backtest(weekly_df, workers=None):
+    """파라미터 그리드 병렬 백테스트 → 순위 리포트"""
+    arrays = build_backtest_arrays(weekly_df)
+    print(f"  * 백테스트 대상: {len(arrays['sales'])}개 SKU (결품 미발생, 가상 결품 이후 주차 보유)")
+
+    season_end = get_season_end_date()
+    tasks = [(t, b, DIVISOR_GRID) for t, b in itertools.product(TARGET_END_SALES_GRID, BASE_WEEKS_GRID)]
+    print(f"  * 파라미터 조합: {len(tasks) * len(DIVISOR_GRID)}개 (모델 재실행 {len(tasks)}회)")
+
+    blocks, spec = _share_arrays(arrays)
+    try:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(spec, season_end)) as pool:
+            results = [row for rows in pool.map(_evaluate_task, tasks) for row in rows]
+    finally:
+        for shm in blocks:
+            shm.close()
+            shm.unlink()
+
+    report = pd.DataFrame(results)
+    report = report.sort_values(['발주 불일치(%)', '수요 WAPE(%)'], na_position='last').reset_index(drop=True)
+    report.insert(0, '순위', np.arange(1, len(report) + 1))
+    report['현재 운영값'] = ((report['TARGET_END_SALES'] == 5) & (report['Base 구간(주)'] == 4)
+                         & np.isclose(report['Divisor'], 0.75))
+    return report
+
+
+def main():
+    print("=" * 60)
+    print("STEP 3 기회비용 모델 백테스트 (병렬 파라미터 그리드)")
+    print("=" * 60)
+
+    workers = int(sys.argv[1]) if len(sys.argv) > 1 else None
+    weekly_df = load_weekly(stage='Backtest 주차별 데이터')
+    report = run_backtest(weekly_df, workers)
+
+    print(report.head(10).to_string(index=False))
+    current = report[report['현재 운영값']]
+    if not current.empty:
+        print(f"  * 현재 운영값(5 / 4주 / 0.75) 순위: {int(current['순위'].iloc[0])}/{len(report)}")
+
+    os.makedirs(os.path.dirname(OUTPUT_FILE), exist_ok=True)
+    report.to_excel(OUTPUT_FILE, sheet_name='Ranking', index=False)
+    print(f"* 백테스트 리포트 저장 완료: {OUTPUT_FILE}")
+
+
+if __name__ == "__main__":
+    main()
@@ -10,6 +10,8 @@ import os
 import math
 from datetime import datetime, timezone
 
+from artifact_io import write_json_atomic
+
 SEASON_CLOSING_PATH = '../public/season_closing_data.json'
 BUDGET_CONFIG_PATH = '../output/budget_config.json'
 
@@ -135,9 +137,7 @@ def main():
         print(f"    - {cat['class2']}: {cat['budget_amt']:,}원 / {cat['budget_qty']:,}장")
 
     # 저장
-    os.makedirs(os.path.dirname(BUDGET_CONFIG_PATH), exist_ok=True)
-    with open(BUDGET_CONFIG_PATH, 'w', encoding='utf-8') as f:
-        json.dump(result, f, ensure_ascii=False, indent=2)
+    write_json_atomic(BUDGET_CONFIG_PATH, result)
 
     print(f"\n  * 예산 설정 저장 완료: {BUDGET_CONFIG_PATH}")
     print("=" * 60)
@@ -77,6 +77,12 @@ def get_shortage_cutoff_date():
     return early + pd.DateOffset(months=2)
 
 
+def get_yoy_analysis_enabled():
+    """전년 대비(YoY) 이중 기간 분석 사용 여부 (기본 사용)"""
+    cfg = _load_config()
+    return bool(cfg.get('yoyAnalysis', True))
+
+
 def reset_cache():
     """캐시 리셋 (테스트용)"""
     global _config_cache
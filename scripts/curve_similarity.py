@@ -0,0 +1,196 @@
+"""
+판매 곡선 유사도 인덱스 (유사스타일 탐색 / 검증)
+- 25S 스타일(PART_CD)별 누적 판매율 곡선을 최초입고 주차 기준으로 정렬해 HORIZON 주 벡터로 변환
+- 유사도 = 1 - RMSE(곡선 간 누적 판매율 차이), 거리는 ||a||² + ||b||² - 2a·b 행렬곱으로 계산
+- 아이템(ITEM_NM) 블록 단위로 행렬곱 → 같은 아이템 안에서 K개 최근접 곡선 탐색 (brute-force kNN)
+- 속성 기반 맵핑(similarity_mapping.csv REF_PART_CD_1~3)의 곡선 일관성 검증 + 후보 보강
+
+실행: python curve_similarity.py [K]
+결과: ../output/25S_Curve_Similarity.xlsx, ../output/curve_index.npz
+"""
+
+import os
+import sys
+import time
+from typing import List, Optional
+
+import numpy as np
+import pandas as pd
+
+from config_loader import get_sell_through_threshold
+from sku_events import detect_sku_events, pad_segments
+from weekly_data import load_weekly
+
+MAPPING_FILE = '../data/similarity_mapping.csv'
+SAMPLE_MAPPING_FILE = '../data/similarity_mapping_sample.csv'
+OUTPUT_FILE = '../output/25S_Curve_Similarity.xlsx'
+INDEX_FILE = '../output/curve_index.npz'
+
+HORIZON = 26   # 최초입고 후 비교 주차 수
+TOP_K = 5
+
+
+def build_curves(weekly_df: pd.DataFrame, horizon: int = HORIZON):
+    """
+    스타일별 누적 판매율 곡선 (최초입고 주차 정렬, 구간 이후는 마지막 값 유지)
+
+    Returns:
+        (스타일 정보 데이터프레임 [PART_CD, ITEM_NM], (스타일, horizon) float32 곡선 행렬)
+    """
+    style_df = (weekly_df.groupby(['PART_CD', 'END_DT'], observed=True)
+                [['STOR_QTY_KR', 'SALE_QTY_CNS']].sum().reset_index())
+    style_df, events = detect_sku_events(style_df, ['PART_CD'], get_sell_through_threshold())
+    starts, ends = events['start'].to_numpy(), events['end'].to_numpy()
+    lengths = ends - starts
+
+    sell_through = pad_segments(style_df['Sell_Through'].to_numpy(dtype=float), starts, ends)
+    first_in = np.maximum(events['first_in_idx'].to_numpy(), 0)
+    cols = np.minimum(first_in[:, None] + np.arange(horizon)[None, :], (lengths - 1)[:, None])
+    curves = sell_through[np.arange(len(starts))[:, None], np.maximum(cols, 0)]
+
+    info = events[['PART_CD']].astype(str)
+    if 'ITEM_NM' in weekly_df.columns:
+        item = weekly_df.drop_duplicates('PART_CD').set_index('PART_CD')['ITEM_NM'].astype(str)
+        item.index = item.index.astype(str)
+        info['ITEM_NM'] = item.reindex(info['PART_CD']).to_numpy()
+    else:
+        info['ITEM_NM'] = ''
+    return info.reset_index(drop=True), np.clip(curves, 0, None).astype(np.float32)
+
+
+class CurveIndex:
+    """누적 판매율 곡선 kNN 인덱스 (아이템 블록 행렬곱)"""
+
+    def __init__(self, part_codes, item_names, curves: np.ndarray):
+        self.part_codes = np.asarray(part_codes, dtype=str)
+        self.item_names = np.asarray(item_names, dtype=str)
+        self.curves = np.ascontiguousarray(curves, dtype=np.float32)
+        self.sq_norms = (self.curves.astype(np.float64) ** 2).sum(axis=1)
+        self.position = {code: i for i, code in enumerate(self.part_codes)}
+        self.blocks = {item: np.flatnonzero(self.item_names == item) for item in np.unique(self.item_names)}
+
+    @classmethod
+    def from_weekly(cls, weekly_df: pd.DataFrame, horizon: int = HORIZON) -> 'CurveIndex':
+        info, curves = build_curves(weekly_df, horizon)
+        return cls(info['PART_CD'], info['ITEM_NM'], curves)
+
+    @classmethod
+    def load(cls, path: str = INDEX_FILE) -> 'CurveIndex':
+        data = np.load(path)
+        return cls(data['part_codes'], data['item_names'], data['curves'])
+
+    def save(self, path: str = INDEX_FILE):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        np.savez_compressed(path, part_codes=self.part_codes, item_names=self.item_names, curves=self.curves)
+
+    def __len__(self):
+        return len(self.part_codes)
+
+    def _similarity(self, rows: np.ndarray, candidates: np.ndarray) -> np.ndarray:
+        """(rows, candidates) 유사도 = 1 - RMSE, 거리는 행렬곱으로 계산"""
+        gram = self.curves[rows].astype(np.float64) @ self.curves[candidates].astype(np.float64).T
+        dist2 = self.sq_norms[rows][:, None] + self.sq_norms[candidates][None, :] - 2 * gram
+        rmse = np.sqrt(np.maximum(dist2, 0) / max(self.curves.shape[1], 1))
+        return 1 - rmse
+
+    def similarity(self, part_a: str, part_b: str) -> Optional[float]:
+        """두 스타일 곡선 유사도 (어느 한쪽이 인덱스에 없으면 None)"""
+        a, b = self.position.get(str(part_a)), self.position.get(str(part_b))
+        if a is None or b is None:
+            return None
+        return float(self._similarity(np.array([a]), np.array([b]))[0, 0])
+
+    def query(self, part_cd: str, k: int = TOP_K, same_item: bool = True) -> List[dict]:
+        """스타일 1개의 K개 최근접 곡선 (자기 자신 제외)"""
+        row = self.position.get(str(part_cd))
+        if row is None:
+            return []
+        candidates = self.blocks[self.item_names[row]] if same_item else np.arange(len(self))
+        candidates = candidates[candidates != row]
+        if len(candidates) == 0:
+            return []
+        sim = self._similarity(np.array([row]), candidates)[0]
+        top = np.argsort(-sim, kind='stable')[:k]
+        return [{'part_cd': str(self.part_codes[candidates[i]]), 'score': round(float(sim[i]), 4)} for i in top]
+
+    def all_knn(self, k: int = TOP_K) -> pd.DataFrame:
+        """전체 스타일 kNN (아이템 블록별 행렬곱 1회)"""
+        frames = []
+        for item, rows in self.blocks.items():
+            if len(rows) < 2:
+                continue
+            sim = self._similarity(rows, rows)
+            np.fill_diagonal(sim, -np.inf)
+            kk = min(k, len(rows) - 1)
+            top = np.argsort(-sim, axis=1, kind='stable')[:, :kk]
+            frames.append(pd.DataFrame({
+                'ITEM_NM': item,
+                'PART_CD': np.repeat(self.part_codes[rows], kk),
+                '순위': np.tile(np.arange(1, kk + 1), len(rows)),
+                '유사_PART_CD': self.part_codes[rows[top]].ravel(),
+                '곡선유사도': np.round(np.take_along_axis(sim, top, axis=1).ravel(), 4),
+            }))
+        if not frames:
+            return pd.DataFrame(columns=['ITEM_NM', 'PART_CD', '순위', '유사_PART_CD', '곡선유사도'])
+        return pd.concat(frames, ignore_index=True)
+
+
+def check_mapping(index: CurveIndex, mapping_df: pd.DataFrame, k: int = TOP_K) -> pd.DataFrame:
+    """
+    속성 기반 맵핑 검증/보강
+    - REF_PART_CD_2~3 곡선이 REF_PART_CD_1 곡선과 얼마나 닮았는지 (참조 간 일관성)
+    - REF_PART_CD_1 곡선의 kNN 중 맵핑에 없는 스타일을 보강 후보로 제시
+    """
+    rows = []
+    for rec in mapping_df.to_dict('records'):
+        ref1 = str(rec.get('REF_PART_CD_1', '')).strip()
+        refs = {str(rec.get(f'REF_PART_CD_{i}', '')).strip() for i in range(1, 4)}
+        row = {'NEW_PART_CD': rec.get('NEW_PART_CD'), 'NEW_ITEM_NM': rec.get('NEW_ITEM_NM'),
+               'REF_PART_CD_1': ref1, '곡선 보유': ref1 in index.position}
+        for i in (2, 3):
+            ref = str(rec.get(f'REF_PART_CD_{i}', '')).strip()
+            row[f'REF_PART_CD_{i}'] = ref
+            row[f'REF_{i} 곡선유사도'] = index.similarity(ref1, ref)
+        extra = [n for n in index.query(ref1, k + 3) if n['part_cd'] not in refs][:k]
+        row['보강 후보'] = ', '.join(f"{n['part_cd']}({n['score']:.2f})" for n in extra)
+        rows.append(row)
+    return pd.DataFrame(rows)
+
+
+def main():
+    print("=" * 60)
+    print("판매 곡선 유사도 인덱스 (유사스타일 탐색 / 검증)")
+    print("=" * 60)
+
+    k = int(sys.argv[1]) if len(sys.argv) > 1 else TOP_K
+    weekly_df = load_weekly(stage='Curve Similarity 주차별 데이터')
+
+    t0 = time.perf_counter()
+    index = CurveIndex.from_weekly(weekly_df)
+    print(f"  * 인덱스 구축: {len(index)}개 스타일 x {HORIZON}주 ({(time.perf_counter() - t0) * 1000:.1f}ms)")
+    index.save()
+
+    t0 = time.perf_counter()
+    knn_df = index.all_knn(k)
+    print(f"  * 전체 kNN (K={k}): {(time.perf_counter() - t0) * 1000:.1f}ms")
+
+    if len(index):
+        t0 = time.perf_counter()
+        sample = index.query(index.part_codes[0], k)
+        print(f"  * 단건 조회 {index.part_codes[0]}: {(time.perf_counter() - t0) * 1000:.2f}ms → {sample[:3]}")
+
+    mapping_file = MAPPING_FILE if os.path.exists(MAPPING_FILE) else SAMPLE_MAPPING_FILE
+    mapping_df = pd.read_csv(mapping_file, encoding='utf-8-sig') if os.path.exists(mapping_file) else None
+
+    os.makedirs(os.path.dirname(OUTPUT_FILE), exist_ok=True)
+    with pd.ExcelWriter(OUTPUT_FILE, engine='openpyxl') as writer:
+        knn_df.to_excel(writer, sheet_name='Style_kNN', index=False)
+        if mapping_df is not None:
+            check_df = check_mapping(index, mapping_df, k)
+            check_df.to_excel(writer, sheet_name='Mapping_Check', index=False)
+            print(f"  * 맵핑 검증: {int(check_df['곡선 보유'].sum())}/{len(check_df)}개 REF_PART_CD_1 곡선 보유")
+    print(f"* 곡선 유사도 결과 저장 완료: {OUTPUT_FILE}, {INDEX_FILE}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+"""
+대시보드 예측 오버레이 (STEP 3 → dashboard_data.json)
+- STEP 3 예측 결과를 (PART_CD, COLOR_CD, 주차) 오버레이 테이블로 받아
+  대시보드 chartData 포인트 테이블과 merge/groupby로 한 번에 결합
+- 컬러 포인트: potential_sale = 예측값(없으면 실판매), loss = max(0, 예측 - 실판매)
+- Total 포인트: 같은 스타일 엔트리의 컬러 포인트를 주차별로 합산
+  (업데이트 대상이 아닌 컬러는 기존 potential_sale/loss 값(없으면 0)으로 합산)
+"""
+
+import numpy as np
+import pandas as pd
+
+OVERLAY_COLUMNS = ['PART_CD', 'COLOR_CD', 'date', 'potential_sale']
+
+
+def iter_style_entries(data: dict):
+    """success/failure 하위 스타일 엔트리 순회 (진단별 중첩 구조 + 이전 단일 구조 호환)"""
+    for category in ['success', 'failure']:
+        category_data = data.get(category)
+        if not category_data:
+            continue
+        if isinstance(category_data, dict):
+            for style_list in category_data.values():
+                if isinstance(style_list, list):
+                    yield from style_list
+        else:
+            yield from (category_data if isinstance(category_data, list) else [category_data])
+
+
+def _to_int(values: list) -> np.ndarray:
+    """int(point.get(...)) 변환과 동일하게 숫자가 아니면 0으로 처리"""
+    numeric = pd.to_numeric(pd.Series(values, dtype=object), errors='coerce').fillna(0)
+    return np.trunc(numeric.to_numpy(dtype=float)).astype(np.int64)
+
+
+def _flatten(points: list, extra: dict) -> pd.DataFrame:
+    """chartData 포인트 리스트 → 포인트 테이블 (row 순서 = points 순서)"""
+    frame = pd.DataFrame(extra)
+    frame['date'] = [p.get('date') for p in points]
+    frame['sale'] = _to_int([p.get('sale', 0) for p in points])
+    return frame
+
+
+def apply_overlay(data: dict, overlay: pd.DataFrame, loss_info: dict) -> int:
+    """
+    대시보드 데이터에 예측 오버레이 결합 (data를 제자리 수정)
+
+    Args:
+        data: dashboard_data.json 내용
+        overlay: OVERLAY_COLUMNS 테이블 (date는 chartData와 같은 'MM/DD' 문자열)
+        loss_info: {(PART_CD, COLOR_CD): {'loss_qty', 'type'}} 업데이트 대상 컬러
+
+    Returns:
+        업데이트된 컬러 엔트리 수
+    """
+    # 1. 컬러/Total 포인트 평탄화 (포인트 dict 참조는 결과 기록용으로 보관)
+    color_points, color_style, color_updated, prev_pot, prev_loss = [], [], [], [], []
+    total_points, total_style = [], []
+    updated_count = 0
+
+    for style_id, style_entry in enumerate(iter_style_entries(data)):
+        colors_data = style_entry.get('colors', {})
+        for entry in colors_data.values():
+            item_info = entry.get('itemInfo', {})
+            if not item_info:
+                continue
+            key = (item_info.get('code'), item_info.get('color'))
+            chart = entry.get('chartData', [])
+            is_updated = key in loss_info
+            if is_updated:
+                info = loss_info[key]
+                if 'analysis' not in entry:
+                    entry['analysis'] = {}
+                entry['analysis']['예상손실수량'] = info['loss_qty']
+                entry['analysis']['AI_진단_상세'] = info['type']
+                updated_count += 1
+            for point in chart:
+                color_points.append(point)
+                prev_pot.append(point.get('potential_sale', 0))
+                prev_loss.append(point.get('loss', 0))
+            color_style.extend([style_id] * len(chart))
+            color_updated.extend([key if is_updated else None] * len(chart))
+
+        total_data = style_entry.get('total', {})
+        if total_data and colors_data:
+            chart = total_data.get('chartData', [])
+            total_points.extend(chart)
+            total_style.extend([style_id] * len(chart))
+
+    if not color_points:
+        return updated_count
+
+    # 2. 컬러 포인트 ← 오버레이 (PART_CD, COLOR_CD, date) 결합
+    colors = _flatten(color_points, {'style_id': color_style})
+    target = pd.Series(color_updated, dtype=object)
+    colors['PART_CD'] = [k[0] if k else None for k in target]
+    colors['COLOR_CD'] = [k[1] if k else None for k in target]
+    is_target = target.notna().to_numpy()
+
+    ov = overlay[OVERLAY_COLUMNS].astype({'PART_CD': str, 'COLOR_CD': str, 'date': str})
+    ov = ov.drop_duplicates(['PART_CD', 'COLOR_CD', 'date'], keep='last')
+    lookup = colors[['PART_CD', 'COLOR_CD', 'date']].astype(str).merge(
+        ov, on=['PART_CD', 'COLOR_CD', 'date'], how='left')['potential_sale'].to_numpy(dtype=float)
+
+    sale = colors['sale'].to_numpy()
+    predicted = np.where(np.isnan(lookup), sale, np.nan_to_num(lookup)).astype(np.int64)
+    potential = np.where(is_target, predicted, _to_int(prev_pot))
+    loss = np.where(is_target, np.maximum(0, predicted - sale), _to_int(prev_loss))
+
+    for point, pot_value, loss_value, updated in zip(color_points, potential.tolist(), loss.tolist(), is_target):
+        if updated:
+            point['potential_sale'] = pot_value
+            point['loss'] = loss_value
+
+    # 3. Total 포인트 ← 스타일 엔트리별 컬러 합산
+    if total_points:
+        colors['potential_sale'] = potential
+        colors['loss'] = loss
+        valid = colors['date'].notna() & (colors['date'].astype(str) != '')
+        sums = colors[valid].groupby(['style_id', 'date'], sort=False)[['potential_sale', 'loss']].sum()
+
+        totals = _flatten(total_points, {'style_id': total_style})
+        joined = totals.merge(sums, left_on=['style_id', 'date'], right_index=True, how='left')
+        matched = joined['potential_sale'].notna().to_numpy()
+        total_pot = np.where(matched, joined['potential_sale'].fillna(0), totals['sale']).astype(np.int64)
+        total_loss = np.where(matched, joined['loss'].fillna(0), 0).astype(np.int64)
+
+        for point, pot_value, loss_value in zip(total_points, total_pot.tolist(), total_loss.tolist()):
+            point['potential_sale'] = pot_value
+            point['loss'] = loss_value
+
+    return updated_count
@@ -0,0 +1,312 @@
+"""
+배치 수요 예측 모델 (기회비용 계산용)
+- SKU별 주차 시계열을 (SKU, 주) 패딩 행렬(WeeklyPanel)로 묶어 전체 SKU를 한 번에 예측
+- 예측 시작점(origin, 보통 상업적 결품 주차)부터의 잠재 수요를 반환하고,
+  정수 반올림 / 시즌 마감 처리 / 기회비용(max(0, 예측 - 실판매))은 모델 공통 함수로 처리
+- 모델은 FORECASTERS 레지스트리에 등록하고 get_forecaster(name)으로 생성
+
+등록 모델:
+- decay: 적응형 기하 감쇠 (STEP 3 기존 SKU별 감쇠 루프와 동일 규칙)
+- holt: Holt 지수평활 (감쇠 추세)
+- seasonal_index: 아이템(ITEM_NM) 단위 주차 계절지수
+"""
+
+from abc import ABC, abstractmethod
+from typing import Dict, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from config_loader import get_season_end_date
+from sku_events import build_segments, pad_segments
+
+TARGET_END_SALES = 5  # 시즌 종료 시점 목표 판매량 (감쇠 수렴값, 기초체력 기준)
+BASE_WEEKS = 4        # Base Velocity 산출 구간 (결품 직전 주차 수)
+SEASON_END_CUTOFF = pd.Timestamp('2025-10-30')  # 이후 주차는 예측 0
+
+
+# ═══════════════════════════════════════════════════════════════
+# 패딩 시계열
+# ═══════════════════════════════════════════════════════════════
+
+class WeeklyPanel:
+    """SKU x 주 패딩 행렬 묶음 (행 = SKU, 열 = 구간 내 주차 순서)"""
+
+    def __init__(self, sales: np.ndarray, dates: np.ndarray, lengths: np.ndarray,
+                 keys: Optional[pd.DataFrame] = None, category: Optional[np.ndarray] = None):
+        self.sales = np.asarray(sales, dtype=float)
+        self.dates = np.asarray(dates, dtype='datetime64[ns]')
+        self.lengths = np.asarray(lengths, dtype=np.int64)
+        self.keys = keys
+        self.category = category
+        self.n, self.width = self.sales.shape
+
+    @property
+    def columns(self) -> np.ndarray:
+        """(1, 주) 열 번호"""
+        return np.arange(self.width)[None, :]
+
+    @property
+    def observed(self) -> np.ndarray:
+        """(SKU, 주) 실제 데이터가 있는 칸"""
+        return self.columns < self.lengths[:, None]
+
+    def subset(self, rows: np.ndarray) -> 'WeeklyPanel':
+        """일부 SKU만 선택한 패널"""
+        keys = self.keys.iloc[rows].reset_index(drop=True) if self.keys is not None else None
+        category = self.category[rows] if self.category is not None else None
+        return WeeklyPanel(self.sales[rows], self.dates[rows], self.lengths[rows], keys, category)
+
+
+def build_panel(df: pd.DataFrame, keys: Sequence[str], category_col: str = 'ITEM_NM',
+                sale_col: str = 'SALE_QTY_CNS'):
+    """
+    주차별 데이터 → WeeklyPanel
+
+    Returns:
+        (패널, (키, END_DT) 정렬된 데이터프레임, 구간 시작 배열, 구간 끝 배열)
+    """
+    df, starts, ends = build_segments(df, keys)
+    sales = pad_segments(df[sale_col].to_numpy(dtype=float), starts, ends)
+    dates = pad_segments(df['END_DT'].to_numpy(dtype='datetime64[ns]'), starts, ends,
+                         fill=np.datetime64('NaT'))
+    sku = df.iloc[starts][list(keys)].reset_index(drop=True)
+    category = None
+    if category_col in df.columns:
+        category = pd.factorize(df[category_col].iloc[starts].astype(str))[0]
+    return WeeklyPanel(sales, dates, ends - starts, sku, category), df, starts, ends
+
+
+def pseudo_origin(panel: WeeklyPanel, share: float) -> np.ndarray:
+    """
+    가상 결품 시점: 시즌 누적 판매 비중이 share에 도달한 다음 주차 (백테스트/벤치마크용)
+    도달하지 못한 SKU는 구간 길이(예측 구간 없음)
+    """
+    cum = np.cumsum(panel.sales, axis=1)
+    total = cum[:, -1] if panel.width else np.zeros(panel.n)
+    ratio = np.divide(cum, total[:, None], out=np.zeros_like(cum), where=total[:, None] > 0)
+    reached = (ratio >= share) & panel.observed
+    return np.where(reached.any(axis=1), reached.argmax(axis=1) + 1, panel.lengths)
+
+
+def _forecast_window(panel: WeeklyPanel, origin: np.ndarray, valid: np.ndarray) -> np.ndarray:
+    """(SKU, 주) 예측 대상 칸: 유효 SKU의 origin 이후 실제 주차"""
+    return valid[:, None] & (panel.columns >= origin[:, None]) & panel.observed
+
+
+def base_velocity(panel: WeeklyPanel, origin: np.ndarray, base_weeks: int) -> np.ndarray:
+    """origin 직전 base_weeks 주 평균 판매 (주차가 부족한 SKU는 부족분 그대로 평균)"""
+    rows = np.arange(panel.n)
+    cum = np.concatenate([np.zeros((panel.n, 1)), np.cumsum(panel.sales, axis=1)], axis=1)
+    s = np.clip(origin, 0, panel.width)
+    return (cum[rows, s] - cum[rows, np.maximum(s - base_weeks, 0)]) / base_weeks
+
+
+# ═══════════════════════════════════════════════════════════════
+# 모델 인터페이스
+# ═══════════════════════════════════════════════════════════════
+
+class DemandForecaster(ABC):
+    """배치 수요 예측 모델 인터페이스"""
+    name = 'base'
+
+    @abstractmethod
+    def forecast(self, panel: WeeklyPanel, origin: np.ndarray,
+                 valid: Optional[np.ndarray] = None) -> np.ndarray:
+        """(SKU, 주) 잠재 수요 예측 반환.
+
+        origin: SKU별 예측 시작 주차 (구간 내 상대 위치)
+        valid: 예측 대상 SKU (None이면 전체)
+        반환값은 origin 이후 실제 주차에만 값이 있고, 그 외 칸과 예측 불가 SKU는 NaN
+        """
+        ...
+
+
+class DecayForecaster(DemandForecaster):
+    """
+    적응형 기하 감쇠 모델 (STEP 3 기본 모델)
+    - P_avg: 결품 직전 base_weeks 평균, r = (target / P_avg)^(1/W), W = 시즌 종료까지 잔여 주
+    - 예측: 결품 주차부터 P_avg * r^k (k = 1, 2, ...)
+    - P_avg <= target, base_weeks 미만 이력, 시즌 종료 이후 결품은 예측 불가
+    """
+    name = 'decay'
+
+    def __init__(self, target_end_sales: float = TARGET_END_SALES, base_weeks: int = BASE_WEEKS,
+                 season_end=None):
+        self.target_end_sales = target_end_sales
+        self.base_weeks = base_weeks
+        self.season_end = pd.Timestamp(season_end) if season_end is not None else get_season_end_date()
+
+    def forecast(self, panel, origin, valid=None):
+        valid = np.ones(panel.n, dtype=bool) if valid is None else valid
+        s = np.where(valid, origin, 0)
+        rows = np.arange(panel.n)
+
+        # 1. Base Velocity (P_avg)
+        p_avg = base_velocity(panel, s, self.base_weeks)
+
+        # 2. 잔여 기간 (W)
+        stockout_date = panel.dates[rows, np.minimum(s, panel.width - 1)] if panel.width else np.array([])
+        weeks_remaining = (np.datetime64(self.season_end) - stockout_date) / np.timedelta64(1, 'D') / 7
+        ok = valid & (s >= self.base_weeks) & (p_avg > self.target_end_sales) & (weeks_remaining > 0)
+
+        # 3. 감쇠율 r = (target / P_avg)^(1/W)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            decay = np.where(ok, (self.target_end_sales / p_avg) ** (1 / np.where(ok, weeks_remaining, 1)), 1.0)
+
+        # 4. 결품 주차부터 매주 감쇠 (좌→우 누적곱 = 기존 루프와 동일한 곱셈 순서)
+        step = panel.columns - s[:, None]
+        factors = np.where(step >= 0, decay[:, None], 1.0)
+        factors[:, 0] = np.where(s == 0, p_avg * decay, p_avg)
+        current = np.cumprod(factors, axis=1)
+
+        return np.where(_forecast_window(panel, s, ok), current, np.nan)
+
+
+class HoltForecaster(DemandForecaster):
+    """
+    Holt 지수평활 (감쇠 추세)
+    - 첫 판매 주차부터 origin 직전까지 level/trend 갱신 (주차 축 루프, SKU 축은 배열 연산)
+    - 예측: level + (phi + phi^2 + ... + phi^h) * trend, 0 미만은 0
+    """
+    name = 'holt'
+
+    def __init__(self, alpha: float = 0.5, beta: float = 0.1, phi: float = 0.9):
+        self.alpha = alpha
+        self.beta = beta
+        self.phi = phi
+
+    def forecast(self, panel, origin, valid=None):
+        valid = np.ones(panel.n, dtype=bool) if valid is None else valid
+        level = np.zeros(panel.n)
+        trend = np.zeros(panel.n)
+        started = np.zeros(panel.n, dtype=bool)
+
+        for t in range(panel.width):
+            x = panel.sales[:, t]
+            fit = valid & (t < origin) & (t < panel.lengths)
+            begin = fit & ~started & (x > 0)
+            update = fit & started
+            new_level = self.alpha * x + (1 - self.alpha) * (level + self.phi * trend)
+            new_trend = self.beta * (new_level - level) + (1 - self.beta) * self.phi * trend
+            level = np.where(update, new_level, np.where(begin, x, level))
+            trend = np.where(update, new_trend, trend)
+            started |= begin
+
+        h = np.maximum(panel.columns - origin[:, None] + 1, 1)
+        if self.phi == 1:
+            damp = h.astype(float)
+        else:
+            damp = self.phi * (1 - self.phi ** h) / (1 - self.phi)
+        predicted = np.maximum(level[:, None] + damp * trend[:, None], 0)
+        return np.where(_forecast_window(panel, origin, valid & started), predicted, np.nan)
+
+
+class SeasonalIndexForecaster(DemandForecaster):
+    """
+    아이템(카테고리) 단위 주차 계절지수 모델
+    - 계절지수: 카테고리별 ISO 주차 평균 판매 / 카테고리 평균 (결품 이후처럼 수요가 잘린
+      주차는 제외하고, 예측 대상이 아닌 SKU는 전 주차 사용)
+    - 예측: (origin 직전 base_weeks 평균 / 같은 주차 평균 지수) * 예측 주차 지수
+    - 관측이 없는 주차 지수는 직전 관측 주차 값을 사용
+    """
+    name = 'seasonal_index'
+
+    def __init__(self, base_weeks: int = BASE_WEEKS):
+        self.base_weeks = base_weeks
+
+    @staticmethod
+    def _iso_week(dates: np.ndarray) -> np.ndarray:
+        flat = pd.DatetimeIndex(dates.ravel())
+        week = flat.isocalendar().week.to_numpy(dtype=float, na_value=0)
+        return week.astype(np.int64).reshape(dates.shape)
+
+    def seasonal_index(self, panel: WeeklyPanel, train: np.ndarray) -> np.ndarray:
+        """(카테고리, 54) 계절지수 (train 칸만 사용)"""
+        category = panel.category if panel.category is not None else np.zeros(panel.n, dtype=np.int64)
+        n_cat = int(category.max()) + 1 if panel.n else 0
+        week = self._iso_week(panel.dates)
+        cat_grid = np.broadcast_to(category[:, None], panel.sales.shape)
+
+        totals = np.zeros((n_cat, 54))
+        counts = np.zeros((n_cat, 54))
+        np.add.at(totals, (cat_grid[train], week[train]), panel.sales[train])
+        np.add.at(counts, (cat_grid[train], week[train]), 1)
+
+        seen = counts > 0
+        profile = np.divide(totals, counts, out=np.zeros_like(totals), where=seen)
+        # 미관측 주차는 직전 관측 주차 값으로 채움
+        last_seen = np.maximum.accumulate(np.where(seen, np.arange(54)[None, :], 0), axis=1)
+        profile = np.take_along_axis(profile, last_seen, axis=1)
+        mean = np.array([profile[c, seen[c]].mean() if seen[c].any() else 0.0 for c in range(n_cat)])
+        return np.divide(profile, mean[:, None], out=np.zeros_like(profile), where=mean[:, None] > 0)
+
+    def forecast(self, panel, origin, valid=None):
+        valid = np.ones(panel.n, dtype=bool) if valid is None else valid
+        category = panel.category if panel.category is not None else np.zeros(panel.n, dtype=np.int64)
+        cols = panel.columns
+
+        train = panel.observed & (~valid[:, None] | (cols < origin[:, None]))
+        index = self.seasonal_index(panel, train)
+        week = self._iso_week(panel.dates)
+        sku_index = index[category[:, None], week]
+
+        base = (cols >= (origin - self.base_weeks)[:, None]) & (cols < origin[:, None]) & panel.observed
+        n_base = base.sum(axis=1)
+        level = np.where(base, panel.sales, 0).sum(axis=1) / np.maximum(n_base, 1)
+        base_index = np.where(base, sku_index, 0).sum(axis=1) / np.maximum(n_base, 1)
+
+        ok = valid & (n_base >= self.base_weeks) & (base_index > 0)
+        scale = np.divide(level, base_index, out=np.zeros(panel.n), where=base_index > 0)
+        predicted = scale[:, None] * sku_index
+        return np.where(_forecast_window(panel, origin, ok), predicted, np.nan)
+
+
+# ═══════════════════════════════════════════════════════════════
+# 레지스트리
+# ═══════════════════════════════════════════════════════════════
+
+FORECASTERS: Dict[str, type] = {
+    DecayForecaster.name: DecayForecaster,
+    HoltForecaster.name: HoltForecaster,
+    SeasonalIndexForecaster.name: SeasonalIndexForecaster,
+}
+
+
+def register_forecaster(cls: type) -> type:
+    """모델 클래스를 레지스트리에 등록 (데코레이터로 사용 가능)"""
+    FORECASTERS[cls.name] = cls
+    return cls
+
+
+def get_forecaster(name: str = 'decay', **kwargs) -> DemandForecaster:
+    """팩토리 함수: 모델 이름에 따라 DemandForecaster 반환"""
+    cls = FORECASTERS.get(name)
+    if cls is None:
+        raise ValueError(f"알 수 없는 예측 모델: {name} (사용 가능: {', '.join(FORECASTERS)})")
+    return cls(**kwargs)
+
+
+# ═══════════════════════════════════════════════════════════════
+# 공통 후처리
+# ═══════════════════════════════════════════════════════════════
+
+def finalize_predictions(predicted: np.ndarray, panel: WeeklyPanel,
+                         cutoff=SEASON_END_CUTOFF) -> np.ndarray:
+    """예측 → 정수 판매량 (반올림, 시즌 마감 이후 0, 예측 없는 칸은 -1)"""
+    has_value = ~np.isnan(predicted)
+    rounded = np.round(np.nan_to_num(predicted))
+    rounded = np.where(panel.dates <= np.datetime64(cutoff), rounded, 0)
+    return np.where(has_value, rounded, -1).astype(np.int64)
+
+
+def opportunity_loss(panel: WeeklyPanel, predicted_int: np.ndarray,
+                     cutoff=SEASON_END_CUTOFF) -> np.ndarray:
+    """
+    (SKU, 주) 기회비용 = max(0, 예측 - 실판매)
+
+    예측 없는 칸과 시즌 마감 이후 주차는 0 (마감 후 반품(음수 판매)이 손실로 잡히지 않도록)
+    """
+    loss = np.maximum(0, predicted_int - panel.sales)
+    counted = (predicted_int >= 0) & (panel.dates <= np.datetime64(cutoff))
+    return np.where(counted, loss, 0).astype(np.int64)
@@ -0,0 +1,134 @@
+"""
+진단별 스타일 랭킹 인덱스
+- AI_진단 버킷(hit/normal/early_shortage/shortage/risk)별로 스타일(PART_CD) 단위 총판매를 집계해
+  한 번만 정렬해 두고, 버킷별 상위 N개/페이지 조회는 구간 슬라이싱으로 처리
+- 정렬 기준: 버킷 순서 → 스타일 총판매 내림차순 → PART_CD 오름차순 (동률 시 안정적 순서 보장)
+- 대시보드 데이터 생성(STEP 2)과 API 목록 조회가 같은 랭킹 테이블을 재사용
+"""
+
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+# 버킷 키 → (대시보드 그룹, AI_진단 라벨), 정의 순서가 곧 버킷 순서
+DIAGNOSIS_BUCKETS = {
+    'hit': ('success', '🟢Hit (적기 소진)'),
+    'normal': ('success', '⚪Normal'),
+    'early_shortage': ('failure', '🚨Early Shortage (5월전 품절)'),
+    'shortage': ('failure', '⚠️Shortage (시즌중 품절)'),
+    'risk': ('failure', '🔴Risk (부진)'),
+}
+
+RANKING_COLUMNS = ['bucket', 'group', 'AI_진단', '순위', 'PART_CD', 'ITEM_NM',
+                   '대표컬러', '컬러수', '총판매', '대표컬러판매']
+
+DEFAULT_PAGE_SIZE = 20
+
+
+def build_ranking_table(result_df: pd.DataFrame) -> pd.DataFrame:
+    """
+    STEP 2 분석 결과(컬러 단위) → 진단 버킷별 스타일 랭킹 테이블
+
+    Args:
+        result_df: ITEM_NM, PART_CD, COLOR_CD, 총판매, AI_진단 컬럼을 가진 분석 결과
+
+    Returns:
+        RANKING_COLUMNS 순서의 정렬된 랭킹 테이블
+    """
+    bucket_keys = list(DIAGNOSIS_BUCKETS)
+    label_to_order = {label: i for i, (_, label) in enumerate(DIAGNOSIS_BUCKETS.values())}
+
+    df = pd.DataFrame({
+        'bucket_order': result_df['AI_진단'].astype(str).map(label_to_order),
+        'PART_CD': result_df['PART_CD'].astype(str),
+        'ITEM_NM': result_df['ITEM_NM'].astype(str),
+        'COLOR_CD': result_df['COLOR_CD'].astype(str),
+        '총판매': result_df['총판매'].astype(np.int64),
+    }).dropna(subset=['bucket_order'])
+    if df.empty:
+        return pd.DataFrame(columns=RANKING_COLUMNS)
+    df['bucket_order'] = df['bucket_order'].astype(int)
+
+    # 대표 컬러: 버킷·스타일 내 총판매 최대 컬러 (동률 시 COLOR_CD 오름차순)
+    df = df.sort_values(['bucket_order', 'PART_CD', '총판매', 'COLOR_CD'],
+                        ascending=[True, True, False, True], kind='mergesort')
+    styles = df.groupby(['bucket_order', 'PART_CD'], sort=False).agg(
+        ITEM_NM=('ITEM_NM', 'first'),
+        대표컬러=('COLOR_CD', 'first'),
+        컬러수=('COLOR_CD', 'size'),
+        총판매=('총판매', 'sum'),
+        대표컬러판매=('총판매', 'first'),
+    ).reset_index()
+
+    styles = styles.sort_values(['bucket_order', '총판매', 'PART_CD'],
+                                ascending=[True, False, True], kind='mergesort').reset_index(drop=True)
+    styles['순위'] = styles.groupby('bucket_order').cumcount() + 1
+    styles['bucket'] = [bucket_keys[i] for i in styles['bucket_order']]
+    styles['group'] = [DIAGNOSIS_BUCKETS[b][0] for b in styles['bucket']]
+    styles['AI_진단'] = [DIAGNOSIS_BUCKETS[b][1] for b in styles['bucket']]
+    return styles[RANKING_COLUMNS]
+
+
+class DiagnosisRanking:
+    """정렬된 랭킹 테이블 + 버킷별 구간 오프셋 (조회 시 재정렬/재필터링 없음)"""
+
+    def __init__(self, table: pd.DataFrame):
+        self.table = table.reset_index(drop=True)
+        buckets = self.table['bucket'].to_numpy(dtype=object)
+        self._offsets = {}
+        for key in DIAGNOSIS_BUCKETS:
+            idx = np.flatnonzero(buckets == key)
+            self._offsets[key] = (int(idx[0]), int(idx[-1]) + 1) if len(idx) else (0, 0)
+
+    @classmethod
+    def from_result(cls, result_df: pd.DataFrame) -> 'DiagnosisRanking':
+        return cls(build_ranking_table(result_df))
+
+    @classmethod
+    def load(cls, path: str) -> 'DiagnosisRanking':
+        """save()로 저장한 JSON 랭킹 로드"""
+        with open(path, 'r', encoding='utf-8') as f:
+            records = json.load(f)
+        return cls(pd.DataFrame(records, columns=RANKING_COLUMNS))
+
+    def save(self, path: str):
+        """랭킹 테이블을 JSON(레코드 리스트)으로 저장"""
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.table.to_dict(orient='records'), f, ensure_ascii=False, indent=2)
+
+    def count(self, bucket: str) -> int:
+        """버킷 내 스타일 수"""
+        start, end = self._offsets[bucket]
+        return end - start
+
+    def top(self, bucket: str, n: int = None) -> pd.DataFrame:
+        """버킷 상위 n개 스타일 (n=None이면 전체)"""
+        start, end = self._offsets[bucket]
+        if n is not None:
+            end = min(end, start + max(n, 0))
+        return self.table.iloc[start:end]
+
+    def page(self, bucket: str, page: int = 1, page_size: int = DEFAULT_PAGE_SIZE) -> dict:
+        """
+        버킷 페이지 조회 (page는 1부터 시작)
+
+        Returns:
+            {'bucket', 'page', 'page_size', 'total', 'total_pages', 'items'}
+        """
+        start, end = self._offsets[bucket]
+        total = end - start
+        page = max(int(page), 1)
+        page_size = max(int(page_size), 1)
+        lo = min(start + (page - 1) * page_size, end)
+        hi = min(lo + page_size, end)
+        return {
+            'bucket': bucket,
+            'page': page,
+            'page_size': page_size,
+            'total': total,
+            'total_pages': (total + page_size - 1) // page_size,
+            'items': self.table.iloc[lo:hi].to_dict(orient='records'),
+        }
@@ -0,0 +1,99 @@
+"""
+공유 dtype 정책: 데이터 수집(ingestion) 시점에 모든 STEP이 같은 메모리 표현을 사용하도록 정리
+- 차원 컬럼(PART_CD, COLOR_CD, ITEM_NM, CLASS2 ...) → category
+- 주차별 수량 컬럼 → int32
+- END_DT → datetime64
+- AI_진단 → 고정 카테고리 (열거형 코드)
+
+카테고리 키로 groupby 할 때는 반드시 observed=True 를 지정해야 함
+(미지정 시 다중 키 groupby가 카테고리 조합 전체(카테시안 곱)를 생성)
+"""
+
+import pandas as pd
+
+# 차원(키) 컬럼: 반복되는 문자열 → category 코드
+DIMENSION_COLUMNS = [
+    'PERIOD', 'SEASON_GB', 'BRD_CD',
+    'CLASS1', 'CLASS2', 'ITEM', 'ITEM_NM', 'PRDT_NM',
+    'PART_CD', 'STYLE_CD', 'COLOR_CD', 'SIZE_CD',
+]
+
+# 수량 컬럼: 정수 수량 → int32 (금액 곱셈이 필요한 TAG_PRICE는 제외)
+QTY_COLUMNS = [
+    'STOR_QTY_KR', 'SALE_QTY_CNS', 'STOCK_QTY_KR', 'ORDER_QTY',
+    'STOR_QTY', 'ORDER_QTY_KR', 'SALE_QTY_GLB', 'WH_QTY',
+    'IN_QTY', 'SALE_QTY', 'STOCK_QTY',
+]
+
+DATE_COLUMNS = ['END_DT']
+
+# AI_진단 열거형 (weekly_analysis.analyze_style_pattern 산출값)
+DIAGNOSIS_LABELS = [
+    '🟢Hit (적기 소진)',
+    '🟢Hit (고효율)',
+    '🚨Early Shortage (5월전 품절)',
+    '⚠️Shortage (시즌중 품절)',
+    '⚪Normal',
+    '🔴Risk (부진)',
+]
+DIAGNOSIS_DTYPE = pd.CategoricalDtype(DIAGNOSIS_LABELS)
+
+
+def memory_mb(df: pd.DataFrame) -> float:
+    """데이터프레임 메모리 사용량 (MB, object 내용 포함)"""
+    return df.memory_usage(deep=True).sum() / (1024 * 1024)
+
+
+def report_memory(df: pd.DataFrame, stage: str) -> float:
+    """단계별 메모리 사용량 출력 후 MB 값 반환"""
+    mb = memory_mb(df)
+    print(f"  [Memory] {stage}: {mb:.2f} MB ({len(df):,}행 x {len(df.columns)}컬럼)")
+    return mb
+
+
+def encode_diagnosis(series: pd.Series) -> pd.Series:
+    """AI_진단 문자열 → 고정 카테고리 (정의되지 않은 값은 카테고리 뒤에 추가)"""
+    values = series.astype(object).where(series.notna(), None)
+    extra = sorted(set(v for v in values.dropna().unique() if v not in DIAGNOSIS_LABELS))
+    dtype = DIAGNOSIS_DTYPE if not extra else pd.CategoricalDtype(DIAGNOSIS_LABELS + extra)
+    return values.astype(dtype)
+
+
+def apply_dtype_policy(df: pd.DataFrame, stage: str = None) -> pd.DataFrame:
+    """
+    공유 dtype 정책 적용 (원본은 변경하지 않고 변환된 복사본 반환)
+
+    Args:
+        df: 원본 데이터프레임
+        stage: 단계명 (지정 시 변환 전/후 메모리 리포트 출력)
+
+    Returns:
+        dtype 정책이 적용된 데이터프레임
+    """
+    before = memory_mb(df) if stage else None
+    df = df.copy()
+
+    for col in DATE_COLUMNS:
+        if col in df.columns and not pd.api.types.is_datetime64_any_dtype(df[col]):
+            df[col] = pd.to_datetime(df[col])
+
+    for col in QTY_COLUMNS:
+        if col in df.columns:
+            df[col] = pd.to_numeric(df[col], errors='coerce').fillna(0).round().astype('int32')
+
+    for col in DIMENSION_COLUMNS:
+        if col in df.columns:
+            if isinstance(df[col].dtype, pd.CategoricalDtype):
+                df[col] = df[col].cat.remove_unused_categories()
+            else:
+                df[col] = df[col].astype('category')
+
+    if 'AI_진단' in df.columns:
+        df['AI_진단'] = encode_diagnosis(df['AI_진단'])
+
+    if stage:
+        after = memory_mb(df)
+        ratio = before / after if after > 0 else 0
+        print(f"  [Memory] {stage}: {before:.2f} MB -> {after:.2f} MB (x{ratio:.1f} 절감)")
+
+    return df
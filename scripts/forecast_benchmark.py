@@ -0,0 +1,131 @@
+"""
+수요 예측 모델 벤치마크 (정확도 + 처리량)
+- 같은 주차별 데이터에서 결품이 발생하지 않은 SKU(수요가 잘리지 않은 실판매)를 골라
+  누적 판매 비중이 ORIGIN_SHARE에 도달한 주차를 가상 예측 시작점으로 두고,
+  이후 HORIZON 주 실판매와 각 모델 예측을 비교
+- 모든 모델은 demand_forecasters 레지스트리에서 생성해 동일한 패널/시작점으로 실행
+
+실행: python forecast_benchmark.py [모델명 ...]   (미지정 시 등록된 전체 모델)
+결과: ../output/Forecast_Benchmark.xlsx
+"""
+
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from config_loader import get_sell_through_threshold
+from sku_events import detect_sku_events
+from weekly_data import load_weekly
+from demand_forecasters import (BASE_WEEKS, FORECASTERS, get_forecaster, build_panel,
+                                finalize_predictions, pseudo_origin)
+
+OUTPUT_FILE = '../output/Forecast_Benchmark.xlsx'
+
+SKU_KEYS = ['PART_CD', 'COLOR_CD']
+ORIGIN_SHARE = 0.5   # 가상 예측 시작점: 시즌 누적 판매 비중 50% 도달 주차
+HORIZON = 8          # 평가 주차 수
+REPEAT = 5           # 처리량 측정 반복 횟수 (최소 소요시간 사용)
+
+
+def build_evaluation_set(weekly_df):
+    """
+    평가용 패널 + 가상 예측 시작점 + 평가 구간 마스크
+
+    Returns:
+        (패널, origin 배열, 평가 대상 SKU 배열, (SKU, 주) 평가 칸 마스크)
+    """
+    df, events = detect_sku_events(weekly_df, SKU_KEYS, get_sell_through_threshold())
+    panel, _, _, _ = build_panel(df, SKU_KEYS)
+
+    # 결품 미발생 SKU: origin 이후 실판매가 수요를 그대로 반영
+    uncensored = events['cross_idx'].to_numpy() < 0
+
+    origin = pseudo_origin(panel, ORIGIN_SHARE)
+    total = panel.sales.sum(axis=1)
+
+    cols = panel.columns
+    window = (cols >= origin[:, None]) & (cols < (origin + HORIZON)[:, None]) & panel.observed
+    enough = (origin >= BASE_WEEKS) & (window.sum(axis=1) == HORIZON)
+    valid = uncensored & enough & (total > 0)
+    return panel, origin, valid, window & valid[:, None]
+
+
+def _metrics(actual, predicted, mask):
+    """MAE / WAPE / Bias (mask 칸 기준)"""
+    if not mask.any():
+        return np.nan, np.nan, np.nan
+    err = predicted[mask] - actual[mask]
+    denom = actual[mask].sum()
+    mae = np.abs(err).mean()
+    wape = np.abs(err).sum() / denom * 100 if denom > 0 else np.nan
+    bias = err.sum() / denom * 100 if denom > 0 else np.nan
+    return mae, wape, bias
+
+
+def run_benchmark(weekly_df, model_names):
+    """모델별 정확도/처리량 테이블"""
+    panel, origin, valid, window = build_evaluation_set(weekly_df)
+    print(f"  * 평가 대상: {valid.sum()}개 SKU (결품 미발생, 시작점 이후 {HORIZON}주 이상)")
+
+    predictions = {}
+    rows = []
+    for name in model_names:
+        model = get_forecaster(name)
+        elapsed = []
+        for _ in range(REPEAT):
+            t0 = time.perf_counter()
+            raw = model.forecast(panel, origin, valid)
+            elapsed.append(time.perf_counter() - t0)
+        predicted = finalize_predictions(raw, panel)
+        covered = valid & (predicted >= 0).any(axis=1)
+        predictions[name] = (predicted, covered)
+
+        best = min(elapsed)
+        mae, wape, bias = _metrics(panel.sales, predicted, window & covered[:, None])
+        rows.append({
+            '모델': name,
+            '예측 SKU': int(covered.sum()),
+            '커버리지(%)': round(covered.sum() / max(valid.sum(), 1) * 100, 1),
+            'MAE': round(mae, 2),
+            'WAPE(%)': round(wape, 2),
+            'Bias(%)': round(bias, 2),
+            '소요(ms)': round(best * 1000, 2),
+            '처리량(SKU/s)': int(panel.n / best) if best > 0 else None,
+        })
+
+    # 모든 모델이 예측한 공통 SKU 기준 정확도 (모델 간 직접 비교용)
+    common = valid.copy()
+    for _, covered in predictions.values():
+        common &= covered
+    for row in rows:
+        predicted, _ = predictions[row['모델']]
+        _, wape, bias = _metrics(panel.sales, predicted, window & common[:, None])
+        row['공통 SKU'] = int(common.sum())
+        row['공통 WAPE(%)'] = round(wape, 2)
+        row['공통 Bias(%)'] = round(bias, 2)
+
+    return pd.DataFrame(rows).sort_values('공통 WAPE(%)', na_position='last').reset_index(drop=True)
+
+
+def main():
+    print("=" * 60)
+    print("수요 예측 모델 벤치마크 (정확도 + 처리량)")
+    print("=" * 60)
+
+    model_names = sys.argv[1:] or list(FORECASTERS)
+    print(f"  * 모델: {model_names}")
+
+    weekly_df = load_weekly(stage='Forecast Benchmark 주차별 데이터')
+    result_df = run_benchmark(weekly_df, model_names)
+    print(result_df.to_string(index=False))
+
+    os.makedirs(os.path.dirname(OUTPUT_FILE), exist_ok=True)
+    result_df.to_excel(OUTPUT_FILE, index=False)
+    print(f"* 벤치마크 결과 저장 완료: {OUTPUT_FILE}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,13 +1,14 @@
 """
 STEP 6: 사이즈 배분 데이터 생성
-- SizeAssortment.example.jsx의 샘플 데이터를 JSON으로 출력
-- 실데이터 확보 시 이 스크립트만 교체하면 됨
+- size_loss.py 결과(사이즈별 실판매 + 기회비용 커브)가 있으면 실데이터로 출력
+- 없으면 SizeAssortment.example.jsx의 샘플 데이터를 JSON으로 출력
 """
 
 import json
 import os
 
 OUTPUT_PATH = '../public/size_assortment_data.json'
+SIZE_CURVE_FILE = '../output/size_curve_data.json'  # size_loss.py 산출물
 
 SAMPLE_SALES_DATA = [
     {"CAT": "신발", "SUB_CAT": "운동화", "ColorRange": "Black", "SIZE_CD": 230, "SALE_QTY_CNS": 294},
@@ -36,22 +37,33 @@ SAMPLE_MAPPING_DATA = [
 ]
 
 
+def load_size_curves():
+    """size_loss.py 사이즈 커브 로드 (없으면 None)"""
+    if not os.path.exists(SIZE_CURVE_FILE):
+        return None
+    with open(SIZE_CURVE_FILE, 'r', encoding='utf-8') as f:
+        return json.load(f).get('salesData') or None
+
+
 def main():
     print("=" * 60)
     print("Step 6: 사이즈 배분 데이터 생성")
     print("=" * 60)
 
-    output = {
-        "salesData": SAMPLE_SALES_DATA,
-        "mappingData": SAMPLE_MAPPING_DATA,
-    }
+    sales_data = load_size_curves()
+    if sales_data is not None:
+        print(f"  * 사이즈 커브 사용: {SIZE_CURVE_FILE} (실판매 + 사이즈 기회비용)")
+        output = {"salesData": sales_data, "mappingData": []}
+    else:
+        print("  * 사이즈 커브 없음 → 샘플 데이터 사용")
+        output = {"salesData": SAMPLE_SALES_DATA, "mappingData": SAMPLE_MAPPING_DATA}
 
     os.makedirs(os.path.dirname(OUTPUT_PATH), exist_ok=True)
     with open(OUTPUT_PATH, 'w', encoding='utf-8') as f:
         json.dump(output, f, ensure_ascii=False, indent=2)
 
-    print(f"  * 판매 데이터: {len(SAMPLE_SALES_DATA)}건")
-    print(f"  * 매핑 데이터: {len(SAMPLE_MAPPING_DATA)}건")
+    print(f"  * 판매 데이터: {len(output['salesData'])}건")
+    print(f"  * 매핑 데이터: {len(output['mappingData'])}건")
     print(f"  * 저장 완료: {OUTPUT_PATH}")
     print("=" * 60)
 
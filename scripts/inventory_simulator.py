@@ -0,0 +1,196 @@
+"""
+주차별 재고 시뮬레이션 엔진 (AI제안 발주량 검증)
+- SKU별 발주량 x 입고 스케줄(주차별 입고 비중)로 입고를 만들고, 수요 곡선에 맞춰 재고를 주차별로 굴림
+- 판매 손실(lost sales) 재고 모델: 판매_t = min(수요_t, 전주 재고 + 입고_t)
+  → 누적 판매 C_t = 누적수요_t + min(0, min_{k<=t}(누적입고_k - 누적수요_k))
+  주차 루프 없이 누적 최소값(minimum.accumulate) 한 번으로 전체 SKU/발주안을 동시에 계산
+- 결과: 결품 주차, 기말 재고, 달성 판매율, 미충족 수요 (발주안 x SKU)
+- 수요 곡선: STEP 3 감쇠 모델로 복원한 잠재 수요 (결품 이후 예측, 그 외 실판매)
+
+실행: python inventory_simulator.py
+결과: ../output/25S_Inventory_Simulation.xlsx
+"""
+
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+from config_loader import get_sell_through_threshold, get_season_end_date
+from sku_events import detect_sku_events, pad_segments
+from weekly_data import load_weekly
+from demand_forecasters import BASE_WEEKS, DecayForecaster, build_panel, finalize_predictions
+
+TARGET_FILE = '../output/25S_TimeSeries_Analysis_Result.xlsx'  # STEP 3 AI제안 발주량
+OUTPUT_FILE = '../output/25S_Inventory_Simulation.xlsx'
+
+SKU_KEYS = ['PART_CD', 'COLOR_CD']
+SELL_THROUGH_DIVISOR = 0.75
+ORDER_MULTIPLIERS = np.round(np.arange(0.70, 1.31, 0.05), 2)  # 발주안 그리드 (AI제안 발주량 배수)
+MAX_CHUNK_BYTES = 256 * 1024 * 1024                          # 발주안 청크당 배열 메모리 상한
+
+
+def latent_demand(panel, predicted_int):
+    """STEP 3 예측으로 복원한 주차별 잠재 수요 (예측 칸은 max(예측, 실판매), 그 외 실판매)"""
+    return np.where(predicted_int >= 0, np.maximum(predicted_int, panel.sales), panel.sales)
+
+
+def inbound_schedule(stor_qty, observed):
+    """
+    실제 입고 이력 → 주차별 누적 입고 비중 (SKU, 주), 마지막 주차에서 1
+    입고 이력이 없는 SKU는 첫 주차 전량 입고
+    """
+    stor = np.where(observed, np.maximum(stor_qty, 0), 0).astype(float)
+    cum = np.cumsum(stor, axis=1)
+    total = cum[:, -1:] if stor.shape[1] else np.zeros((len(stor), 1))
+    no_inbound = (total[:, 0] <= 0)
+    share = np.divide(cum, total, out=np.zeros_like(cum), where=total > 0)
+    share[no_inbound] = 1.0
+    return share
+
+
+def simulate_inventory(order_qty, cum_inbound_share, demand, return_paths=False):
+    """
+    주차별 재고 시뮬레이션 (판매 손실 모델, 전체 SKU x 발주안 동시)
+
+    Args:
+        order_qty: (..., SKU) 발주량 (앞쪽 차원은 발주안)
+        cum_inbound_share: (SKU, 주) 누적 입고 비중 (0 ~ 1)
+        demand: (SKU, 주) 주차별 수요
+        return_paths: True면 주차별 누적 판매 'cum_sold' (..., SKU, 주) 포함
+
+    Returns:
+        {'stockout_week'(-1: 결품 없음), 'ending_stock', 'sold', 'received',
+         'lost', 'sell_through'} 배열 딕셔너리 (shape = order_qty.shape)
+    """
+    order_qty = np.asarray(order_qty, dtype=float)
+    cum_in = np.floor(order_qty[..., None] * cum_inbound_share)
+    cum_demand = np.cumsum(demand, axis=-1)
+
+    # 누적 판매 = 누적 수요 + min(0, 누적 (입고 - 수요) 최소값)
+    gap = np.minimum.accumulate(cum_in - cum_demand, axis=-1)
+    cum_sold = cum_demand + np.minimum(gap, 0)
+
+    unmet = cum_sold < cum_demand
+    stockout_week = np.where(unmet.any(axis=-1), unmet.argmax(axis=-1), -1)
+    received = cum_in[..., -1]
+    sold = cum_sold[..., -1]
+    result = {
+        'stockout_week': stockout_week,
+        'ending_stock': (received - sold).astype(np.int64),
+        'sold': sold.astype(np.int64),
+        'received': received.astype(np.int64),
+        'lost': (cum_demand[..., -1] - sold).astype(np.int64),
+        'sell_through': np.divide(sold, received, out=np.zeros_like(sold), where=received > 0),
+    }
+    if return_paths:
+        result['cum_sold'] = cum_sold
+    return result
+
+
+def simulate_plans(order_plans, cum_inbound_share, demand):
+    """발주안 (P, SKU) 일괄 평가: 메모리 상한에 맞춰 발주안 청크 단위로 simulate_inventory 실행"""
+    order_plans = np.atleast_2d(order_plans)
+    n_plans = len(order_plans)
+    per_plan = demand.size * 8 * 4
+    chunk = max(1, MAX_CHUNK_BYTES // max(per_plan, 1))
+    parts = [simulate_inventory(order_plans[lo:lo + chunk], cum_inbound_share, demand)
+             for lo in range(0, n_plans, chunk)]
+    return {key: np.concatenate([p[key] for p in parts]) for key in parts[0]}
+
+
+def ceil_10(values):
+    """10단위 올림 (배열)"""
+    return (np.ceil(values / 10) * 10).astype(np.int64)
+
+
+def build_simulation_inputs(weekly_df):
+    """
+    시뮬레이션 입력: SKU 정보(키, ITEM_NM, 총판매, 이벤트 주차, 초도입고), 패널, 누적 입고 비중, 잠재 수요, AI제안 발주량
+
+    AI제안 발주량은 STEP 3 결과 파일 값을 우선 사용하고,
+    없는 SKU는 (총판매 + 기회비용) / 0.75 10단위 올림으로 계산
+    """
+    df, events = detect_sku_events(weekly_df, SKU_KEYS, get_sell_through_threshold())
+    panel, df, starts, ends = build_panel(df, SKU_KEYS)
+
+    origin = events['cross_idx'].to_numpy()
+    valid = (origin >= 0) & (panel.lengths >= BASE_WEEKS)
+    predicted = finalize_predictions(DecayForecaster(season_end=get_season_end_date()).forecast(panel, origin, valid), panel)
+    demand = latent_demand(panel, predicted)
+
+    stor = pad_segments(df['STOR_QTY_KR'].to_numpy(dtype=np.int64), starts, ends)
+    share = inbound_schedule(stor, panel.observed)
+
+    keys = panel.keys.astype(str)
+    total_sale = panel.sales.sum(axis=1)
+    order = ceil_10(demand.sum(axis=1) / SELL_THROUGH_DIVISOR)
+    if os.path.exists(TARGET_FILE):
+        result = pd.read_excel(TARGET_FILE)
+        if 'AI제안 발주량' in result.columns:
+            lookup = (result.assign(PART_CD=result['PART_CD'].astype(str), COLOR_CD=result['COLOR_CD'].astype(str))
+                      .drop_duplicates(SKU_KEYS).set_index(SKU_KEYS)['AI제안 발주량'])
+            step3 = lookup.reindex(pd.MultiIndex.from_frame(keys)).to_numpy(dtype=float)
+            order = np.where(np.isnan(step3), order, step3).astype(np.int64)
+            print(f"  * STEP 3 AI제안 발주량 사용: {int((~np.isnan(step3)).sum())}개 SKU")
+
+    keys['ITEM_NM'] = df['ITEM_NM'].iloc[starts].astype(str).to_numpy() if 'ITEM_NM' in df.columns else ''
+    keys['총판매'] = total_sale.astype(np.int64)
+    for col in ['first_in_idx', 'reorder_idx', 'cross_idx']:
+        keys[col] = events[col].to_numpy()
+
+    # 초도 입고량: 첫 리오더 직전까지 누적 입고 (리오더가 없으면 전체 입고)
+    cum_stor = np.cumsum(stor, axis=1)
+    reorder_idx = events['reorder_idx'].to_numpy()
+    last = np.where(reorder_idx > 0, reorder_idx - 1, panel.lengths - 1)
+    keys['초도입고'] = cum_stor[np.arange(panel.n), np.maximum(last, 0)].astype(np.int64) if panel.width else 0
+    return keys, panel, share, demand, order
+
+
+def main():
+    print("=" * 60)
+    print("주차별 재고 시뮬레이션 (AI제안 발주량 검증)")
+    print("=" * 60)
+
+    weekly_df = load_weekly(stage='Inventory Simulation 주차별 데이터')
+    keys, panel, share, demand, order = build_simulation_inputs(weekly_df)
+
+    # 1. AI제안 발주량 그대로: SKU별 재고 궤적 요약
+    base = simulate_inventory(order, share, demand)
+    week_dates = panel.dates[np.arange(panel.n), np.maximum(base['stockout_week'], 0)]
+    sku_df = keys[['ITEM_NM', 'PART_CD', 'COLOR_CD', '총판매']].copy()
+    sku_df['잠재수요'] = demand.sum(axis=1).astype(np.int64)
+    sku_df['AI제안 발주량'] = order
+    sku_df['결품주차'] = np.where(base['stockout_week'] >= 0,
+                              pd.DatetimeIndex(week_dates).strftime('%Y-%m-%d'), '')
+    sku_df['기말재고'] = base['ending_stock']
+    sku_df['미충족수요'] = base['lost']
+    sku_df['달성 판매율(%)'] = np.round(base['sell_through'] * 100, 1)
+
+    # 2. 발주안 그리드 (배수 x 전체 SKU) 일괄 평가
+    plans = ceil_10(ORDER_MULTIPLIERS[:, None] * order[None, :])
+    t0 = time.perf_counter()
+    grid = simulate_plans(plans, share, demand)
+    elapsed = time.perf_counter() - t0
+    print(f"  * 발주안 {plans.size:,}개 ({len(plans)}안 x {panel.n}개 SKU) 시뮬레이션: {elapsed * 1000:.1f}ms")
+
+    plan_df = pd.DataFrame({
+        '발주 배수': ORDER_MULTIPLIERS,
+        '총발주량': plans.sum(axis=1),
+        '결품 SKU': (grid['stockout_week'] >= 0).sum(axis=1),
+        '미충족수요': grid['lost'].sum(axis=1),
+        '기말재고': grid['ending_stock'].sum(axis=1),
+        '전체 판매율(%)': np.round(grid['sold'].sum(axis=1) / np.maximum(grid['received'].sum(axis=1), 1) * 100, 1),
+    })
+    print(plan_df.to_string(index=False))
+
+    os.makedirs(os.path.dirname(OUTPUT_FILE), exist_ok=True)
+    with pd.ExcelWriter(OUTPUT_FILE, engine='openpyxl') as writer:
+        sku_df.to_excel(writer, sheet_name='SKU_Simulation', index=False)
+        plan_df.to_excel(writer, sheet_name='Plan_Grid', index=False)
+    print(f"* 재고 시뮬레이션 결과 저장 완료: {OUTPUT_FILE}")
+
+
+if __name__ == "__main__":
+    main()
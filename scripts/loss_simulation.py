@@ -0,0 +1,200 @@
+"""
+기회비용 몬테카를로 시뮬레이션 (불확실성 밴드)
+- STEP 3 감쇠 모델 예측 곡선을 평균 수요로 두고 SKU별 수천 개 수요 경로를 생성
+- 노이즈: 포아송 또는 음이항(감마-포아송 혼합), 분산계수는 결품 이전 주차 실판매로 보정
+  (Var = mu + alpha * mu^2, 아이템(ITEM_NM) 단위로 풀링)
+- (SKU, 경로, 주) 배열로 한 번에 계산하되 메모리 상한에 맞춰 SKU 청크 단위로 처리
+- 결과: SKU별 기회비용 / AI제안 발주량 P10 / P50 / P90 (+ STEP 3 점추정)
+
+실행: python loss_simulation.py [경로 수] [poisson|nb]
+결과: ../output/25S_Loss_Simulation.xlsx
+"""
+
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from config_loader import get_sell_through_threshold, get_season_end_date
+from dtype_policy import apply_dtype_policy
+from sku_events import detect_sku_events
+from weekly_data import read_current_weekly
+from demand_forecasters import (BASE_WEEKS, SEASON_END_CUTOFF, DecayForecaster, build_panel,
+                                finalize_predictions, opportunity_loss)
+
+ANALYSIS_RESULT_FILE = '../output/25S_TimeSeries_Analysis_Result.xlsx'
+OUTPUT_FILE = '../output/25S_Loss_Simulation.xlsx'
+
+SKU_KEYS = ['PART_CD', 'COLOR_CD']
+N_PATHS = 2000
+NOISE_MODEL = 'nb'                   # 'poisson' | 'nb'
+SELL_THROUGH_DIVISOR = 0.75          # AI제안 발주량 = (총판매 + 기회비용) / 0.75, 10단위 올림
+PERCENTILES = [10, 50, 90]
+MAX_CHUNK_BYTES = 256 * 1024 * 1024  # 청크당 (SKU, 경로, 주) 배열 메모리 상한
+SEED = 42
+
+
+def load_inputs():
+    """STEP 3 대상 품번(AI_진단 기준) + 당해 주차별 데이터"""
+    df = read_current_weekly()
+
+    if os.path.exists(ANALYSIS_RESULT_FILE):
+        result = pd.read_excel(ANALYSIS_RESULT_FILE)
+        diagnosis = result['AI_진단'].astype(str)
+        loss_mask = (diagnosis.str.contains('Early Shortage', na=False)
+                     | diagnosis.str.contains(r'Shortage \(시즌중', na=False)
+                     | diagnosis.str.contains(r'Hit \(적기', na=False))
+        part_codes = result.loc[loss_mask, 'PART_CD'].unique()
+        df = df[df['PART_CD'].isin(part_codes)]
+        print(f"  * 기회비용 계산 대상 품번: {len(part_codes)}개")
+    else:
+        print(f"  [경고] {ANALYSIS_RESULT_FILE}이 없어 전체 품번을 대상으로 합니다.")
+
+    return apply_dtype_policy(df, stage='Loss Simulation 주차별 데이터')
+
+
+def calibrate_dispersion(panel, origin, valid, window=3):
+    """
+    결품 이전 주차의 과산포 계수 alpha (아이템 단위 풀링, 적률법)
+
+    주차별 기대값은 중심 이동평균(window주)으로 두고
+    alpha = max(0, (sum (x - mu)^2 - sum mu) / sum mu^2)
+    """
+    n, width = panel.sales.shape
+    pad = window // 2
+    padded = np.pad(panel.sales, ((0, 0), (pad, pad)))
+    cum = np.concatenate([np.zeros((n, 1)), np.cumsum(padded, axis=1)], axis=1)
+    mu = (cum[:, window:] - cum[:, :-window]) / window
+
+    cols = panel.columns
+    first_sale = np.where((panel.sales > 0).any(axis=1), (panel.sales > 0).argmax(axis=1), width)
+    pre = (valid[:, None] & (cols >= first_sale[:, None]) & (cols < origin[:, None])
+           & panel.observed & (mu > 0))
+
+    excess = np.where(pre, (panel.sales - mu) ** 2 - mu, 0).sum(axis=1)
+    scale = np.where(pre, mu ** 2, 0).sum(axis=1)
+
+    category = panel.category if panel.category is not None else np.zeros(n, dtype=np.int64)
+    n_cat = int(category.max()) + 1 if n else 0
+    cat_excess = np.bincount(category, weights=excess, minlength=n_cat)
+    cat_scale = np.bincount(category, weights=scale, minlength=n_cat)
+    alpha = np.divide(cat_excess, cat_scale, out=np.zeros(n_cat), where=cat_scale > 0)
+    return np.maximum(alpha, 0)[category]
+
+
+def simulate_losses(mean_demand, actual, active, alpha, n_paths, rng, noise_model=NOISE_MODEL):
+    """
+    (SKU, 경로) 시뮬레이션 기회비용 합계
+
+    Args:
+        mean_demand: (SKU, 주) 평균 수요 (예측 구간 밖은 0)
+        actual: (SKU, 주) 실판매
+        active: (SKU, 주) 예측 구간 (시즌 마감 이전)
+        alpha: (SKU,) 과산포 계수 (0이면 포아송)
+    """
+    n, width = mean_demand.shape
+    per_sku_bytes = n_paths * width * 8 * 3
+    chunk = max(1, MAX_CHUNK_BYTES // max(per_sku_bytes, 1))
+    totals = np.zeros((n, n_paths), dtype=np.int64)
+
+    for lo in range(0, n, chunk):
+        hi = min(lo + chunk, n)
+        mu = np.broadcast_to(mean_demand[lo:hi, None, :], (hi - lo, n_paths, width))
+        if noise_model == 'nb':
+            a = alpha[lo:hi, None, None]
+            shape = np.divide(1.0, a, out=np.full_like(a, np.inf), where=a > 0)
+            gamma = rng.gamma(np.where(np.isinf(shape), 1.0, shape), np.where(a > 0, a, 1.0),
+                              size=mu.shape)
+            lam = np.where(a > 0, mu * gamma, mu)
+        else:
+            lam = mu
+        demand = rng.poisson(lam)
+        lost = np.maximum(0, demand - actual[lo:hi, None, :])
+        totals[lo:hi] = np.where(active[lo:hi, None, :], lost, 0).sum(axis=2)
+    return totals
+
+
+def ceil_10(values):
+    """10단위 올림 (배열)"""
+    return (np.ceil(values / 10) * 10).astype(np.int64)
+
+
+def run_simulation(weekly_df, n_paths=N_PATHS, noise_model=NOISE_MODEL, seed=SEED):
+    """SKU별 기회비용/발주량 분위수 테이블"""
+    df, events = detect_sku_events(weekly_df, SKU_KEYS, get_sell_through_threshold())
+    panel, df, starts, _ = build_panel(df, SKU_KEYS)
+
+    origin = events['cross_idx'].to_numpy()
+    valid = (origin >= 0) & (panel.lengths >= BASE_WEEKS)
+
+    # STEP 3 점추정 (동일 감쇠 모델)
+    forecaster = DecayForecaster(season_end=get_season_end_date())
+    raw = forecaster.forecast(panel, origin, valid)
+    point_pred = finalize_predictions(raw, panel)
+    point_loss = opportunity_loss(panel, point_pred).sum(axis=1)
+    covered = (point_pred >= 0).any(axis=1) & (point_loss > 0)
+
+    sim = panel.subset(np.flatnonzero(covered))
+    mean_demand = np.nan_to_num(raw[covered])
+    active = ~np.isnan(raw[covered]) & (sim.dates <= np.datetime64(SEASON_END_CUTOFF))
+    mean_demand = np.where(active, mean_demand, 0)
+
+    alpha = (calibrate_dispersion(sim, origin[covered], np.ones(sim.n, dtype=bool))
+             if noise_model == 'nb' else np.zeros(sim.n))
+
+    rng = np.random.default_rng(seed)
+    t0 = time.perf_counter()
+    lost = simulate_losses(mean_demand, sim.sales, active, alpha, n_paths, rng, noise_model)
+    elapsed = time.perf_counter() - t0
+    print(f"  * 시뮬레이션: {sim.n}개 SKU x {n_paths}개 경로 x {sim.width}주 ({elapsed:.2f}초)")
+
+    total_sale = sim.sales.sum(axis=1)
+    orders = ceil_10((total_sale[:, None] + lost) / SELL_THROUGH_DIVISOR)
+    lost_q = np.percentile(lost, PERCENTILES, axis=1)
+    order_q = np.percentile(orders, PERCENTILES, axis=1)
+
+    info = df.iloc[starts[covered]]
+    result = pd.DataFrame({
+        'ITEM_NM': info['ITEM_NM'].astype(str).to_numpy() if 'ITEM_NM' in info else '',
+        'PART_CD': info['PART_CD'].astype(str).to_numpy(),
+        'COLOR_CD': info['COLOR_CD'].astype(str).to_numpy(),
+        '결품시점': sim.dates[np.arange(sim.n), origin[covered]].astype('datetime64[D]').astype(str),
+        '총판매': total_sale.astype(np.int64),
+        '분산계수(alpha)': np.round(alpha, 4),
+        '기회비용(점추정)': point_loss[covered].astype(np.int64),
+    })
+    for i, p in enumerate(PERCENTILES):
+        result[f'기회비용 P{p}'] = np.round(lost_q[i]).astype(np.int64)
+    result['AI제안 발주량(점추정)'] = ceil_10((total_sale + point_loss[covered]) / SELL_THROUGH_DIVISOR)
+    for i, p in enumerate(PERCENTILES):
+        result[f'발주량 P{p}'] = ceil_10(order_q[i])
+    return result.sort_values('기회비용 P50', ascending=False).reset_index(drop=True)
+
+
+def main():
+    print("=" * 60)
+    print("기회비용 몬테카를로 시뮬레이션 (P10 / P50 / P90)")
+    print("=" * 60)
+
+    n_paths = int(sys.argv[1]) if len(sys.argv) > 1 else N_PATHS
+    noise_model = sys.argv[2] if len(sys.argv) > 2 else NOISE_MODEL
+    if noise_model not in ('poisson', 'nb'):
+        raise ValueError(f"알 수 없는 노이즈 모델: {noise_model} (poisson | nb)")
+    print(f"  * 경로 수: {n_paths}, 노이즈 모델: {noise_model}")
+
+    weekly_df = load_inputs()
+    result = run_simulation(weekly_df, n_paths, noise_model)
+
+    print(result.head(10).to_string(index=False))
+    print(f"  * 총 기회비용: 점추정 {result['기회비용(점추정)'].sum():,} / "
+          f"P50 합계 {result['기회비용 P50'].sum():,}")
+
+    os.makedirs(os.path.dirname(OUTPUT_FILE), exist_ok=True)
+    result.to_excel(OUTPUT_FILE, index=False)
+    print(f"* 시뮬레이션 결과 저장 완료: {OUTPUT_FILE}")
+
+
+if __name__ == "__main__":
+    main()
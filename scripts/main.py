@@ -15,19 +15,22 @@ from openpyxl import load_workbook
 import os
 import io
 import json
-from config_loader import get_grade_thresholds
+from config_loader import get_grade_thresholds, get_yoy_analysis_enabled
+from dtype_policy import apply_dtype_policy
+from yoy_analysis import STYLE_KEY, carryover_key, normalize_period, split_periods, yoy_sell_through
 
 
 # ============================================
 # 1. 데이터 로딩 및 전처리
 # ============================================
 
-def load_and_preprocess_data(file_path: str) -> pd.DataFrame:
+def load_and_preprocess_data(file_path: str, keep_prior: bool = False) -> pd.DataFrame:
     """
     엑셀 파일을 로드하고 전처리하는 함수
     
     Args:
         file_path: 입력 엑셀 파일 경로
+        keep_prior: True면 전년 데이터도 유지 (SEASON_GB를 '당해'/'전년'으로 정규화)
         
     Returns:
         전처리된 데이터프레임
@@ -94,8 +97,13 @@ def load_and_preprocess_data(file_path: str) -> pd.DataFrame:
                     print(f"[정보] '{col}' 컬럼을 SEASON_GB로 사용합니다.")
                     break
     
-    # 25S 시즌 데이터만 필터링
-    if 'SEASON_GB' in df.columns:
+    # 25S 시즌 데이터만 필터링 (YoY 분석 시 당해/전년 모두 유지)
+    if 'SEASON_GB' in df.columns and keep_prior:
+        df['SEASON_GB'] = normalize_period(df['SEASON_GB'])
+        df = df[df['SEASON_GB'].notna()].copy()
+        counts = df['SEASON_GB'].value_counts()
+        print(f"[정보] 당해/전년 동시 로드: 당해 {counts.get('당해', 0)}행, 전년 {counts.get('전년', 0)}행")
+    elif 'SEASON_GB' in df.columns:
         before_count = len(df)
         df = df[df['SEASON_GB'].astype(str).str.contains('당해', na=False)].copy()
         after_count = len(df)
@@ -150,6 +158,9 @@ def load_and_preprocess_data(file_path: str) -> pd.DataFrame:
         print(f"[경고] TAG_PRICE 로딩 실패: {e}")
         df['TAG_PRICE'] = 0
 
+    # 공유 dtype 정책 적용 (차원 컬럼 category, 수량 int32)
+    df = apply_dtype_policy(df, stage='STEP1 원본 데이터')
+
     return df
 
 
@@ -227,20 +238,20 @@ def analyze_class_balance(df: pd.DataFrame) -> pd.DataFrame:
         return pd.DataFrame()
     
     # CLASS2별 집계
-    class_summary = df.groupby('CLASS2').agg({
+    class_summary = df.groupby('CLASS2', observed=True).agg({
         'IN_QTY': 'sum',
         'SALE_QTY': 'sum',
         'STOCK_QTY': 'sum'
     }).reset_index()
 
     # 매출금액 집계
-    class_summary['SALE_AMT'] = df.groupby('CLASS2').apply(
+    class_summary['SALE_AMT'] = df.groupby('CLASS2', observed=True).apply(
         lambda g: (g['SALE_QTY'] * g['TAG_PRICE']).sum()
     ).values
-    class_summary['IN_AMT'] = df.groupby('CLASS2').apply(
+    class_summary['IN_AMT'] = df.groupby('CLASS2', observed=True).apply(
         lambda g: (g['IN_QTY'] * g['TAG_PRICE']).sum()
     ).values
-    class_summary['AVG_PRICE'] = df.groupby('CLASS2').apply(
+    class_summary['AVG_PRICE'] = df.groupby('CLASS2', observed=True).apply(
         lambda g: int((g['SALE_QTY'] * g['TAG_PRICE']).sum() / g['SALE_QTY'].sum()) if g['SALE_QTY'].sum() > 0 else 0
     ).values
 
@@ -325,7 +336,7 @@ def analyze_item_efficiency(df: pd.DataFrame) -> pd.DataFrame:
         return pd.DataFrame()
     
     # ITEM_NM별 집계
-    item_summary = df.groupby(['CLASS2', 'ITEM_NM']).agg({
+    item_summary = df.groupby(['CLASS2', 'ITEM_NM'], observed=True).agg({
         'IN_QTY': 'sum',
         'SALE_QTY': 'sum',
         'STOCK_QTY': 'sum'
@@ -454,7 +465,7 @@ def analyze_style_detail(df: pd.DataFrame) -> pd.DataFrame:
     else:
         agg_dict['IN_QTY'] = 'sum'
     
-    style_df = df.groupby(['CLASS1', 'CLASS2', 'ITEM_NM', 'STYLE_CD']).agg(agg_dict).reset_index()
+    style_df = df.groupby(['CLASS1', 'CLASS2', 'ITEM_NM', 'STYLE_CD'], observed=True).agg(agg_dict).reset_index()
     
     # 판매율 계산 (발주수량 대비 판매)
     if 'ORDER_QTY' in style_df.columns:
@@ -533,6 +544,48 @@ def analyze_style_detail(df: pd.DataFrame) -> pd.DataFrame:
     return result_df
 
 
+# ============================================
+# 5-1. 전년 대비(YoY) 분석
+# ============================================
+
+def analyze_yoy(df_all: pd.DataFrame) -> Dict[str, pd.DataFrame]:
+    """
+    당해/전년 동시 집계 기반 복종·아이템·스타일 YoY 증감 분석
+    
+    Args:
+        df_all: 당해/전년이 함께 있는 전처리 데이터프레임 (SEASON_GB = '당해'/'전년')
+        
+    Returns:
+        {'YoY_Class', 'YoY_Item', 'YoY_Style'} 시트명별 결과 데이터프레임
+    """
+    print("[5-1단계] 전년 대비(YoY) 분석 중...")
+    
+    if 'SEASON_GB' not in df_all.columns:
+        print("[경고] SEASON_GB 컬럼이 없어 YoY 분석을 건너뜁니다.")
+        return {}
+    
+    df_all = df_all.copy()
+    df_all[STYLE_KEY] = carryover_key(df_all['STYLE_CD'])
+    base_col = 'ORDER_QTY' if 'ORDER_QTY' in df_all.columns else 'IN_QTY'
+    
+    # 복종/아이템은 입고 대비, 스타일은 발주 대비 판매율 (Level 2~4 기준과 동일)
+    yoy_tables = {
+        'YoY_Class': yoy_sell_through(df_all, ['CLASS2'], 'SEASON_GB', 'SALE_QTY', 'IN_QTY'),
+        'YoY_Item': yoy_sell_through(df_all, ['CLASS2', 'ITEM_NM'], 'SEASON_GB', 'SALE_QTY', 'IN_QTY'),
+        'YoY_Style': yoy_sell_through(df_all, ['CLASS2', 'ITEM_NM', STYLE_KEY], 'SEASON_GB', 'SALE_QTY', base_col),
+    }
+    
+    style_yoy = yoy_tables['YoY_Style']
+    matched = (style_yoy['비교구분'] == '연속').sum()
+    print(f"  * 복종 {len(yoy_tables['YoY_Class'])}개, 아이템 {len(yoy_tables['YoY_Item'])}개, "
+          f"스타일 {len(style_yoy)}개 (전년 연속 스타일 {matched}개)")
+    
+    for name, table in yoy_tables.items():
+        yoy_tables[name] = table.sort_values('판매_증감', ascending=False).reset_index(drop=True)
+    
+    return yoy_tables
+
+
 # ============================================
 # 6. AI 코멘트 생성 함수 (스타일별)
 # ============================================
@@ -1141,7 +1194,8 @@ def create_result_excel(
     class_analysis: pd.DataFrame,
     item_analysis: pd.DataFrame,
     style_analysis: pd.DataFrame,
-    output_path: str
+    output_path: str,
+    yoy_tables: Dict[str, pd.DataFrame] = None
 ) -> None:
     """
     분석 결과를 엑셀 파일로 생성하는 함수
@@ -1152,6 +1206,7 @@ def create_result_excel(
         item_analysis: 아이템별 분석 결과
         style_analysis: 스타일별 분석 결과
         output_path: 출력 파일 경로
+        yoy_tables: 전년 대비 분석 결과 (시트명 → 데이터프레임, 없으면 생략)
     """
     print(f"[6단계] 결과 엑셀 파일 생성 중: {output_path}")
     
@@ -1204,6 +1259,10 @@ def create_result_excel(
             pd.DataFrame({'메시지': ['데이터가 없습니다.']}).to_excel(
                 writer, sheet_name='Style_Action_Plan', index=False
             )
+        
+        # 5. YoY 시트 (전년 대비 분석)
+        for sheet_name, table in (yoy_tables or {}).items():
+            table.to_excel(writer, sheet_name=sheet_name, index=False)
     
     # with 블록이 끝나면 파일이 자동으로 저장되고 닫힘
     # 이제 파일을 다시 열어서 이미지를 삽입할 수 있음
@@ -1443,8 +1502,13 @@ def main():
     output_file = "../output/25S_Analysis_Result.xlsx"
     
     try:
-        # 1. 데이터 로딩 및 전처리
-        df = load_and_preprocess_data(input_file)
+        # 1. 데이터 로딩 및 전처리 (YoY 분석 시 전년 데이터도 함께 로드)
+        yoy_enabled = get_yoy_analysis_enabled()
+        df = load_and_preprocess_data(input_file, keep_prior=yoy_enabled)
+        df_all = None
+        if yoy_enabled and 'SEASON_GB' in df.columns:
+            df_all = df
+            df, _ = split_periods(df_all, 'SEASON_GB')
         
         if df.empty:
             print("[오류] 데이터가 없습니다. 입력 파일을 확인해주세요.")
@@ -1471,13 +1535,19 @@ def main():
         print(f"스타일 분석 완료: {len(style_analysis)}개 스타일")
         print()
         
+        # 5-1. 전년 대비(YoY) 분석
+        yoy_tables = analyze_yoy(df_all) if df_all is not None else {}
+        if yoy_tables:
+            print()
+        
         # 6. 결과 엑셀 파일 생성
         create_result_excel(
             total_health,
             class_analysis,
             item_analysis,
             style_analysis,
-            output_file
+            output_file,
+            yoy_tables
         )
 
         # 7. 프론트엔드용 JSON 출력
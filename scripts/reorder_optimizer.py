@@ -0,0 +1,160 @@
+"""
+리오더 타이밍 최적화 (아이템별 리오더 주차 / 수량 제안)
+- STEP 2에서 감지한 최초입고 / 리오더 / 판매율 임계 돌파 이력 + STEP 3 잠재 수요 곡선 사용
+- 후보안: (리오더 입고 주차 = 최초입고 + w주) x (리오더 배수 m)
+  → 최초입고 주차에 초도 입고량, 리드타임(REORDER_LEAD_WEEKS) 전 결정 시점까지의
+    판매 실적 x m 을 리오더 주차에 추가 입고 (빠른 리오더 = 정보 부족, 늦은 리오더 = 결품 노출)
+- 모든 SKU x 후보안을 inventory_simulator로 일괄 시뮬레이션하고
+  아이템(ITEM_NM)별 기대 손실 = 미충족수요 x LOST_SALES_WEIGHT + 기말재고 x LEFTOVER_WEIGHT 최소안 선택
+- 결과: 25S_TimeSeries_Analysis_Result.xlsx 'Reorder_Timing' 시트 + dashboard_data.json 'reorderTiming' 섹션
+  (STEP 3가 시계열 결과 파일을 첫 시트만 다시 쓰므로 STEP 3 이후 실행)
+
+실행: python reorder_optimizer.py
+"""
+
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+from inventory_simulator import build_simulation_inputs, simulate_inventory
+from weekly_data import load_weekly
+from artifact_io import write_json_atomic
+
+TARGET_FILE = '../output/25S_TimeSeries_Analysis_Result.xlsx'
+JSON_FILE = '../public/dashboard_data.json'
+SHEET_NAME = 'Reorder_Timing'
+
+REORDER_LEAD_WEEKS = 4                                    # 리오더 결정 → 입고 리드타임 (주)
+REORDER_WEEKS = np.arange(REORDER_LEAD_WEEKS + 1, 25)      # 최초입고 후 리오더 입고 주차 후보
+REORDER_MULTIPLES = np.round(np.arange(0.25, 2.01, 0.25), 2)  # 결정 시점 판매 실적 대비 리오더 수량 배수
+LOST_SALES_WEIGHT = 1.0    # 미충족 수요 1개당 비용
+LEFTOVER_WEIGHT = 0.5      # 기말 재고 1개당 비용 (판매 손실 대비)
+MAX_CHUNK_BYTES = 256 * 1024 * 1024
+
+
+def candidate_plans():
+    """(리오더 주차, 리오더 배수) 후보 배열, 첫 후보(배수 0)는 리오더 없음"""
+    weeks, multiples = np.meshgrid(REORDER_WEEKS, REORDER_MULTIPLES, indexing='ij')
+    weeks = np.r_[0, weeks.ravel()]
+    multiples = np.r_[0.0, multiples.ravel()]
+    return weeks, multiples
+
+
+def evaluate_plans(first_in, initial, demand, weeks, multiples):
+    """
+    후보안 x SKU 일괄 시뮬레이션
+
+    Returns:
+        (후보안, SKU) 리오더 수량 / 미충족수요 / 기말재고 배열
+    """
+    n, width = demand.shape
+    cols = np.arange(width)
+    rows = np.arange(n)
+    initial_share = (cols >= first_in[:, None]).astype(float)
+
+    # 결정 시점 판매 실적: 리오더 이전 구간은 후보안과 무관하므로 초도 입고만의 누적 판매 사용
+    base = simulate_inventory(initial, initial_share, demand, return_paths=True)
+    decision = np.clip(first_in[None, :] + weeks[:, None] - REORDER_LEAD_WEEKS, 0, max(width - 1, 0))
+    reorder_qty = np.ceil(multiples[:, None] * base['cum_sold'][rows[None, :], decision] / 10) * 10
+
+    per_plan = n * width * 8 * 5
+    chunk = max(1, MAX_CHUNK_BYTES // max(per_plan, 1))
+    lost = np.zeros((len(weeks), n), dtype=np.int64)
+    leftover = np.zeros((len(weeks), n), dtype=np.int64)
+    for lo in range(0, len(weeks), chunk):
+        w = weeks[lo:lo + chunk, None, None]
+        q = reorder_qty[lo:lo + chunk, :, None]
+        total = initial[:, None] + q
+        arrived = initial[:, None] * initial_share + q * (cols >= (first_in[:, None] + w))
+        share = np.divide(arrived, total, out=np.zeros_like(arrived), where=total > 0)
+        result = simulate_inventory(total[..., 0], share, demand)
+        lost[lo:lo + chunk] = result['lost']
+        leftover[lo:lo + chunk] = result['ending_stock']
+    return reorder_qty.astype(np.int64), lost, leftover
+
+
+def optimize_reorder_timing(keys, demand):
+    """아이템별 최적 리오더 주차 / 수량 테이블"""
+    first_in = np.maximum(keys['first_in_idx'].to_numpy(), 0)
+    initial = keys['초도입고'].to_numpy(dtype=float)
+    weeks, multiples = candidate_plans()
+    reorder_qty, lost, leftover = evaluate_plans(first_in, initial, demand, weeks, multiples)
+    cost = lost * LOST_SALES_WEIGHT + leftover * LEFTOVER_WEIGHT
+    print(f"  * 후보안 {len(weeks)}개 x {len(initial)}개 SKU 시뮬레이션 완료")
+
+    # 아이템별 합산: (후보안, SKU) @ (SKU, 아이템) 원-핫
+    item_codes, items = pd.factorize(keys['ITEM_NM'])
+    onehot = np.zeros((len(initial), len(items)))
+    onehot[np.arange(len(initial)), item_codes] = 1
+    item_cost = cost @ onehot
+    item_lost = lost @ onehot
+    item_left = leftover @ onehot
+    item_reorder = reorder_qty @ onehot
+    best = item_cost.argmin(axis=0)
+    cols = np.arange(len(items))
+    item_initial = np.bincount(item_codes, weights=initial, minlength=len(items))
+
+    # 과거 이력: 최초입고 → 리오더 / 판매율 임계 돌파까지 경과 주차 (아이템 중앙값)
+    history = keys.assign(
+        리오더경과=np.where(keys['reorder_idx'] >= 0, keys['reorder_idx'] - keys['first_in_idx'], np.nan),
+        돌파경과=np.where(keys['cross_idx'] >= 0, keys['cross_idx'] - keys['first_in_idx'], np.nan),
+    ).groupby('ITEM_NM').agg(리오더이력=('리오더경과', 'median'), 돌파이력=('돌파경과', 'median'))
+    history = history.reindex(items)
+
+    table = pd.DataFrame({
+        'ITEM_NM': items,
+        'SKU 수': np.bincount(item_codes, minlength=len(items)),
+        '초도 입고량': item_initial.astype(np.int64),
+        '권장 리오더 주차(최초입고+N주)': weeks[best],
+        '권장 리오더 배수(판매 실적 대비)': multiples[best],
+        '권장 리오더 수량': item_reorder[best, cols].astype(np.int64),
+        '기대 미충족수요': item_lost[best, cols].astype(np.int64),
+        '기대 기말재고': item_left[best, cols].astype(np.int64),
+        '기대 손실': np.round(item_cost[best, cols], 1),
+        '리오더 없음 손실': np.round(item_cost[0], 1),
+        '손실 개선(%)': np.round(np.divide(item_cost[0] - item_cost[best, cols], item_cost[0],
+                                      out=np.zeros(len(items)), where=item_cost[0] > 0) * 100, 1),
+        '과거 리오더 주차(중앙값)': history['리오더이력'].round(1).to_numpy(),
+        '과거 판매율 돌파 주차(중앙값)': history['돌파이력'].round(1).to_numpy(),
+    })
+    return table.sort_values('기대 손실', ascending=False).reset_index(drop=True)
+
+
+def save_results(table):
+    """시계열 결과 파일에 시트 추가 + 대시보드 JSON 섹션 갱신"""
+    if os.path.exists(TARGET_FILE):
+        with pd.ExcelWriter(TARGET_FILE, engine='openpyxl', mode='a', if_sheet_exists='replace') as writer:
+            table.to_excel(writer, sheet_name=SHEET_NAME, index=False)
+        print(f"  * 엑셀 시트 저장 완료: {TARGET_FILE} [{SHEET_NAME}]")
+    else:
+        print(f"  [경고] 대상 엑셀 파일({TARGET_FILE})이 없습니다.")
+
+    if os.path.exists(JSON_FILE):
+        with open(JSON_FILE, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        data['reorderTiming'] = {
+            'weights': {'lostSales': LOST_SALES_WEIGHT, 'leftover': LEFTOVER_WEIGHT},
+            'items': json.loads(table.to_json(orient='records', force_ascii=False)),
+        }
+        write_json_atomic(JSON_FILE, data)
+        print(f"  * 대시보드 데이터 reorderTiming 섹션 저장 완료: {JSON_FILE}")
+    else:
+        print(f"  [경고] 대시보드 데이터 파일({JSON_FILE})이 없습니다.")
+
+
+def main():
+    print("=" * 60)
+    print("리오더 타이밍 최적화 (아이템별 리오더 주차 / 수량)")
+    print("=" * 60)
+
+    weekly_df = load_weekly(stage='Reorder Optimizer 주차별 데이터')
+    keys, _, _, demand, _ = build_simulation_inputs(weekly_df)
+    table = optimize_reorder_timing(keys, demand)
+    print(table.to_string(index=False))
+    save_results(table)
+
+
+if __name__ == "__main__":
+    main()
@@ -56,8 +56,10 @@ def main():
         ("budget_proposal.py",   "STEP 2: AI 예산 제안 (룰 기반)"),
         ("weekly_analysis.py",   "STEP 3: 시계열 패턴 분석 & 대시보드 데이터 생성"),
         ("ai_sales_loss_v2.py",  "STEP 4: AI 수요 예측 & 기회비용 분석"),
+        ("reorder_optimizer.py", "STEP 4-1: 리오더 타이밍 최적화 (시트 + JSON 섹션 추가)"),
         ("step4_integration.py", "STEP 5: 유사스타일 맵핑 데이터 생성 (프론트엔드용)"),
-        ("generate_size_data.py","STEP 6: 사이즈 배분 데이터 생성"),
+        ("size_loss.py",         "STEP 6-1: 사이즈 단위 기회비용 분석 (사이즈 데이터 있을 때)"),
+        ("generate_size_data.py","STEP 6-2: 사이즈 배분 데이터 생성"),
     ]
 
     success_count = 0
@@ -0,0 +1,172 @@
+"""
+사이즈 단위 기회비용 분석 (Broken Assortment at SKU-size grain)
+- STEP 3 기회비용 계산을 PART_CD x COLOR_CD x SIZE_CD 단위로 확장
+  (컬러 단위로는 보이지 않는 사이즈 결품 → 사이즈별 잠재 수요 손실)
+- 결품 감지(detect_sku_events) → (사이즈, 주) 패널 → 감쇠 모델 일괄 예측을 SKU 청크 단위로 실행
+- 사이즈 결과는 int32 / category 로 보관하고 컬러 → 스타일로 롤업
+- 사이즈별 실판매 + 기회비용(잠재 수요) 커브를 generate_size_data 입력으로 저장
+
+실행: python size_loss.py
+입력: ../data/weekly_dx25s_size.xlsx (weekly_dx25s 컬럼 + SIZE_CD)
+결과: ../output/25S_Size_Loss.xlsx, ../output/size_curve_data.json
+"""
+
+import os
+
+import numpy as np
+import pandas as pd
+
+from config_loader import get_sell_through_threshold, get_season_end_date
+from dtype_policy import apply_dtype_policy
+from sku_events import detect_sku_events
+from demand_forecasters import BASE_WEEKS, DecayForecaster, build_panel, finalize_predictions, opportunity_loss
+from artifact_io import write_json_atomic
+
+SIZE_DATA_FILE = '../data/weekly_dx25s_size.xlsx'
+OUTPUT_FILE = '../output/25S_Size_Loss.xlsx'
+SIZE_CURVE_FILE = '../output/size_curve_data.json'
+
+SIZE_KEYS = ['PART_CD', 'COLOR_CD', 'SIZE_CD']
+SIZE_TARGET_END_SALES = 1  # 사이즈 단위 시즌 종료 목표 판매량 (컬러 단위 5 → 사이즈 규모로 축소)
+CHUNK_SIZE = 20000         # 예측 배치당 SKU-사이즈 수 (패딩 배열 메모리 상한)
+
+
+def load_size_weekly():
+    """사이즈 단위 주차별 데이터 로드 (당해) + dtype 정책 적용, 파일이 없으면 None"""
+    csv_path = f"{SIZE_DATA_FILE} - Data.csv"
+    if os.path.exists(csv_path):
+        df = pd.read_csv(csv_path)
+    elif os.path.exists(SIZE_DATA_FILE):
+        df = pd.read_excel(SIZE_DATA_FILE, sheet_name=0)
+    else:
+        print(f"  [경고] 사이즈 단위 데이터 파일이 없습니다: {SIZE_DATA_FILE}")
+        return None
+    if 'SIZE_CD' not in df.columns:
+        print(f"  [오류] SIZE_CD 컬럼을 찾을 수 없습니다: {SIZE_DATA_FILE}")
+        return None
+    if 'PERIOD' in df.columns:
+        df = df[df['PERIOD'] == '당해']
+    return apply_dtype_policy(df, stage='Size Loss 주차별 데이터')
+
+
+def compute_size_loss(weekly_df, chunk_size=CHUNK_SIZE):
+    """
+    SKU-사이즈별 결품 시점 / 총판매 / 기회비용
+
+    Returns:
+        사이즈 단위 결과 데이터프레임 (키는 category, 수량은 int32)
+    """
+    df, events = detect_sku_events(weekly_df, SIZE_KEYS, get_sell_through_threshold())
+    panel, df, starts, _ = build_panel(df, SIZE_KEYS)
+
+    origin = events['cross_idx'].to_numpy()
+    valid = (origin >= 0) & (panel.lengths >= BASE_WEEKS)
+    forecaster = DecayForecaster(target_end_sales=SIZE_TARGET_END_SALES, season_end=get_season_end_date())
+
+    loss = np.zeros(panel.n, dtype=np.int32)
+    for lo in range(0, panel.n, chunk_size):
+        rows = np.arange(lo, min(lo + chunk_size, panel.n))
+        chunk = panel.subset(rows)
+        predicted = finalize_predictions(forecaster.forecast(chunk, origin[rows], valid[rows]), chunk)
+        loss[rows] = opportunity_loss(chunk, predicted).sum(axis=1)
+
+    stockout = np.where(origin >= 0, panel.dates[np.arange(panel.n), np.maximum(origin, 0)],
+                        np.datetime64('NaT'))
+    info = df.iloc[starts].reset_index(drop=True)
+    result = info[[c for c in ['CLASS2', 'ITEM_NM'] if c in info.columns] + SIZE_KEYS].copy()
+    result['결품시점'] = pd.to_datetime(stockout)
+    result['총판매'] = panel.sales.sum(axis=1).astype(np.int32)
+    result['기회비용'] = loss
+    print(f"  * 사이즈 분석: {panel.n:,}개 SKU-사이즈 중 결품 {int((origin >= 0).sum()):,}건, "
+          f"기회비용 발생 {int((loss > 0).sum()):,}건")
+    return result
+
+
+def rollup_size_loss(size_df):
+    """사이즈 결과 → 컬러 / 스타일 롤업"""
+    dims = [c for c in ['CLASS2', 'ITEM_NM'] if c in size_df.columns]
+    size_df = size_df.assign(결품여부=size_df['결품시점'].notna().astype(np.int32))
+
+    color_df = size_df.groupby(['PART_CD', 'COLOR_CD'], observed=True).agg(
+        **{d: (d, 'first') for d in dims},
+        사이즈수=('SIZE_CD', 'size'),
+        결품사이즈수=('결품여부', 'sum'),
+        최초사이즈결품=('결품시점', 'min'),
+        총판매=('총판매', 'sum'),
+        기회비용=('기회비용', 'sum'),
+    ).reset_index()
+    color_df['결품사이즈비율(%)'] = (color_df['결품사이즈수'] / color_df['사이즈수'] * 100).round(1)
+
+    style_df = color_df.groupby('PART_CD', observed=True).agg(
+        **{d: (d, 'first') for d in dims},
+        컬러수=('COLOR_CD', 'size'),
+        사이즈수=('사이즈수', 'sum'),
+        결품사이즈수=('결품사이즈수', 'sum'),
+        총판매=('총판매', 'sum'),
+        기회비용=('기회비용', 'sum'),
+    ).reset_index()
+    style_df['결품사이즈비율(%)'] = (style_df['결품사이즈수'] / style_df['사이즈수'] * 100).round(1)
+    return color_df, style_df.sort_values('기회비용', ascending=False).reset_index(drop=True)
+
+
+def _size_value(size_cd):
+    """숫자형 사이즈(230, 95 ...)는 int, 그 외(S, M ...)는 문자열"""
+    text = str(size_cd)
+    return int(text) if text.isdigit() else text
+
+
+def build_size_curves(size_df):
+    """
+    사이즈 배분 화면(SizeAssortment) 입력 레코드
+    - SALE_QTY_CNS = 실판매 + 사이즈 기회비용 (결품으로 잘린 수요 복원)
+    - CAT: CLASS2 (없으면 ITEM_NM), SUB_CAT: ITEM_NM, ColorRange: COLOR_CD
+    """
+    cat_col = 'CLASS2' if 'CLASS2' in size_df.columns else 'ITEM_NM'
+    curves = (size_df.assign(CAT=size_df[cat_col])
+              .groupby(['CAT', 'ITEM_NM', 'COLOR_CD', 'SIZE_CD'], observed=True)
+              .agg(ACTUAL_QTY=('총판매', 'sum'), LOSS_QTY=('기회비용', 'sum'))
+              .reset_index())
+    curves['SALE_QTY_CNS'] = curves['ACTUAL_QTY'] + curves['LOSS_QTY']
+
+    return [
+        {
+            'CAT': str(row.CAT),
+            'SUB_CAT': str(row.ITEM_NM),
+            'ColorRange': str(row.COLOR_CD),
+            'SIZE_CD': _size_value(row.SIZE_CD),
+            'SALE_QTY_CNS': int(row.SALE_QTY_CNS),
+            'ACTUAL_QTY': int(row.ACTUAL_QTY),
+            'LOSS_QTY': int(row.LOSS_QTY),
+        }
+        for row in curves.itertuples(index=False)
+    ]
+
+
+def main():
+    print("=" * 60)
+    print("사이즈 단위 기회비용 분석 (Broken Assortment)")
+    print("=" * 60)
+
+    weekly_df = load_size_weekly()
+    if weekly_df is None:
+        print("  * 사이즈 단위 분석을 건너뜁니다. (generate_size_data는 샘플 데이터 사용)")
+        return
+
+    size_df = compute_size_loss(weekly_df)
+    color_df, style_df = rollup_size_loss(size_df)
+    print(f"  * 총 사이즈 기회비용: {int(size_df['기회비용'].sum()):,}")
+
+    os.makedirs(os.path.dirname(OUTPUT_FILE), exist_ok=True)
+    with pd.ExcelWriter(OUTPUT_FILE, engine='openpyxl') as writer:
+        style_df.to_excel(writer, sheet_name='Style_Loss', index=False)
+        color_df.to_excel(writer, sheet_name='Color_Loss', index=False)
+        size_df.to_excel(writer, sheet_name='Size_Loss', index=False)
+    print(f"* 사이즈 기회비용 결과 저장 완료: {OUTPUT_FILE}")
+
+    curves = build_size_curves(size_df)
+    write_json_atomic(SIZE_CURVE_FILE, {'salesData': curves})
+    print(f"* 사이즈 커브 저장 완료: {SIZE_CURVE_FILE} ({len(curves)}건)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,185 @@
+"""
+SKU 이벤트 감지 커널: 최초입고 / 리오더 / 판매율 임계 돌파 / 마지막 판매 시점을
+전체 SKU에 대해 한 번에 계산 (STEP 2 weekly_analysis, STEP 3 ai_sales_loss_v2 공용)
+
+- 데이터를 (키, END_DT) 순으로 정렬한 뒤 SKU별 구간(segment)을 이어붙인 배열로 처리
+- 구간별 누적 입고/판매는 전체 cumsum에서 구간 시작 오프셋을 빼서 계산
+- 임계 돌파 시점은 구간별 누적 최대 판매율(단조 증가)에 searchsorted 적용
+  → 여러 임계값을 동시에 조회해도 누적 배열은 한 번만 계산
+"""
+
+from typing import Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+REORDER_GAP_DAYS = 14  # 최초 입고일 + 14일 이후 입고를 리오더로 간주
+
+
+def build_segments(df: pd.DataFrame, keys: Sequence[str]) -> Tuple[pd.DataFrame, np.ndarray, np.ndarray]:
+    """
+    (키, END_DT) 정렬 후 SKU 구간 경계 반환
+
+    Returns:
+        (정렬된 데이터프레임(RangeIndex), 구간 시작 위치 배열, 구간 끝 위치 배열(미포함))
+    """
+    keys = list(keys)
+    if keys:
+        df = df.dropna(subset=keys)
+    df = df.sort_values(keys + ['END_DT'], kind='mergesort').reset_index(drop=True)
+
+    n = len(df)
+    if n == 0:
+        empty = np.zeros(0, dtype=np.int64)
+        return df, empty, empty
+
+    if keys:
+        seg = df.groupby(keys, observed=True, sort=False).ngroup().to_numpy()
+        starts = np.flatnonzero(np.r_[True, seg[1:] != seg[:-1]])
+    else:
+        starts = np.zeros(1, dtype=np.int64)
+    ends = np.r_[starts[1:], n]
+    return df, starts, ends
+
+
+def segment_cumsum(values: np.ndarray, starts: np.ndarray, ends: np.ndarray) -> np.ndarray:
+    """구간별 누적합 (구간이 바뀌면 0부터 다시 누적)"""
+    total = np.cumsum(values)
+    offset = total[starts] - values[starts]
+    return total - np.repeat(offset, ends - starts)
+
+
+def pad_segments(values: np.ndarray, starts: np.ndarray, ends: np.ndarray, fill=0) -> np.ndarray:
+    """구간 배열 → (구간 수, 최대 길이) 패딩 행렬 (구간별 시계열을 행 단위로 정렬)"""
+    lengths = ends - starts
+    width = int(lengths.max()) if len(lengths) else 0
+    out = np.full((len(starts), width), fill, dtype=np.result_type(values, np.asarray(fill)))
+    if len(values):
+        seg_id = np.repeat(np.arange(len(starts)), lengths)
+        col = np.arange(len(values)) - np.repeat(starts, lengths)
+        out[seg_id, col] = values
+    return out
+
+
+def _segment_first(mask: np.ndarray, starts: np.ndarray, n: int) -> np.ndarray:
+    """구간별 mask가 처음 True인 절대 위치 (없으면 -1)"""
+    if len(starts) == 0:
+        return np.zeros(0, dtype=np.int64)
+    pos = np.where(mask, np.arange(n), n)
+    first = np.minimum.reduceat(pos, starts)
+    return np.where(first < n, first, -1)
+
+
+def _segment_last(mask: np.ndarray, starts: np.ndarray, n: int) -> np.ndarray:
+    """구간별 mask가 마지막으로 True인 절대 위치 (없으면 -1)"""
+    if len(starts) == 0:
+        return np.zeros(0, dtype=np.int64)
+    pos = np.where(mask, np.arange(n), -1)
+    return np.maximum.reduceat(pos, starts)
+
+
+def crossing_positions(values: np.ndarray, eligible: np.ndarray, starts: np.ndarray,
+                       ends: np.ndarray, thresholds) -> np.ndarray:
+    """
+    구간별로 values >= threshold 가 처음 성립하는 절대 위치 (여러 임계값 동시 조회)
+
+    구간 내 누적 최대값은 단조 증가하므로, 값을 정수 순위로 바꾼 뒤
+    (구간번호 * 기저 + 순위)의 누적 최대 배열 하나에 searchsorted를 적용한다.
+    정수 순위를 쓰므로 부동소수 오차 없이 >= 비교와 결과가 동일함.
+
+    Args:
+        values: 행별 값 (예: 누적 판매율)
+        eligible: 행별 자격 여부 (False인 행은 돌파로 인정하지 않음)
+        starts, ends: 구간 경계
+        thresholds: 임계값 배열 (스칼라 가능)
+
+    Returns:
+        (구간 수, 임계값 수) 절대 위치 배열, 돌파 없으면 -1
+    """
+    thresholds = np.atleast_1d(np.asarray(thresholds, dtype=float))
+    n_seg = len(starts)
+    if n_seg == 0:
+        return np.zeros((0, len(thresholds)), dtype=np.int64)
+
+    x = np.where(eligible, values, -np.inf)
+    uniq = np.unique(x)
+    rank = np.searchsorted(uniq, x)
+    t_rank = np.searchsorted(uniq, thresholds, side='left')  # x >= t  <=>  rank >= t_rank
+    base = len(uniq) + 1
+
+    seg_id = np.repeat(np.arange(n_seg, dtype=np.int64), ends - starts)
+    running = np.maximum.accumulate(seg_id * base + rank)
+    targets = np.arange(n_seg, dtype=np.int64)[:, None] * base + t_rank[None, :]
+    pos = np.searchsorted(running, targets.ravel(), side='left').reshape(targets.shape)
+    return np.where(pos < ends[:, None], pos, -1)
+
+
+def detect_sku_events(df: pd.DataFrame, keys: Sequence[str], threshold: float,
+                      min_cum_in: Optional[float] = None,
+                      reorder_gap_days: int = REORDER_GAP_DAYS) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    전체 SKU의 주요 이벤트 시점을 한 번에 감지
+
+    Args:
+        df: 주차별 데이터 (END_DT, STOR_QTY_KR, SALE_QTY_CNS 필수)
+        keys: SKU 키 컬럼 (빈 리스트면 전체를 하나의 구간으로 처리)
+        threshold: 상업적 결품 판매율 기준
+        min_cum_in: 지정 시 누적 입고가 이 값을 초과한 주차만 돌파로 인정
+        reorder_gap_days: 최초 입고 후 리오더로 간주하는 최소 경과일
+
+    Returns:
+        (정렬된 데이터프레임, SKU별 이벤트 테이블)
+        - 정렬된 데이터프레임: Cum_In, Cum_Sale, Sell_Through, Is_Reorder 컬럼 추가
+        - 이벤트 테이블: 키 + start/end(구간 절대 위치) +
+          first_in_idx, reorder_idx, reorder_count, cross_idx, last_sale_idx
+          (인덱스는 구간 내 상대 위치, 해당 이벤트가 없으면 -1)
+    """
+    keys = list(keys)
+    df, starts, ends = build_segments(df, keys)
+    n = len(df)
+
+    stor = df['STOR_QTY_KR'].to_numpy(dtype=np.int64)
+    sale = df['SALE_QTY_CNS'].to_numpy(dtype=np.int64)
+    dates = df['END_DT'].to_numpy(dtype='datetime64[ns]')
+
+    cum_in = segment_cumsum(stor, starts, ends)
+    cum_sale = segment_cumsum(sale, starts, ends)
+    sell_through = np.divide(cum_sale, cum_in, out=np.zeros(n, dtype=float), where=cum_in > 0)
+
+    # 1. 최초 입고
+    first_in = _segment_first(stor > 0, starts, n)
+
+    # 2. 리오더 (최초 입고일 + gap 이후 입고)
+    has_init = first_in >= 0
+    init_dates = np.where(has_init, dates[np.maximum(first_in, 0)], np.datetime64('NaT'))
+    init_rows = np.repeat(init_dates, ends - starts)
+    gap = np.timedelta64(reorder_gap_days, 'D')
+    is_reorder = (stor > 0) & ~np.isnat(init_rows) & (dates > init_rows + gap)
+    reorder_first = _segment_first(is_reorder, starts, n)
+    reorder_count = (np.add.reduceat(is_reorder.astype(np.int64), starts)
+                     if len(starts) else np.zeros(0, dtype=np.int64))
+
+    # 3. 판매율 임계 돌파
+    eligible = np.ones(n, dtype=bool) if min_cum_in is None else cum_in > min_cum_in
+    cross = crossing_positions(sell_through, eligible, starts, ends, threshold)[:, 0]
+
+    # 4. 마지막 판매
+    last_sale = _segment_last(sale > 0, starts, n)
+
+    df['Cum_In'] = cum_in
+    df['Cum_Sale'] = cum_sale
+    df['Sell_Through'] = sell_through
+    df['Is_Reorder'] = is_reorder
+
+    def _relative(pos):
+        return np.where(pos >= 0, pos - starts, -1)
+
+    events = df.iloc[starts][keys].reset_index(drop=True) if keys else pd.DataFrame(index=range(len(starts)))
+    events['start'] = starts
+    events['end'] = ends
+    events['first_in_idx'] = _relative(first_in)
+    events['reorder_idx'] = _relative(reorder_first)
+    events['reorder_count'] = reorder_count
+    events['cross_idx'] = _relative(cross)
+    events['last_sale_idx'] = _relative(last_sale)
+    return df, events
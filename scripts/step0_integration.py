@@ -9,7 +9,6 @@ STEP 0: 유사스타일 맵핑 → 당시즌(26S) 발주 제안
 
 import os
 import sys
-import json
 import math
 from abc import ABC, abstractmethod
 from datetime import datetime
@@ -18,12 +17,19 @@ from typing import Dict, List, Optional
 import pandas as pd
 import numpy as np
 
+from artifact_io import write_json_atomic
+from dtype_policy import apply_dtype_policy
+from config_loader import get_sell_through_threshold
+from sku_events import detect_sku_events, pad_segments
+from weekly_data import load_weekly
+
 # ── 경로 설정 ───────────────────────────────────────────────
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 DATA_DIR = os.path.join(BASE_DIR, "data")
 OUTPUT_DIR = os.path.join(BASE_DIR, "output")
 
 ANALYSIS_RESULT_FILE = os.path.join(OUTPUT_DIR, "25S_TimeSeries_Analysis_Result.xlsx")
+WEEKLY_DATA_FILE = os.path.join(DATA_DIR, "weekly_dx25s.xlsx")
 DEFAULT_MAPPING_FILE = os.path.join(DATA_DIR, "similarity_mapping.csv")
 SAMPLE_MAPPING_FILE = os.path.join(DATA_DIR, "similarity_mapping_sample.csv")
 
@@ -34,6 +40,8 @@ OUTPUT_JSON = os.path.join(OUTPUT_DIR, "26S_Order_Recommendation.json")
 MIN_SCORE = 0.50          # 최소 유사도 임계값
 NEW_SEASON = "26S"
 REF_SEASON = "25S"
+CURVE_WEEKS = 30          # 주간 예측 곡선 길이 (최초입고 주차 기준)
+ORDER_SELL_THROUGH = 0.75  # STEP3 AI제안 발주량 = 잠재 수요 / 0.75
 
 # STEP2/3 결과 컬럼명 (실제 Excel 기준)
 COL_PART_CD = "PART_CD"
@@ -122,6 +130,7 @@ def load_analysis_result() -> pd.DataFrame:
     print(f"  ▸ STEP2/3 결과 로드: {os.path.basename(ANALYSIS_RESULT_FILE)}")
     df = pd.read_excel(ANALYSIS_RESULT_FILE)
     print(f"    - 원본 행 수 (컬러별): {len(df)}")
+    df = apply_dtype_policy(df, stage="STEP0 분석 결과")
 
     # 중복 컬럼 처리: 'AI계산 기회비용' (공백 없음) 이 있으면 'AI 계산 기회비용' (공백 있음) 우선 사용
     if "AI계산 기회비용" in df.columns and COL_AI_OPP_COST in df.columns:
@@ -165,11 +174,11 @@ def load_analysis_result() -> pd.DataFrame:
     # 존재하는 컬럼만 집계
     agg_dict = {k: v for k, v in agg_dict.items() if k in df.columns}
 
-    style_summary = df.groupby(COL_PART_CD).agg(agg_dict).reset_index()
+    style_summary = df.groupby(COL_PART_CD, observed=True).agg(agg_dict).reset_index()
 
     # 대표 진단 별도 처리
     if COL_AI_DIAG in df.columns:
-        diag_series = df.groupby(COL_PART_CD)[COL_AI_DIAG].apply(representative_diag)
+        diag_series = df.groupby(COL_PART_CD, observed=True)[COL_AI_DIAG].apply(representative_diag)
         style_summary = style_summary.merge(diag_series.reset_index(), on=COL_PART_CD, how="left")
 
     # 판매율 반올림
@@ -272,6 +281,69 @@ def calculate_weighted_baseline(refs: List[dict]) -> dict:
     }
 
 
+def load_reference_curves(weeks: int = CURVE_WEEKS) -> Optional[Dict[str, np.ndarray]]:
+    """25S 스타일별 주간 판매 곡선 (최초입고 주차 정렬, weeks 주, 이후 0)"""
+    try:
+        df = load_weekly(stage="STEP0 주차별 데이터", path=WEEKLY_DATA_FILE)
+    except FileNotFoundError:
+        print(f"  ⚠ 주차별 데이터 없음 ({os.path.basename(WEEKLY_DATA_FILE)}) → 주간 예측 곡선 생략")
+        return None
+
+    style_df = (df.groupby([COL_PART_CD, "END_DT"], observed=True)
+                [["STOR_QTY_KR", "SALE_QTY_CNS"]].sum().reset_index())
+    style_df, events = detect_sku_events(style_df, [COL_PART_CD], get_sell_through_threshold())
+    starts, ends = events["start"].to_numpy(), events["end"].to_numpy()
+
+    sales = pad_segments(style_df["SALE_QTY_CNS"].to_numpy(dtype=float), starts, ends)
+    sales = np.pad(sales, ((0, 0), (0, weeks)))
+    first_in = np.maximum(events["first_in_idx"].to_numpy(), 0)
+    cols = first_in[:, None] + np.arange(weeks)[None, :]
+    curves = sales[np.arange(len(starts))[:, None], cols]
+    print(f"    - 유사스타일 주간 곡선: {len(curves)}개 스타일 x {weeks}주")
+    return dict(zip(events[COL_PART_CD].astype(str), curves))
+
+
+def forecast_weekly_curves(results: List[dict], ref_curves: Dict[str, np.ndarray],
+                           weeks: int = CURVE_WEEKS) -> None:
+    """
+    유사스타일 주간 판매 곡선 블렌딩 → 26S 스타일별 주간 수요 곡선 / 예상 결품 주차 (results에 추가)
+
+    - (스타일, 유사스타일, 주) 텐서에 각 유사스타일의 주간 판매 비중 곡선을 배치
+    - REF_SCORE 가중평균으로 비중 곡선을 합성하고 가중 잠재 수요를 곱해 주간 수요로 환산
+      (잠재 수요 = max(가중 판매량 + 가중 기회비용, 가중 AI발주량 x 0.75))
+    - 예상 결품 주차: 누적 수요가 추천발주량 x 판매율 기준(상업적 결품)에 처음 도달하는 주차
+    """
+    n = len(results)
+    tensor = np.zeros((n, 3, weeks))
+    weights = np.zeros((n, 3))
+    for i, rec in enumerate(results):
+        for j, ref in enumerate(rec["references"][:3]):
+            curve = ref_curves.get(ref["part_cd"])
+            if curve is not None and curve.sum() > 0:
+                tensor[i, j] = curve
+                weights[i, j] = ref["score"]
+
+    totals = tensor.sum(axis=2, keepdims=True)
+    shares = np.divide(tensor, totals, out=np.zeros_like(tensor), where=totals > 0)
+    weight_sum = weights.sum(axis=1, keepdims=True)
+    profile = np.einsum("sr,srw->sw", np.divide(weights, weight_sum, out=np.zeros_like(weights),
+                                                where=weight_sum > 0), shares)
+
+    demand = np.array([max(rec["가중_판매량"] + rec["가중_기회비용"], rec["가중_AI발주량"] * ORDER_SELL_THROUGH)
+                       for rec in results], dtype=float)
+    weekly = np.round(profile * demand[:, None]).astype(np.int64)
+    order = np.array([rec["추천발주량"] for rec in results], dtype=float)
+    reached = np.cumsum(weekly, axis=1) >= (order * get_sell_through_threshold())[:, None]
+    has_curve = weight_sum[:, 0] > 0
+    stockout = np.where(reached.any(axis=1) & has_curve & (order > 0), reached.argmax(axis=1) + 1, 0)
+
+    for i, rec in enumerate(results):
+        rec["주간예측"] = weekly[i].tolist() if has_curve[i] else []
+        rec["예상결품주차"] = int(stockout[i]) if stockout[i] > 0 else None
+    print(f"    - 주간 예측 곡선: {int(has_curve.sum())}/{n}개 스타일, "
+          f"예상 결품 {int((stockout > 0).sum())}개 스타일")
+
+
 def process_recommendations(mapping_df: pd.DataFrame, style_summary: pd.DataFrame) -> List[dict]:
     """전체 26S 스타일에 대한 추천 발주량 산출"""
     results = []
@@ -341,6 +413,8 @@ def save_excel(results: List[dict], output_path: str):
         row["가중_전시즌_기회비용"] = rec["가중_기회비용"] if rec["confidence"] != "none" else "-"
         row["가중_전시즌_AI발주량"] = rec["가중_AI발주량"] if rec["confidence"] != "none" else "-"
         row["26S_추천발주량"] = rec["추천발주량"] if rec["confidence"] != "none" else "-"
+        if "예상결품주차" in rec:
+            row["예상결품주차(입고후)"] = rec["예상결품주차"] or "-"
         row["confidence"] = rec["confidence"]
 
         rows.append(row)
@@ -361,6 +435,15 @@ def save_excel(results: List[dict], output_path: str):
                                   else chr(64 + (col_idx - 1) // 26) + chr(65 + (col_idx - 1) % 26)
                                   ].width = min(max_len + 3, 30)
 
+        # 주간 예측 곡선 (최초입고 주차 기준 W1 ~ Wn)
+        curve_rows = [
+            {"NEW_PART_CD": rec["NEW_PART_CD"], "NEW_ITEM_NM": rec["NEW_ITEM_NM"],
+             **{f"W{w + 1}": qty for w, qty in enumerate(rec["주간예측"])}}
+            for rec in results if rec.get("주간예측")
+        ]
+        if curve_rows:
+            pd.DataFrame(curve_rows).to_excel(writer, index=False, sheet_name="26S 주간 예측")
+
     print(f"  ▸ Excel 저장 완료: {os.path.basename(output_path)}")
 
 
@@ -407,10 +490,12 @@ def save_json(results: List[dict], output_path: str):
             "추천발주량": rec["추천발주량"],
             "confidence": rec["confidence"],
         }
+        if "주간예측" in rec:
+            item["weekly_forecast"] = rec["주간예측"]
+            item["stockout_week"] = rec["예상결품주차"]
         output["recommendations"].append(item)
 
-    with open(output_path, "w", encoding="utf-8") as f:
-        json.dump(output, f, ensure_ascii=False, indent=2)
+    write_json_atomic(output_path, output)
 
     print(f"  ▸ JSON 저장 완료: {os.path.basename(output_path)}")
 
@@ -454,12 +539,18 @@ def main():
     print("  ▸ 추천 발주량 산출 중...")
     results = process_recommendations(mapping_df, style_summary)
 
-    # 6. 출력 저장
+    # 6. 유사스타일 주간 곡선 블렌딩 → 주간 수요 / 예상 결품 주차
+    print("  ▸ 주간 예측 곡선 산출 중...")
+    ref_curves = load_reference_curves()
+    if ref_curves is not None:
+        forecast_weekly_curves(results, ref_curves)
+
+    # 7. 출력 저장
     os.makedirs(OUTPUT_DIR, exist_ok=True)
     save_excel(results, OUTPUT_EXCEL)
     save_json(results, OUTPUT_JSON)
 
-    # 7. 요약 출력
+    # 8. 요약 출력
     total = len(results)
     by_conf = {}
     for r in results:
@@ -21,6 +21,8 @@ from typing import Dict, List, Optional
 import pandas as pd
 import numpy as np
 
+from dtype_policy import apply_dtype_policy
+
 # ── 경로 설정 ───────────────────────────────────────────────
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 DATA_DIR = os.path.join(BASE_DIR, "data")
@@ -125,6 +127,7 @@ def load_analysis_result() -> pd.DataFrame:
     print(f"  ▸ STEP2/3 결과 로드: {os.path.basename(ANALYSIS_RESULT_FILE)}")
     df = pd.read_excel(ANALYSIS_RESULT_FILE)
     print(f"    - 원본 행 수 (컬러별): {len(df)}")
+    df = apply_dtype_policy(df, stage="STEP5 분석 결과")
 
     # 중복 컬럼 처리: 'AI계산 기회비용' (공백 없음) 이 있으면 'AI 계산 기회비용' (공백 있음) 우선 사용
     if "AI계산 기회비용" in df.columns and COL_AI_OPP_COST in df.columns:
@@ -167,7 +170,7 @@ def load_analysis_result() -> pd.DataFrame:
     # 존재하는 컬럼만 집계
     agg_dict = {k: v for k, v in agg_dict.items() if k in df.columns}
 
-    style_summary = df.groupby(COL_PART_CD).agg(agg_dict).reset_index()
+    style_summary = df.groupby(COL_PART_CD, observed=True).agg(agg_dict).reset_index()
 
     # 판매율 = 총판매 / 총입고 * 100 (mean 버그 수정)
     if COL_TOTAL_SALE in style_summary.columns and COL_TOTAL_INBOUND in style_summary.columns:
@@ -177,7 +180,7 @@ def load_analysis_result() -> pd.DataFrame:
 
     # 대표 진단 별도 처리
     if COL_AI_DIAG in df.columns:
-        diag_series = df.groupby(COL_PART_CD)[COL_AI_DIAG].apply(representative_diag)
+        diag_series = df.groupby(COL_PART_CD, observed=True)[COL_AI_DIAG].apply(representative_diag)
         style_summary = style_summary.merge(diag_series.reset_index(), on=COL_PART_CD, how="left")
 
     print(f"    - 스타일 수 (PART_CD별): {len(style_summary)}")
@@ -0,0 +1,166 @@
+"""
+판매율 임계값 민감도 분석 (Threshold Sweep)
+- 상업적 결품 기준(brand_config targetSellThrough)을 여러 값으로 바꿨을 때의
+  결품 주차, AI 진단 분포, 기회비용 합계를 파이프라인 재실행 없이 한 번에 계산
+- 누적 입고/판매 배열은 한 번만 만들고, 임계값 벡터 전체를 searchsorted로 동시 조회
+
+실행: python threshold_sweep.py 0.65 0.70 0.75   (65 70 75 처럼 % 단위도 가능)
+결과: ../output/25S_Threshold_Sensitivity.xlsx
+"""
+
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+from config_loader import (get_sell_through_threshold, get_season_end_date,
+                           get_early_stockout_date, get_shortage_cutoff_date)
+from dtype_policy import DIAGNOSIS_LABELS
+from sku_events import build_segments, segment_cumsum, crossing_positions, pad_segments
+from weekly_data import load_weekly
+from demand_forecasters import (BASE_WEEKS, WeeklyPanel, DecayForecaster, finalize_predictions,
+                                opportunity_loss)
+
+OUTPUT_FILE = '../output/25S_Threshold_Sensitivity.xlsx'
+
+DEFAULT_THRESHOLDS = [0.60, 0.65, 0.70, 0.75, 0.80]
+SKU_KEYS = ['ITEM_NM', 'PART_CD', 'COLOR_CD']
+
+# STEP 2 (weekly_analysis) 진단 규칙
+MIN_CUM_IN = 10            # 결품 판정 최소 누적 입고
+HIT_EFFICIENCY_STR = 0.8   # 🟢Hit (고효율) 최종판매율 기준
+RISK_STR = 0.55            # 🔴Risk (부진) 최종판매율 기준
+
+# STEP 3 (ai_sales_loss_v2) 기회비용 계산 대상 진단
+LOSS_TARGET_LABELS = [
+    '🚨Early Shortage (5월전 품절)',
+    '⚠️Shortage (시즌중 품절)',
+    '🟢Hit (적기 소진)',
+]
+
+
+def diagnose(stockout_dates, final_str):
+    """STEP 2 AI 진단 규칙 (벡터 버전)"""
+    early = np.datetime64(get_early_stockout_date())
+    shortage = np.datetime64(get_shortage_cutoff_date())
+    has_stockout = ~np.isnat(stockout_dates)
+    conditions = [
+        has_stockout & (stockout_dates <= early),
+        has_stockout & (stockout_dates <= shortage),
+        has_stockout,
+        final_str >= HIT_EFFICIENCY_STR,
+        final_str < RISK_STR,
+    ]
+    choices = [
+        '🚨Early Shortage (5월전 품절)',
+        '⚠️Shortage (시즌중 품절)',
+        '🟢Hit (적기 소진)',
+        '🟢Hit (고효율)',
+        '🔴Risk (부진)',
+    ]
+    return np.select(conditions, choices, default='⚪Normal')
+
+
+def sweep_thresholds(weekly_df, thresholds):
+    """
+    임계값 벡터에 대한 민감도 분석
+
+    Returns:
+        (임계값별 요약 테이블, 임계값 x ITEM_NM 기회비용 테이블, SKU x 임계값 상세)
+    """
+    thresholds = np.asarray(sorted(set(thresholds)), dtype=float)
+    df, starts, ends = build_segments(weekly_df, SKU_KEYS)
+    lengths = ends - starts
+
+    stor = df['STOR_QTY_KR'].to_numpy(dtype=np.int64)
+    sale = df['SALE_QTY_CNS'].to_numpy(dtype=np.int64)
+    dates = df['END_DT'].to_numpy(dtype='datetime64[ns]')
+    cum_in = segment_cumsum(stor, starts, ends)
+    cum_sale = segment_cumsum(sale, starts, ends)
+    sell_through = np.divide(cum_sale, cum_in, out=np.zeros(len(df)), where=cum_in > 0)
+
+    # 누적 배열 1회 → 임계값 전체 동시 조회
+    cross_diag = crossing_positions(sell_through, cum_in > MIN_CUM_IN, starts, ends, thresholds)
+    cross_loss = crossing_positions(sell_through, np.ones(len(df), dtype=bool), starts, ends, thresholds)
+    final_str = sell_through[ends - 1]
+
+    sku = df.iloc[starts][SKU_KEYS].reset_index(drop=True)
+    panel = WeeklyPanel(pad_segments(sale, starts, ends),
+                        pad_segments(dates, starts, ends, fill=np.datetime64('NaT')),
+                        lengths, sku)
+    forecaster = DecayForecaster(season_end=get_season_end_date())
+    part_codes = sku['PART_CD'].astype(str).to_numpy()
+    summary_rows = []
+    detail_frames = []
+    for j, threshold in enumerate(thresholds):
+        pos = cross_diag[:, j]
+        stockout_dates = np.where(pos >= 0, dates[np.maximum(pos, 0)], np.datetime64('NaT'))
+        diagnosis = diagnose(stockout_dates, final_str)
+
+        # STEP 3과 동일: 대상 진단 컬러가 하나라도 있는 품번은 전 컬러를 계산
+        loss_rel = np.where(cross_loss[:, j] >= 0, cross_loss[:, j] - starts, -1)
+        target_parts = part_codes[np.isin(diagnosis, LOSS_TARGET_LABELS)]
+        is_target = np.isin(part_codes, target_parts)
+        valid = is_target & (lengths >= BASE_WEEKS) & (loss_rel >= 0)
+        predicted = finalize_predictions(forecaster.forecast(panel, loss_rel, valid), panel)
+        loss = opportunity_loss(panel, predicted).sum(axis=1)
+
+        detail = sku.copy()
+        detail['임계값'] = threshold
+        detail['결품시점'] = pd.to_datetime(stockout_dates)
+        detail['AI_진단'] = diagnosis
+        detail['기회비용'] = loss.astype(int)
+        detail_frames.append(detail)
+
+        stockout_weeks = detail['결품시점'].dt.isocalendar().week.dropna()
+        row = {
+            '임계값(%)': round(threshold * 100, 1),
+            '결품 SKU': int((pos >= 0).sum()),
+            '평균 결품주차(ISO)': round(float(stockout_weeks.mean()), 1) if len(stockout_weeks) else None,
+        }
+        counts = pd.Series(diagnosis).value_counts()
+        for label in DIAGNOSIS_LABELS:
+            row[label] = int(counts.get(label, 0))
+        row['기회비용 발생 SKU'] = int((loss > 0).sum())
+        row['총기회비용(수량)'] = int(loss.sum())
+        summary_rows.append(row)
+
+    detail_df = pd.concat(detail_frames, ignore_index=True)
+    item_loss = detail_df.pivot_table(index='임계값', columns='ITEM_NM', values='기회비용',
+                                      aggfunc='sum', observed=True).reset_index()
+    item_loss['임계값'] = (item_loss['임계값'] * 100).round(1)
+    return pd.DataFrame(summary_rows), item_loss, detail_df
+
+
+def parse_thresholds(args):
+    """CLI 인자 → 비율 리스트 (65 → 0.65), 미지정 시 기본 벡터 + 현재 설정값"""
+    if not args:
+        return sorted(set(DEFAULT_THRESHOLDS + [get_sell_through_threshold()]))
+    values = [float(a) for a in args]
+    return [v / 100 if v > 1 else v for v in values]
+
+
+def main():
+    print("=" * 60)
+    print("판매율 임계값 민감도 분석 (Threshold Sweep)")
+    print("=" * 60)
+
+    thresholds = parse_thresholds(sys.argv[1:])
+    print(f"  * 임계값: {[round(t * 100, 1) for t in thresholds]}%")
+
+    weekly_df = load_weekly(stage='Threshold Sweep 주차별 데이터')
+    summary_df, item_loss_df, detail_df = sweep_thresholds(weekly_df, thresholds)
+
+    print(summary_df.to_string(index=False))
+
+    os.makedirs(os.path.dirname(OUTPUT_FILE), exist_ok=True)
+    with pd.ExcelWriter(OUTPUT_FILE, engine='openpyxl') as writer:
+        summary_df.to_excel(writer, sheet_name='Threshold_Summary', index=False)
+        item_loss_df.to_excel(writer, sheet_name='Item_Loss', index=False)
+        detail_df.to_excel(writer, sheet_name='SKU_Detail', index=False)
+    print(f"* 민감도 분석 결과 저장 완료: {OUTPUT_FILE}")
+
+
+if __name__ == "__main__":
+    main()
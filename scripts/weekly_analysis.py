@@ -1,11 +1,21 @@
 import pandas as pd
 import json
-from config_loader import get_sell_through_threshold, get_early_stockout_date, get_shortage_cutoff_date
+from config_loader import (get_sell_through_threshold, get_early_stockout_date, get_shortage_cutoff_date,
+                           get_yoy_analysis_enabled)
+from dtype_policy import apply_dtype_policy, encode_diagnosis, report_memory
+from sku_events import detect_sku_events
+from diagnosis_ranking import DiagnosisRanking
+from artifact_io import write_json_atomic, publish_file
+from yoy_analysis import STYLE_KEY, carryover_key, yoy_stockout_timing
 
 _ST_THRESHOLD = get_sell_through_threshold()
 _EARLY_STOCKOUT_DATE = get_early_stockout_date()
 _SHORTAGE_CUTOFF_DATE = get_shortage_cutoff_date()
 
+RANKING_FILE = '../output/diagnosis_ranking.json'
+YOY_FILE = '../output/25S_YoY_Stockout.xlsx'
+DASHBOARD_TOP_N = None  # 진단별 대시보드 수록 스타일 수 (None: 전체)
+
 # 1. 데이터 로드 (파일명에 맞게 수정)
 file_path = '../data/weekly_dx25s.xlsx - Data.csv'
 try:
@@ -14,9 +24,8 @@ except:
     # 엑셀 파일일 경우 (첫 번째 시트)
     df = pd.read_excel('../data/weekly_dx25s.xlsx', sheet_name=0)
 
-# 2. 전처리: 25S 시즌('당해') 데이터 필터링 및 날짜 변환
-df_process = df[df['PERIOD'] == '당해'].copy()
-df_process['END_DT'] = pd.to_datetime(df_process['END_DT'])
+# 2. 전처리: 25S 시즌('당해') 데이터 필터링 및 dtype 정책 적용 (날짜 변환 포함)
+df_process = apply_dtype_policy(df[df['PERIOD'] == '당해'], stage='STEP2 주차별 데이터')
 
 # -------------------------------------------------------
 # 3. 핵심 로직: 스타일별 시계열 패턴 분석 함수
@@ -59,40 +68,29 @@ def generate_chart_data(group, init_date):
         })
     return chart_data
 
-def analyze_style_pattern(group, is_total=False):
-    # 날짜순 정렬
-    group = group.sort_values('END_DT')
-    
-    # [A] 기초 재고 및 누적 흐름 계산
-    # 누적 입고 (STOR_QTY_KR)
-    group['Cum_In'] = group['STOR_QTY_KR'].cumsum()
-    # 누적 판매 (SALE_QTY_CNS)
-    group['Cum_Sale'] = group['SALE_QTY_CNS'].cumsum()
-    
-    # 판매율 (Sell-Through)
-    group['Sell_Through'] = group.apply(
-        lambda x: x['Cum_Sale'] / x['Cum_In'] if x['Cum_In'] > 0 else 0, axis=1
-    )
-    
+def analyze_style_pattern(group, events=None, is_total=False):
+    """
+    스타일(컬러) 그룹의 시계열 패턴 분석
+    - events: sku_events.detect_sku_events 결과 행 (group은 해당 구간의 정렬된 슬라이스)
+      None이면 group 하나를 단일 구간으로 보고 이벤트를 직접 감지
+    """
+    if events is None:
+        group, events_df = detect_sku_events(group, [], _ST_THRESHOLD, min_cum_in=10)
+        events = events_df.iloc[0]
+
+    # [A] 기초 재고 및 누적 흐름: Cum_In / Cum_Sale / Sell_Through (커널에서 계산됨)
+
     # [B] 중요 시점 추출
     # 1. 최초 입고일
-    in_stock = group[group['STOR_QTY_KR'] > 0]
-    init_date = in_stock['END_DT'].min() if not in_stock.empty else pd.NaT
-    
+    init_date = group['END_DT'].iloc[events.first_in_idx] if events.first_in_idx >= 0 else pd.NaT
+
     # 2. 리오더 발생일 (최초 입고일 + 14일 이후 입고가 있는 경우)
-    reorders = []
-    if pd.notnull(init_date):
-        reorder_rows = group[
-            (group['END_DT'] > init_date + pd.Timedelta(days=14)) & 
-            (group['STOR_QTY_KR'] > 0)
-        ]
-        reorders = reorder_rows['END_DT'].dt.strftime('%m/%d').tolist()
-    
+    reorders = group.loc[group['Is_Reorder'], 'END_DT'].dt.strftime('%m/%d').tolist()
+
     # 3. 결품 임박 시점 (누적 판매율 70% 최초 돌파 주차)
     # 단, 입고가 10장 이상인 유의미한 경우만 체크
-    stock_out_row = group[(group['Sell_Through'] >= _ST_THRESHOLD) & (group['Cum_In'] > 10)]
-    stock_out_date = stock_out_row['END_DT'].min() if not stock_out_row.empty else pd.NaT
-    
+    stock_out_date = group['END_DT'].iloc[events.cross_idx] if events.cross_idx >= 0 else pd.NaT
+
     # [C] AI 진단 (Diagnosis)
     total_sale = group['SALE_QTY_CNS'].sum()
     final_str = group['Sell_Through'].iloc[-1] if not group.empty else 0
@@ -134,7 +132,15 @@ def analyze_style_pattern(group, is_total=False):
 
 # 4. 전체 스타일 분석 실행
 print("데이터 분석 중...")
-result_df = df_process.groupby(['ITEM_NM', 'PART_CD', 'COLOR_CD']).apply(analyze_style_pattern).reset_index()
+sku_keys = ['ITEM_NM', 'PART_CD', 'COLOR_CD']
+df_sorted, sku_events = detect_sku_events(df_process, sku_keys, _ST_THRESHOLD, min_cum_in=10)
+pattern_rows = [
+    analyze_style_pattern(df_sorted.iloc[ev.start:ev.end], ev)
+    for ev in sku_events.itertuples(index=False)
+]
+result_df = pd.concat([sku_events[sku_keys], pd.DataFrame(pattern_rows)], axis=1)
+result_df['AI_진단'] = encode_diagnosis(result_df['AI_진단'])
+report_memory(result_df, 'STEP2 분석 결과')
 
 # 5. 결과 저장
 # 5-1. 새로운 컬럼 추가 (기회비용 분석용)
@@ -155,6 +161,22 @@ result_df = result_df[column_order]
 result_df.drop(columns=['Chart_JSON']).to_excel('../output/25S_TimeSeries_Analysis_Result.xlsx', index=False)
 print("* 분석 결과 저장 완료: ../output/25S_TimeSeries_Analysis_Result.xlsx")
 
+# 5-4. 전년 대비 결품 시점 (당해/전년 동시 집계, 아이템·스타일 단위)
+if get_yoy_analysis_enabled() and 'PERIOD' in df.columns and (df['PERIOD'] == '전년').any():
+    df_dual = apply_dtype_policy(df[df['PERIOD'].isin(['당해', '전년'])], stage='STEP2 당해/전년 주차별 데이터')
+    df_dual[STYLE_KEY] = carryover_key(df_dual['PART_CD'])
+    yoy_levels = {'Item_YoY': ['ITEM_NM'], 'Style_YoY': ['ITEM_NM', STYLE_KEY]}
+    if 'CLASS2' in df_dual.columns:
+        yoy_levels = {'Class_YoY': ['CLASS2'], **yoy_levels}
+    with pd.ExcelWriter(YOY_FILE, engine='openpyxl') as writer:
+        for sheet_name, keys in yoy_levels.items():
+            yoy_df = yoy_stockout_timing(df_dual, keys, _ST_THRESHOLD, min_cum_in=10)
+            yoy_df.to_excel(writer, sheet_name=sheet_name, index=False)
+            both = yoy_df['결품주차_증감'].notna()
+            print(f"  * {sheet_name}: {len(yoy_df)}건 (양 시즌 결품 {both.sum()}건, "
+                  f"평균 결품주차 증감 {yoy_df.loc[both, '결품주차_증감'].mean():+.1f}주)")
+    print(f"* 전년 대비 결품 시점 저장 완료: {YOY_FILE}")
+
 # 6. 대시보드용 JSON 출력 및 저장 (대표 성공/실패 사례 1건씩)
 # 6. 대시보드용 JSON 출력 및 저장 (대표 성공/실패 사례 -> Total + Colors 구조로 변환)
 print("\n--- [대시보드 데이터 생성 중 (Total + Colors)] ---")
@@ -243,16 +265,9 @@ def create_dashboard_entry(part_cd, color_cd, raw_df, anal_df):
         'colors': colors_entry
     }
 
-# 진단별 필터 정의
-diagnosis_filters = {
-    # Success 그룹
-    'hit': result_df['AI_진단'] == '🟢Hit (적기 소진)',
-    'normal': result_df['AI_진단'] == '⚪Normal',
-    # Failure 그룹
-    'early_shortage': result_df['AI_진단'] == '🚨Early Shortage (5월전 품절)',
-    'shortage': result_df['AI_진단'] == '⚠️Shortage (시즌중 품절)',
-    'risk': result_df['AI_진단'] == '🔴Risk (부진)'
-}
+# 진단별 스타일 랭킹 (버킷별 스타일 총판매 기준 1회 정렬, 이후 구간 슬라이싱으로 조회)
+ranking = DiagnosisRanking.from_result(result_df)
+ranking.save(RANKING_FILE)
 
 # 새로운 JSON 구조: success/failure 하위에 진단별 분류
 dashboard_data = {
@@ -268,21 +283,11 @@ dashboard_data = {
 }
 
 # 각 진단별로 스타일 수집
-def collect_styles_by_diagnosis(diagnosis_key, filter_mask, group_key):
-    """진단별 스타일 수집 함수"""
-    candidates = result_df[filter_mask].sort_values('총판매', ascending=False)
-    if candidates.empty:
-        return 0
-
-    part_codes = candidates['PART_CD'].unique()
+def collect_styles_by_diagnosis(diagnosis_key, group_key, top_n=DASHBOARD_TOP_N):
+    """진단별 스타일 수집 함수 (랭킹 인덱스에서 상위 top_n개 조회)"""
     count = 0
-
-    for part_cd in part_codes:
-        part_rows = candidates[candidates['PART_CD'] == part_cd]
-        representative_row = part_rows.iloc[0]
-        color_cd = representative_row['COLOR_CD']
-
-        entry = create_dashboard_entry(part_cd, color_cd, df_process, result_df)
+    for row in ranking.top(diagnosis_key, top_n).itertuples(index=False):
+        entry = create_dashboard_entry(row.PART_CD, row.대표컬러, df_process, result_df)
         dashboard_data[group_key][diagnosis_key].append(entry)
         count += 1
 
@@ -290,36 +295,28 @@ def collect_styles_by_diagnosis(diagnosis_key, filter_mask, group_key):
 
 # Success 그룹 수집
 print("\n[Success 그룹]")
-hit_count = collect_styles_by_diagnosis('hit', diagnosis_filters['hit'], 'success')
+hit_count = collect_styles_by_diagnosis('hit', 'success')
 print(f"  - 🟢Hit (적기 소진): {hit_count}개 스타일")
 
-normal_count = collect_styles_by_diagnosis('normal', diagnosis_filters['normal'], 'success')
+normal_count = collect_styles_by_diagnosis('normal', 'success')
 print(f"  - ⚪Normal: {normal_count}개 스타일")
 
 # Failure 그룹 수집
 print("\n[Failure 그룹]")
-early_shortage_count = collect_styles_by_diagnosis('early_shortage', diagnosis_filters['early_shortage'], 'failure')
+early_shortage_count = collect_styles_by_diagnosis('early_shortage', 'failure')
 print(f"  - 🚨Early Shortage (5월전 품절): {early_shortage_count}개 스타일")
 
-shortage_count = collect_styles_by_diagnosis('shortage', diagnosis_filters['shortage'], 'failure')
+shortage_count = collect_styles_by_diagnosis('shortage', 'failure')
 print(f"  - ⚠️Shortage (시즌중 품절): {shortage_count}개 스타일")
 
-risk_count = collect_styles_by_diagnosis('risk', diagnosis_filters['risk'], 'failure')
+risk_count = collect_styles_by_diagnosis('risk', 'failure')
 print(f"  - 🔴Risk (부진): {risk_count}개 스타일")
 
 total_count = hit_count + normal_count + early_shortage_count + shortage_count + risk_count
 print(f"\n* 총 {total_count}개 스타일 대시보드 데이터 생성 완료")
 
-# JSON 파일로 저장 (루트 및 public 폴더)
-import os
-
-# output 폴더에 저장
-with open('../output/dashboard_data.json', 'w', encoding='utf-8') as f:
-    json.dump(dashboard_data, f, ensure_ascii=False, indent=2)
-
-# public 폴더에도 저장 (React 앱용)
-os.makedirs('../public', exist_ok=True)
-with open('../public/dashboard_data.json', 'w', encoding='utf-8') as f:
-    json.dump(dashboard_data, f, ensure_ascii=False, indent=2)
+# JSON 파일로 저장: output 폴더에 한 번 기록 후 public 폴더(React 앱용)로 게시
+write_json_atomic('../output/dashboard_data.json', dashboard_data)
+publish_file('../output/dashboard_data.json', '../public/dashboard_data.json')
 
 print("* 대시보드 데이터 저장 완료: dashboard_data.json (구조: Total + Colors)")
\ No newline at end of file
@@ -0,0 +1,31 @@
+"""
+주차별 원본 데이터(weekly_dx25s) 공용 로더 (백테스트 / 벤치마크 / 시뮬레이션 / STEP0 곡선 공용)
+- '<엑셀 경로> - Data.csv'가 있으면 CSV 우선, 없으면 엑셀 첫 번째 시트
+- PERIOD == '당해' 행만 사용
+- load_weekly: 위 결과에 공유 dtype 정책 적용 (행 필터를 더 거는 경우 read_current_weekly 후 직접 적용)
+"""
+
+import os
+
+import pandas as pd
+
+from dtype_policy import apply_dtype_policy
+
+WEEKLY_DATA_FILE = '../data/weekly_dx25s.xlsx'  # scripts/ 기준 상대 경로
+
+
+def read_current_weekly(path: str = WEEKLY_DATA_FILE) -> pd.DataFrame:
+    """당해 주차별 원본 데이터 (dtype 정책 적용 전, 파일이 없으면 FileNotFoundError)"""
+    csv_path = f"{path} - Data.csv"
+    if os.path.exists(csv_path):
+        df = pd.read_csv(csv_path)
+    else:
+        df = pd.read_excel(path, sheet_name=0)
+    if 'PERIOD' in df.columns:
+        df = df[df['PERIOD'] == '당해']
+    return df
+
+
+def load_weekly(stage: str, path: str = WEEKLY_DATA_FILE) -> pd.DataFrame:
+    """당해 주차별 원본 데이터 + dtype 정책 적용 (stage: 정책 적용 로그에 표시할 단계명)"""
+    return apply_dtype_policy(read_current_weekly(path), stage=stage)
@@ -0,0 +1,151 @@
+"""
+전년 대비(YoY) 이중 기간 분석
+- 당해/전년 데이터를 하나의 groupby(키 + 기간)로 동시 집계한 뒤 기간을 컬럼으로 펼쳐 증감 계산
+- 복종(CLASS2) / 아이템(ITEM_NM) / 스타일 단위 판매율·판매량 증감 (STEP 1 main.py)
+- 아이템 / 스타일 단위 결품 시점 증감 (STEP 2 weekly_analysis.py)
+
+스타일 연계 키: 품번 끝 3자리는 시즌 코드(25S=053/051, 24S=043/041)이므로
+이를 제외한 앞부분으로 당해/전년 동일 스타일을 매칭 (DXED20053 ↔ DXED20043)
+"""
+
+from typing import Sequence
+
+import numpy as np
+import pandas as pd
+
+from sku_events import detect_sku_events
+
+PERIOD_CURRENT = '당해'
+PERIOD_PRIOR = '전년'
+PERIODS = [PERIOD_CURRENT, PERIOD_PRIOR]
+
+SEASON_CODE_LEN = 3  # 품번 끝 시즌 코드 자리수
+STYLE_KEY = 'STYLE_KEY'
+
+
+def carryover_key(codes: pd.Series) -> pd.Series:
+    """품번 → 시즌 간 연계 키 (끝 시즌 코드 제거)"""
+    return codes.astype(str).str[:-SEASON_CODE_LEN]
+
+
+def normalize_period(series: pd.Series) -> pd.Series:
+    """시즌 구분 값('25S 당해', '전년' 등) → '당해' / '전년' (그 외 None)"""
+    text = series.astype(str)
+    values = np.select([text.str.contains(PERIOD_CURRENT, regex=False),
+                        text.str.contains(PERIOD_PRIOR, regex=False)],
+                       PERIODS, default=None)
+    return pd.Series(values, index=series.index)
+
+
+def split_periods(df: pd.DataFrame, period_col: str):
+    """이중 기간 데이터프레임 → (당해, 전년) (카테고리 컬럼은 사용하지 않는 값 제거)"""
+    parts = []
+    for period in PERIODS:
+        part = df[df[period_col].astype(str) == period].copy()
+        for col in part.columns:
+            if isinstance(part[col].dtype, pd.CategoricalDtype):
+                part[col] = part[col].cat.remove_unused_categories()
+        parts.append(part)
+    return parts[0], parts[1]
+
+
+def dual_period_pivot(df: pd.DataFrame, keys: Sequence[str], period_col: str,
+                      value_cols: Sequence[str]) -> pd.DataFrame:
+    """
+    키 + 기간 단일 groupby 합계 후 기간을 컬럼으로 펼침
+
+    Returns:
+        키 컬럼 + '{값}_당해', '{값}_전년' 컬럼 (한쪽 기간에만 있는 키는 0으로 채움)
+    """
+    keys = list(keys)
+    value_cols = list(value_cols)
+    data = df[keys + value_cols].copy()
+    data['_PERIOD'] = df[period_col].astype(str)
+    data = data[data['_PERIOD'].isin(PERIODS)]
+
+    grouped = data.groupby(keys + ['_PERIOD'], observed=True)[value_cols].sum()
+    wide = grouped.unstack('_PERIOD', fill_value=0)
+    wide = wide.reindex(columns=pd.MultiIndex.from_product([value_cols, PERIODS]), fill_value=0)
+    wide.columns = [f'{col}_{period}' for col, period in wide.columns]
+    return wide.reset_index()
+
+
+def _comparison_type(current_base: pd.Series, prior_base: pd.Series) -> np.ndarray:
+    """비교 구분: 연속(양 시즌) / 신규(당해만) / 미전개(전년만)"""
+    return np.select([(current_base > 0) & (prior_base > 0), current_base > 0],
+                     ['연속', '신규'], default='미전개')
+
+
+def yoy_sell_through(df: pd.DataFrame, keys: Sequence[str], period_col: str,
+                     sale_col: str = 'SALE_QTY', base_col: str = 'IN_QTY') -> pd.DataFrame:
+    """
+    판매율·판매량 YoY 증감 테이블
+
+    Args:
+        df: 당해/전년이 함께 있는 데이터프레임
+        keys: 집계 키 (예: ['CLASS2'], ['CLASS2', 'ITEM_NM'])
+        period_col: 기간 구분 컬럼
+        sale_col: 판매수량 컬럼
+        base_col: 판매율 분모 컬럼 (입고 또는 발주수량)
+
+    Returns:
+        키 + 기간별 수량/판매율 + 판매율 증감(%p), 판매 증감, 판매 증감률(%), 비교구분
+    """
+    wide = dual_period_pivot(df, keys, period_col, [base_col, sale_col])
+    cur_sale, pri_sale = wide[f'{sale_col}_{PERIOD_CURRENT}'], wide[f'{sale_col}_{PERIOD_PRIOR}']
+    cur_base, pri_base = wide[f'{base_col}_{PERIOD_CURRENT}'], wide[f'{base_col}_{PERIOD_PRIOR}']
+
+    cur_rate = np.where(cur_base > 0, cur_sale / cur_base.where(cur_base > 0, 1) * 100, np.nan)
+    pri_rate = np.where(pri_base > 0, pri_sale / pri_base.where(pri_base > 0, 1) * 100, np.nan)
+
+    wide[f'판매율_{PERIOD_CURRENT}'] = np.round(cur_rate, 2)
+    wide[f'판매율_{PERIOD_PRIOR}'] = np.round(pri_rate, 2)
+    wide['판매율_증감(%p)'] = np.round(cur_rate - pri_rate, 2)
+    wide['판매_증감'] = cur_sale - pri_sale
+    wide['판매_증감률(%)'] = np.round(
+        np.where(pri_sale > 0, (cur_sale - pri_sale) / pri_sale.where(pri_sale > 0, 1) * 100, np.nan), 2)
+    wide['비교구분'] = _comparison_type(cur_base, pri_base)
+    return wide
+
+
+def yoy_stockout_timing(weekly_df: pd.DataFrame, keys: Sequence[str], threshold: float,
+                        min_cum_in: float = None, period_col: str = 'PERIOD') -> pd.DataFrame:
+    """
+    결품(판매율 임계 돌파) 시점 YoY 증감 테이블
+
+    당해/전년을 (기간 + 키 + END_DT) 단일 groupby로 주차 합산한 뒤
+    기간을 구간 키에 포함해 이벤트 커널을 한 번만 실행
+
+    Returns:
+        키 + 기간별 결품일 / 결품주차(ISO) / 입고후 결품주차 + 결품주차 증감(음수 = 당해가 더 빨리 결품)
+    """
+    keys = list(keys)
+    data = weekly_df[keys + ['END_DT', 'STOR_QTY_KR', 'SALE_QTY_CNS']].copy()
+    data['_PERIOD'] = weekly_df[period_col].astype(str)
+    data = data[data['_PERIOD'].isin(PERIODS)]
+
+    weekly = data.groupby(['_PERIOD'] + keys + ['END_DT'], observed=True)[
+        ['STOR_QTY_KR', 'SALE_QTY_CNS']].sum().reset_index()
+    weekly, events = detect_sku_events(weekly, ['_PERIOD'] + keys, threshold, min_cum_in=min_cum_in)
+
+    dates = weekly['END_DT'].to_numpy(dtype='datetime64[ns]')
+    has_cross = events['cross_idx'].to_numpy() >= 0
+    cross_pos = np.where(has_cross, events['start'] + events['cross_idx'], 0)
+    first_pos = np.where(events['first_in_idx'] >= 0, events['start'] + events['first_in_idx'], 0)
+    stockout = pd.Series(np.where(has_cross, dates[cross_pos], np.datetime64('NaT')))
+
+    timing = events[['_PERIOD'] + keys].copy()
+    timing['결품일'] = stockout.dt.strftime('%Y-%m-%d')
+    timing['결품주차'] = stockout.dt.isocalendar().week.astype('float64').to_numpy()
+    weeks_after_in = (dates[cross_pos] - dates[first_pos]) / np.timedelta64(7, 'D')
+    timing['입고후주차'] = np.where(has_cross & (events['first_in_idx'] >= 0), weeks_after_in, np.nan)
+
+    wide = timing.set_index(keys + ['_PERIOD'])[['결품일', '결품주차', '입고후주차']].unstack('_PERIOD')
+    wide = wide.reindex(columns=pd.MultiIndex.from_product([['결품일', '결품주차', '입고후주차'], PERIODS]))
+    wide.columns = [f'{col}_{period}' for col, period in wide.columns]
+    wide = wide.reset_index()
+
+    wide['결품주차_증감'] = wide[f'결품주차_{PERIOD_CURRENT}'] - wide[f'결품주차_{PERIOD_PRIOR}']
+    wide['입고후주차_증감'] = wide[f'입고후주차_{PERIOD_CURRENT}'] - wide[f'입고후주차_{PERIOD_PRIOR}']
+    return wide
+
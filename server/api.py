@@ -1,23 +1,41 @@
 """
 FastAPI 백엔드: AI 예산 제안 프록시 (OpenAI / Claude API) + 예산 확정 저장 + 유사스타일 확정
+              + 대시보드 산출물 JSON 서빙 (ETag / gzip·brotli / Range)
 
 실행: uvicorn server.api:app --port 8000 --reload
 환경변수: OPENAI_API_KEY (우선) 또는 ANTHROPIC_API_KEY
+         OPENAI_TIMEOUT_SEC / ANTHROPIC_TIMEOUT_SEC (제공자별 타임아웃, 기본 30초)
+         LLM_MAX_CONCURRENCY (서버 전체 동시 LLM 호출 상한, 기본 4)
+         LLM_HEDGE_DELAY_SEC (보조 제공자 헤지 호출 지연, 기본 8초) / LLM_DEADLINE_SEC (전체 마감, 기본 40초)
+         LLM_CACHE_TTL_SEC (예산 제안 캐시 유효기간, 기본 24시간) / LLM_CACHE_MAX_ENTRIES (기본 200)
+         JOB_WORKERS (확정 맵핑 백그라운드 작업 워커 수, 기본 2)
 """
 
+import asyncio
 import json
 import math
 import os
+import threading
 from datetime import datetime, timezone
+from functools import lru_cache, partial
 from typing import List, Optional
 
 import pandas as pd
 import numpy as np
 from dotenv import load_dotenv
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 
+from server.artifact_serving import ArtifactCache, artifact_response
+from server.artifact_store import ArtifactStore
+from server.color_allocation import ColorAllocationTable
+from server.jobs import JobRunner, JobStore
+from server.llm_cache import ProposalCache, prompt_fingerprint
+from server.prompt_context import build_budget_context, estimate_tokens
+from server.proposal_stream import ProposalStreamParser, sse_event
+
 # 프로젝트 루트의 .env 파일 로드
 load_dotenv(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), ".env"))
 
@@ -36,6 +54,7 @@ PUBLIC_DIR = os.path.join(BASE_DIR, "public")
 OUTPUT_DIR = os.path.join(BASE_DIR, "output")
 BUDGET_CONFIG_PATH = os.path.join(OUTPUT_DIR, "budget_config.json")
 SEASON_CLOSING_PATH = os.path.join(PUBLIC_DIR, "season_closing_data.json")
+ARTIFACT_STATE_DIR = os.path.join(OUTPUT_DIR, "artifact_state")
 
 BUDGET_PROMPT_TEMPLATE = """당신은 패션 리테일 MD(Merchandiser) 전문가입니다.
 아래는 {season} 시즌의 마감 분석 데이터입니다.
@@ -78,6 +97,7 @@ BUDGET_PROMPT_TEMPLATE = """당신은 패션 리테일 MD(Merchandiser) 전문
 
 class BudgetProposalRequest(BaseModel):
     season: str = "25S"
+    force_refresh: bool = False  # True면 캐시를 무시하고 LLM 재호출
 
 
 class CategoryTarget(BaseModel):
@@ -96,6 +116,8 @@ class BudgetProposalResponse(BaseModel):
     prev_total_revenue: int
     prev_total_sales: int
     category_targets: List[CategoryTarget]
+    cached: bool = False
+    prompt_tokens: int = 0  # 프롬프트 크기 (추정 토큰, 룰 기반 폴백은 0)
 
 
 class CategoryBudgetConfig(BaseModel):
@@ -114,34 +136,108 @@ class BudgetConfigRequest(BaseModel):
 
 
 # ── LLM 호출 함수들 ──────────────────────────────────────
+# 비동기 SDK 클라이언트 사용 → LLM 응답 대기 중에도 이벤트 루프가 다른 요청을 처리
+# 제공자별 타임아웃 + 서버 전체 동시 호출 상한(세마포어)
+
+LLM_TIMEOUT_SEC = {
+    "openai": float(os.environ.get("OPENAI_TIMEOUT_SEC", "30")),
+    "anthropic": float(os.environ.get("ANTHROPIC_TIMEOUT_SEC", "30")),
+}
+LLM_MAX_CONCURRENCY = int(os.environ.get("LLM_MAX_CONCURRENCY", "4"))
+LLM_HEDGE_DELAY_SEC = float(os.environ.get("LLM_HEDGE_DELAY_SEC", "8"))   # 보조 제공자 추가 호출까지 대기
+LLM_DEADLINE_SEC = float(os.environ.get("LLM_DEADLINE_SEC", "40"))        # 전체 마감 (초과 시 룰 기반 폴백)
+OPENAI_MODEL = "gpt-4o"
+ANTHROPIC_MODEL = "claude-sonnet-4-20250514"
+LLM_TEMPERATURE = 0.3
+
+LLM_CACHE_PATH = os.path.join(OUTPUT_DIR, "llm_cache.sqlite3")
+LLM_CACHE_TTL_SEC = float(os.environ.get("LLM_CACHE_TTL_SEC", str(24 * 3600)))
+LLM_CACHE_MAX_ENTRIES = int(os.environ.get("LLM_CACHE_MAX_ENTRIES", "200"))
+LLM_CACHE_MAX_BYTES = 20 * 1024 * 1024
+
+_llm_slots = asyncio.Semaphore(LLM_MAX_CONCURRENCY)
+
+
+@lru_cache(maxsize=4)
+def _openai_client(api_key: str):
+    """OpenAI 비동기 클라이언트 (키별 재사용, 커넥션 풀 공유)"""
+    from openai import AsyncOpenAI
+
+    return AsyncOpenAI(api_key=api_key, timeout=LLM_TIMEOUT_SEC["openai"], max_retries=0)
 
-def _call_openai(prompt: str, api_key: str) -> str:
-    """OpenAI GPT-4o 호출"""
-    from openai import OpenAI
 
-    client = OpenAI(api_key=api_key)
-    response = client.chat.completions.create(
-        model="gpt-4o",
+@lru_cache(maxsize=4)
+def _anthropic_client(api_key: str):
+    """Anthropic 비동기 클라이언트 (키별 재사용, 커넥션 풀 공유)"""
+    import anthropic
+
+    return anthropic.AsyncAnthropic(api_key=api_key, timeout=LLM_TIMEOUT_SEC["anthropic"], max_retries=0)
+
+
+async def _call_openai(prompt: str, api_key: str) -> str:
+    """OpenAI GPT-4o 호출"""
+    response = await _openai_client(api_key).chat.completions.create(
+        model=OPENAI_MODEL,
         messages=[{"role": "user", "content": prompt}],
         max_tokens=1024,
-        temperature=0.3,
+        temperature=LLM_TEMPERATURE,
     )
     return response.choices[0].message.content.strip()
 
 
-def _call_anthropic(prompt: str, api_key: str) -> str:
+async def _call_anthropic(prompt: str, api_key: str) -> str:
     """Anthropic Claude 호출"""
-    import anthropic
-
-    client = anthropic.Anthropic(api_key=api_key)
-    message = client.messages.create(
-        model="claude-sonnet-4-20250514",
+    message = await _anthropic_client(api_key).messages.create(
+        model=ANTHROPIC_MODEL,
         max_tokens=1024,
+        temperature=LLM_TEMPERATURE,
         messages=[{"role": "user", "content": prompt}],
     )
     return message.content[0].text.strip()
 
 
+@lru_cache(maxsize=1)
+def _proposal_cache() -> ProposalCache:
+    """예산 제안 캐시 (첫 사용 시 output/llm_cache.sqlite3 생성)"""
+    return ProposalCache(LLM_CACHE_PATH, LLM_CACHE_TTL_SEC, LLM_CACHE_MAX_ENTRIES, LLM_CACHE_MAX_BYTES)
+
+
+async def _stream_openai(prompt: str, api_key: str):
+    """OpenAI GPT-4o 스트리밍 호출 (텍스트 조각 단위)"""
+    stream = await _openai_client(api_key).chat.completions.create(
+        model=OPENAI_MODEL,
+        messages=[{"role": "user", "content": prompt}],
+        max_tokens=1024,
+        temperature=LLM_TEMPERATURE,
+        stream=True,
+    )
+    async for chunk in stream:
+        if chunk.choices and chunk.choices[0].delta.content:
+            yield chunk.choices[0].delta.content
+
+
+async def _stream_anthropic(prompt: str, api_key: str):
+    """Anthropic Claude 스트리밍 호출 (텍스트 조각 단위)"""
+    async with _anthropic_client(api_key).messages.stream(
+        model=ANTHROPIC_MODEL,
+        max_tokens=1024,
+        temperature=LLM_TEMPERATURE,
+        messages=[{"role": "user", "content": prompt}],
+    ) as stream:
+        async for text in stream.text_stream:
+            yield text
+
+
+async def _call_provider(provider: str, call, prompt: str, api_key: str) -> str:
+    """
+    동시 호출 상한 안에서 제공자별 타임아웃을 걸어 LLM 호출
+
+    슬롯 대기 시간은 타임아웃에 포함하지 않음 (대기 중인 요청도 이벤트 루프를 막지 않음)
+    """
+    async with _llm_slots:
+        return await asyncio.wait_for(call(prompt, api_key), timeout=LLM_TIMEOUT_SEC[provider])
+
+
 def _parse_llm_response(response_text: str) -> dict:
     """LLM 응답에서 JSON 파싱 (코드블록 제거 포함)"""
     text = response_text.strip()
@@ -151,13 +247,148 @@ def _parse_llm_response(response_text: str) -> dict:
     return json.loads(text)
 
 
-# ── Endpoints ─────────────────────────────────────────────
+def _llm_providers(openai_key: Optional[str], anthropic_key: Optional[str]) -> list:
+    """헤지 호출 순서대로 (모델명, prompt → 응답 텍스트 코루틴 함수) 목록 (OpenAI 우선)"""
+    providers = []
+    if openai_key:
+        providers.append((OPENAI_MODEL, partial(_call_provider, "openai", _call_openai, api_key=openai_key)))
+    if anthropic_key:
+        providers.append((ANTHROPIC_MODEL, partial(_call_provider, "anthropic", _call_anthropic, api_key=anthropic_key)))
+    return providers
 
-@app.post("/api/budget-proposal", response_model=BudgetProposalResponse)
-async def budget_proposal(req: BudgetProposalRequest):
+
+async def _stream_provider(stream, prompt: str, api_key: str):
+    """동시 호출 상한 안에서 스트리밍 호출 (슬롯은 스트림이 끝날 때까지 점유)"""
+    async with _llm_slots:
+        async for text in stream(prompt, api_key):
+            yield text
+
+
+def _llm_stream_providers(openai_key: Optional[str], anthropic_key: Optional[str]) -> list:
+    """스트리밍 호출 순서대로 (모델명, 타임아웃, prompt → 텍스트 조각 async iterator 함수) 목록"""
+    providers = []
+    if openai_key:
+        providers.append((OPENAI_MODEL, LLM_TIMEOUT_SEC["openai"],
+                          partial(_stream_provider, _stream_openai, api_key=openai_key)))
+    if anthropic_key:
+        providers.append((ANTHROPIC_MODEL, LLM_TIMEOUT_SEC["anthropic"],
+                          partial(_stream_provider, _stream_anthropic, api_key=anthropic_key)))
+    return providers
+
+
+async def _streamed_completion(prompt: str, providers: list, parse, deadline: float = None):
     """
-    LLM을 호출하여 차시즌 목표매출(판매수량)을 제안받는 엔드포인트.
+    스트리밍 LLM 호출: 제공자 순서대로 스트림을 받아 증분 이벤트를 내보내고, 실패 시 다음 제공자로 재시작
+
+    헤지 호출과 달리 두 스트림을 동시에 내보낼 수 없으므로 순차 전환 (전체 deadline은 공유)
+
+    Yields:
+        ("commentary", {"delta"}) / ("category", dict) / ("retry", {"model", "error"}) / ("final", parse 결과)
+        모든 제공자가 실패하거나 deadline을 넘기면 final 없이 종료
     """
+    deadline = LLM_DEADLINE_SEC if deadline is None else deadline
+    loop = asyncio.get_running_loop()
+    end_at = loop.time() + deadline
+
+    for name, timeout, stream in providers:
+        if loop.time() >= end_at:
+            print(f"[Budget API] 전체 마감({deadline:g}s) 초과")
+            return
+        print(f"[Budget API] {name} 스트리밍 호출 시작")
+        provider_end = min(end_at, loop.time() + timeout)
+        parser = ProposalStreamParser()
+        chunks = stream(prompt).__aiter__()
+        try:
+            while True:
+                try:
+                    chunk = await asyncio.wait_for(chunks.__anext__(), timeout=max(provider_end - loop.time(), 0))
+                except StopAsyncIteration:
+                    break
+                delta, categories = parser.feed(chunk)
+                if delta:
+                    yield "commentary", {"delta": delta}
+                for cat in categories:
+                    yield "category", cat
+            result = parse(parser.text)
+        except Exception as e:
+            print(f"[Budget API] {name} 스트리밍 실패: {type(e).__name__}: {e}")
+            yield "retry", {"model": name, "error": type(e).__name__}
+            continue
+        finally:
+            if hasattr(chunks, "aclose"):
+                await chunks.aclose()
+        print(f"[Budget API] {name} 스트리밍 완료")
+        yield "final", result
+        return
+
+
+async def _hedged_completion(prompt: str, providers: list, parse,
+                             hedge_delay: float = None, deadline: float = None):
+    """
+    헤지 LLM 호출: 첫 제공자를 호출하고 hedge_delay 안에 응답이 없거나 실패하면 다음 제공자를 추가 호출
+
+    - 먼저 parse에 성공한 응답을 채택하고 나머지 호출은 취소
+    - 전체 deadline을 넘기거나 모든 제공자가 실패하면 None (호출 측에서 룰 기반 폴백)
+
+    Args:
+        providers: [(이름, async fn(prompt) -> str)] 호출 우선순위 순
+        parse: 응답 텍스트 → 결과 (유효하지 않으면 예외)
+    """
+    hedge_delay = LLM_HEDGE_DELAY_SEC if hedge_delay is None else hedge_delay
+    deadline = LLM_DEADLINE_SEC if deadline is None else deadline
+    loop = asyncio.get_running_loop()
+    end_at = loop.time() + deadline
+    queue = list(providers)
+    pending = {}
+
+    def _launch():
+        name, call = queue.pop(0)
+        print(f"[Budget API] {name} 호출 시작")
+        pending[asyncio.ensure_future(call(prompt))] = name
+
+    if queue:
+        _launch()
+    try:
+        while pending:
+            remaining = end_at - loop.time()
+            if remaining <= 0:
+                print(f"[Budget API] 전체 마감({deadline:g}s) 초과")
+                break
+            done, _ = await asyncio.wait(pending, timeout=min(hedge_delay, remaining) if queue else remaining,
+                                         return_when=asyncio.FIRST_COMPLETED)
+            if not done:
+                if queue:
+                    print(f"[Budget API] {hedge_delay:g}s 내 응답 없음 → 헤지 호출")
+                    _launch()
+                continue
+            for task in done:
+                name = pending.pop(task)
+                try:
+                    response_text = task.result()
+                except Exception as e:
+                    print(f"[Budget API] {name} 호출 실패: {type(e).__name__}: {e}")
+                    continue
+                try:
+                    result = parse(response_text)
+                except Exception as e:
+                    print(f"[Budget API] {name} 응답 파싱 실패: {type(e).__name__}: {e}")
+                    print(f"[Budget API] 원본 응답: {response_text[:500]}")
+                    continue
+                print(f"[Budget API] {name} 호출 성공")
+                return result
+            # 실패한 제공자가 있으면 헤지 지연을 기다리지 않고 다음 제공자 호출
+            if queue:
+                _launch()
+    finally:
+        for task in pending:
+            task.cancel()
+    return None
+
+
+# ── Endpoints ─────────────────────────────────────────────
+
+def _load_closing_data() -> dict:
+    """season_closing_data.json 로드 (없으면 404)"""
     if not os.path.exists(SEASON_CLOSING_PATH):
         raise HTTPException(
             status_code=404,
@@ -165,20 +396,13 @@ async def budget_proposal(req: BudgetProposalRequest):
         )
 
     with open(SEASON_CLOSING_PATH, "r", encoding="utf-8") as f:
-        closing_data = json.load(f)
+        return json.load(f)
+
 
+def _build_budget_prompt(season: str, closing_data: dict):
+    """예산 제안 프롬프트 생성 → (프롬프트, 추정 토큰 수)"""
     summary = closing_data.get("summary", {})
     class_analysis = closing_data.get("class_analysis", [])
-    prev_total_sales = summary.get("total_sales", 0)
-    prev_total_revenue = summary.get("total_sale_amt", 0)
-
-    # API 키 확인 (OpenAI 우선)
-    openai_key = os.environ.get("OPENAI_API_KEY")
-    anthropic_key = os.environ.get("ANTHROPIC_API_KEY")
-
-    if not openai_key and not anthropic_key:
-        print("[Budget API] API 키 미설정 → 룰 기반 폴백")
-        return _fallback_proposal(summary, class_analysis)
 
     # 카테고리별 평균단가 컨텍스트
     price_lines = []
@@ -189,55 +413,132 @@ async def budget_proposal(req: BudgetProposalRequest):
         )
     price_context = "\n".join(price_lines) if price_lines else "없음"
 
-    # 프롬프트 생성
-    context = json.dumps(closing_data, ensure_ascii=False, indent=2)
+    # 토큰 예산 안의 압축 컨텍스트 → 스타일 수와 무관하게 크기 일정
+    context, context_stats = build_budget_context(closing_data)
     prompt = BUDGET_PROMPT_TEMPLATE.format(
-        season=req.season,
+        season=season,
         context=context,
-        prev_total_revenue=prev_total_revenue,
-        prev_total_sales=prev_total_sales,
+        prev_total_revenue=summary.get("total_sale_amt", 0),
+        prev_total_sales=summary.get("total_sales", 0),
         price_context=price_context,
     )
+    prompt_tokens = estimate_tokens(prompt)
+    print(f"[Budget API] 프롬프트 {len(prompt):,}자 / 약 {prompt_tokens:,}토큰 "
+          f"(컨텍스트 {context_stats['tokens']:,}토큰, 스타일 샘플 {context_stats['sample_styles']}개, "
+          f"아이템 {context_stats['items']}개{', 예산 초과분 생략' if context_stats['truncated'] else ''})")
+    return prompt, prompt_tokens
 
-    # LLM 호출 (OpenAI → Anthropic → 폴백)
-    response_text = None
-
-    if openai_key:
-        try:
-            print(f"[Budget API] OpenAI GPT-4o 호출 시작 (key: ...{openai_key[-6:]})")
-            response_text = _call_openai(prompt, openai_key)
-            print("[Budget API] OpenAI 호출 성공")
-        except Exception as e:
-            print(f"[Budget API] OpenAI 호출 실패: {type(e).__name__}: {e}")
-
-    if response_text is None and anthropic_key:
-        try:
-            print(f"[Budget API] Claude 호출 시작 (key: ...{anthropic_key[-6:]})")
-            response_text = _call_anthropic(prompt, anthropic_key)
-            print("[Budget API] Claude 호출 성공")
-        except Exception as e:
-            print(f"[Budget API] Claude 호출 실패: {type(e).__name__}: {e}")
 
-    if response_text is None:
-        print("[Budget API] 모든 LLM 실패 → 룰 기반 폴백")
-        return _fallback_proposal(summary, class_analysis)
+def _proposal_parser(closing_data: dict, prompt_tokens: int):
+    """LLM 응답 텍스트 → BudgetProposalResponse 변환 함수 (유효하지 않으면 예외)"""
+    summary = closing_data.get("summary", {})
 
-    # 응답 파싱
-    try:
+    def _to_response(response_text: str) -> BudgetProposalResponse:
         result = _parse_llm_response(response_text)
         return BudgetProposalResponse(
             ai_commentary=result.get("ai_commentary", ""),
             target_total_revenue=result.get("target_total_revenue", 0),
-            prev_total_revenue=prev_total_revenue,
-            prev_total_sales=prev_total_sales,
+            prev_total_revenue=summary.get("total_sale_amt", 0),
+            prev_total_sales=summary.get("total_sales", 0),
             category_targets=[
                 CategoryTarget(**cat) for cat in result.get("category_targets", [])
-            ]
+            ],
+            prompt_tokens=prompt_tokens,
         )
-    except (json.JSONDecodeError, KeyError, TypeError) as e:
-        print(f"[Budget API] LLM 응답 파싱 실패 → 폴백: {e}")
-        print(f"[Budget API] 원본 응답: {response_text[:500]}")
+
+    return _to_response
+
+
+@app.post("/api/budget-proposal", response_model=BudgetProposalResponse)
+async def budget_proposal(req: BudgetProposalRequest):
+    """
+    LLM을 호출하여 차시즌 목표매출(판매수량)을 제안받는 엔드포인트.
+    """
+    closing_data = _load_closing_data()
+    summary = closing_data.get("summary", {})
+    class_analysis = closing_data.get("class_analysis", [])
+
+    # API 키 확인 (OpenAI 우선)
+    openai_key = os.environ.get("OPENAI_API_KEY")
+    anthropic_key = os.environ.get("ANTHROPIC_API_KEY")
+
+    if not openai_key and not anthropic_key:
+        print("[Budget API] API 키 미설정 → 룰 기반 폴백")
+        return _fallback_proposal(summary, class_analysis)
+
+    prompt, prompt_tokens = _build_budget_prompt(req.season, closing_data)
+
+    # LLM 헤지 호출 (OpenAI 먼저, 지연 시 Anthropic 추가 → 먼저 파싱 성공한 응답 채택, 마감 시 폴백)
+    providers = _llm_providers(openai_key, anthropic_key)
+    models = [model for model, _ in providers]
+    cache_key = prompt_fingerprint(prompt, models, LLM_TEMPERATURE)
+    if not req.force_refresh:
+        hit = _proposal_cache().get(cache_key)
+        if hit is not None:
+            print(f"[Budget API] 캐시 적중 ({cache_key[:12]}) → LLM 호출 생략")
+            return BudgetProposalResponse(**{**hit, "cached": True})
+
+    proposal = await _hedged_completion(prompt, providers, _proposal_parser(closing_data, prompt_tokens))
+    if proposal is None:
+        print("[Budget API] 모든 LLM 실패 또는 마감 초과 → 룰 기반 폴백")
         return _fallback_proposal(summary, class_analysis)
+    _proposal_cache().put(cache_key, models, proposal.model_dump())
+    return proposal
+
+
+@app.post("/api/budget-proposal/stream")
+async def budget_proposal_stream(req: BudgetProposalRequest):
+    """
+    예산 제안 SSE 스트리밍 엔드포인트
+
+    이벤트 순서:
+    - provisional: 룰 기반 폴백 제안 (즉시, 잠정값)
+    - commentary: ai_commentary 증분 텍스트 {"delta"}
+    - category: 파싱이 끝난 category_targets 항목 (도착하는 대로)
+    - retry: 제공자 실패 → 다음 제공자로 재시작 {"model", "error"} (받은 증분은 폐기)
+    - final: 최종 제안 + "source" (llm / cache / fallback)
+    """
+    closing_data = _load_closing_data()
+    summary = closing_data.get("summary", {})
+    class_analysis = closing_data.get("class_analysis", [])
+    provisional = _fallback_proposal(summary, class_analysis)
+
+    openai_key = os.environ.get("OPENAI_API_KEY")
+    anthropic_key = os.environ.get("ANTHROPIC_API_KEY")
+
+    async def _events():
+        yield sse_event("provisional", provisional.model_dump())
+        if not openai_key and not anthropic_key:
+            print("[Budget API] API 키 미설정 → 룰 기반 폴백")
+            yield sse_event("final", {**provisional.model_dump(), "source": "fallback"})
+            return
+
+        prompt, prompt_tokens = _build_budget_prompt(req.season, closing_data)
+        providers = _llm_stream_providers(openai_key, anthropic_key)
+        models = [model for model, _, _ in providers]
+        cache_key = prompt_fingerprint(prompt, models, LLM_TEMPERATURE)
+        if not req.force_refresh:
+            hit = _proposal_cache().get(cache_key)
+            if hit is not None:
+                print(f"[Budget API] 캐시 적중 ({cache_key[:12]}) → LLM 호출 생략")
+                yield sse_event("final", {**hit, "cached": True, "source": "cache"})
+                return
+
+        async for event, data in _streamed_completion(prompt, providers, _proposal_parser(closing_data, prompt_tokens)):
+            if event == "final":
+                _proposal_cache().put(cache_key, models, data.model_dump())
+                yield sse_event("final", {**data.model_dump(), "source": "llm"})
+                return
+            yield sse_event(event, data)
+
+        print("[Budget API] 모든 LLM 실패 또는 마감 초과 → 룰 기반 폴백")
+        yield sse_event("final", {**provisional.model_dump(), "source": "fallback"})
+
+    return StreamingResponse(
+        _events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
 
 
 def _fallback_proposal(summary: dict, class_analysis: list) -> BudgetProposalResponse:
@@ -321,6 +622,12 @@ def _fallback_proposal(summary: dict, class_analysis: list) -> BudgetProposalRes
     )
 
 
+@lru_cache(maxsize=1)
+def _artifact_store() -> ArtifactStore:
+    """산출물 저장소 (첫 사용 시 output/artifact_state 생성)"""
+    return ArtifactStore(ARTIFACT_STATE_DIR)
+
+
 @app.post("/api/budget-config")
 async def save_budget_config(config: BudgetConfigRequest):
     """확정된 발주예산을 output/budget_config.json에 저장합니다."""
@@ -343,10 +650,13 @@ async def save_budget_config(config: BudgetConfigRequest):
         ]
     }
 
-    with open(BUDGET_CONFIG_PATH, "w", encoding="utf-8") as f:
-        json.dump(output, f, ensure_ascii=False, indent=2)
+    version = await asyncio.to_thread(_artifact_store().write_json, BUDGET_CONFIG_PATH, output)
+
+    # 예산 천장이 바뀌었으므로 다음 PATCH에서 확정 맵핑 전체 재계산
+    with _recommendation_state.lock:
+        _recommendation_state.clear()
 
-    return {"status": "ok", "path": BUDGET_CONFIG_PATH}
+    return {"status": "ok", "path": BUDGET_CONFIG_PATH, "version": version}
 
 
 # ── 유사스타일 확정 → 발주추천 ────────────────────────────
@@ -356,6 +666,8 @@ ANALYSIS_RESULT_PATH = os.path.join(OUTPUT_DIR, "25S_TimeSeries_Analysis_Result.
 ORDER_REC_JSON = os.path.join(OUTPUT_DIR, "26S_Order_Recommendation.json")
 ORDER_REC_EXCEL = os.path.join(OUTPUT_DIR, "26S_Order_Recommendation.xlsx")
 ORDER_REC_PUBLIC_JSON = os.path.join(PUBLIC_DIR, "order_recommendation_data.json")
+JOB_DB_PATH = os.path.join(OUTPUT_DIR, "jobs.sqlite3")
+JOB_WORKERS = int(os.environ.get("JOB_WORKERS", "2"))
 
 # STEP2/3 결과 컬럼명
 _COL_PART_CD = "PART_CD"
@@ -377,9 +689,11 @@ def _ceil_10(x):
     return int(math.ceil(x / 10) * 10)
 
 
-def _load_style_summary() -> pd.DataFrame:
+def _load_style_summary(df: Optional[pd.DataFrame] = None) -> pd.DataFrame:
     """STEP2/3 분석 결과를 스타일 레벨로 집계하여 반환"""
-    df = pd.read_excel(ANALYSIS_RESULT_PATH)
+    if df is None:
+        df = pd.read_excel(ANALYSIS_RESULT_PATH)
+    df = df.copy()
 
     for col in [_COL_TOTAL_ORDER, _COL_TOTAL_INBOUND, _COL_TOTAL_SALE,
                 _COL_AI_OPP_COST, _COL_AI_ORDER, _COL_SELL_RATE]:
@@ -425,49 +739,30 @@ def _load_style_summary() -> pd.DataFrame:
     return style_summary
 
 
-def _load_color_detail() -> pd.DataFrame:
-    """STEP2/3 분석 결과를 컬러 레벨 그대로 반환 (배분용)"""
-    df = pd.read_excel(ANALYSIS_RESULT_PATH)
+def _load_color_allocation(df: Optional[pd.DataFrame] = None) -> ColorAllocationTable:
+    """STEP2/3 분석 결과(컬러 레벨) → 스타일별 컬러 AI발주량 비중 테이블 (배분용)"""
+    if df is None:
+        df = pd.read_excel(ANALYSIS_RESULT_PATH)
+    df = df.copy()
     for col in [_COL_AI_ORDER, _COL_PRICE]:
         if col in df.columns:
             df[col] = pd.to_numeric(df[col], errors="coerce").fillna(0)
-    return df
-
-
-def _get_color_breakdown(ref_part_cd: str, color_df: pd.DataFrame, total_qty: int) -> list:
-    """ref 스타일의 컬러별 AI발주량 비중으로 total_qty를 배분"""
-    rows = color_df[color_df[_COL_PART_CD] == ref_part_cd]
-    if rows.empty or _COL_AI_ORDER not in rows.columns:
-        return []
-
-    color_orders = []
-    for _, r in rows.iterrows():
-        color_orders.append({
-            "color_cd": str(r.get("COLOR_CD", "")),
-            "ai_order": float(r.get(_COL_AI_ORDER, 0)),
-        })
-
-    total_ai = sum(c["ai_order"] for c in color_orders)
-    if total_ai <= 0:
-        return []
-
-    colors = []
-    distributed = 0
-    for i, c in enumerate(color_orders):
-        ratio = c["ai_order"] / total_ai
-        if i == len(color_orders) - 1:
-            # 마지막 컬러: 나머지 배분 (10단위 올림 오차 보정)
-            qty = total_qty - distributed
-        else:
-            qty = _ceil_10(total_qty * ratio)
-            distributed += qty
-        colors.append({
-            "color_cd": c["color_cd"],
-            "ratio": round(ratio * 100, 1),
-            "qty": max(qty, 0),
-        })
+    return ColorAllocationTable.from_frame(df, _COL_PART_CD, "COLOR_CD", _COL_AI_ORDER)
+
 
-    return colors
+_analysis_cache = {}
+_analysis_lock = threading.Lock()
+
+
+def _analysis_tables():
+    """(스타일 요약, 컬러 배분 테이블, 파일 수정시각) - 분석 결과 파일이 바뀔 때만 다시 로드"""
+    with _analysis_lock:
+        mtime = os.path.getmtime(ANALYSIS_RESULT_PATH)
+        if _analysis_cache.get("mtime") != mtime:
+            df = pd.read_excel(ANALYSIS_RESULT_PATH)
+            _analysis_cache.update(mtime=mtime, style_summary=_load_style_summary(df),
+                                   color_table=_load_color_allocation(df))
+        return _analysis_cache["style_summary"], _analysis_cache["color_table"], mtime
 
 
 class ConfirmedMappingItem(BaseModel):
@@ -484,137 +779,102 @@ class ConfirmedMappingRequest(BaseModel):
     mappings: List[ConfirmedMappingItem]
 
 
-@app.post("/api/confirmed-mapping")
-async def save_confirmed_mapping(req: ConfirmedMappingRequest):
-    """
-    유사스타일 확정 저장 + 추천발주량 계산 + 결과 저장
-    1. confirmed_mapping.json 저장
-    2. 확정 ref의 AI제안 발주량 조회 → 추천발주량
-    3. budget_config.json 예산 천장 스케일링
-    4. 26S_Order_Recommendation.json + .xlsx 저장
-    """
-    os.makedirs(OUTPUT_DIR, exist_ok=True)
+def _load_budget_config() -> Optional[dict]:
+    """budget_config.json (없으면 None)"""
+    config, _ = _artifact_store().read_json(BUDGET_CONFIG_PATH)
+    return config
 
-    # 1. confirmed_mapping.json 저장
-    confirmed = {
-        "season": req.season,
-        "confirmed_at": datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ"),
-        "mappings": [m.model_dump() for m in req.mappings],
-    }
-    with open(CONFIRMED_MAPPING_PATH, "w", encoding="utf-8") as f:
-        json.dump(confirmed, f, ensure_ascii=False, indent=2)
-
-    # 2. 분석 결과 로드
-    if not os.path.exists(ANALYSIS_RESULT_PATH):
-        raise HTTPException(
-            status_code=404,
-            detail="25S_TimeSeries_Analysis_Result.xlsx가 없습니다. 파이프라인을 먼저 실행하세요."
-        )
 
-    style_summary = _load_style_summary()
-    color_df = _load_color_detail()
-
-    # 3. 각 확정 스타일의 추천발주량 산출
-    results = []
-    for m in req.mappings:
-        # 수동 입력 발주량 (매칭 불가 스타일)
-        if m.manual_order_qty is not None:
-            results.append({
-                "new_part_cd": m.new_part_cd,
-                "new_item_nm": m.new_item_nm,
-                "new_class2": m.new_class2,
-                "추천발주량": _ceil_10(m.manual_order_qty),
-                "budget_scaled": False,
-                "manual_input": True,
-            })
-            continue
-
-        # 유사스타일 기반 발주량
-        ref_info = {}
-        ai_order = 0
-        if m.selected_ref_part_cd:
-            ref_match = style_summary[style_summary[_COL_PART_CD] == m.selected_ref_part_cd]
-            if not ref_match.empty:
-                row = ref_match.iloc[0]
-                ai_order = int(row.get(_COL_AI_ORDER, 0))
-                ref_info = {
-                    "ref_part_cd": m.selected_ref_part_cd,
-                    "ref_score": m.selected_ref_score,
-                    "ref_총판매": int(row.get(_COL_TOTAL_SALE, 0)),
-                    "ref_총입고": int(row.get(_COL_TOTAL_INBOUND, 0)),
-                    "ref_판매율": float(row.get(_COL_SELL_RATE, 0)),
-                    "ref_진단": str(row.get(_COL_AI_DIAG, "-")),
-                    "ref_AI발주량": ai_order,
-                    "판매가": int(row.get(_COL_PRICE, 0)),
-                }
-
-        results.append({
+def _recommend_style(m: ConfirmedMappingItem, style_summary: pd.DataFrame) -> dict:
+    """확정 스타일 1건의 추천발주량 (예산 스케일링 전)"""
+    # 수동 입력 발주량 (매칭 불가 스타일)
+    if m.manual_order_qty is not None:
+        return {
             "new_part_cd": m.new_part_cd,
             "new_item_nm": m.new_item_nm,
             "new_class2": m.new_class2,
-            "추천발주량": _ceil_10(ai_order),
+            "추천발주량": _ceil_10(m.manual_order_qty),
             "budget_scaled": False,
-            **ref_info,
-        })
-
-    # 4. 예산 천장 스케일링
-    if os.path.exists(BUDGET_CONFIG_PATH):
-        with open(BUDGET_CONFIG_PATH, "r", encoding="utf-8") as f:
-            budget_config = json.load(f)
-
-        ceiling_map = {}
-        for cat in budget_config.get("category_budgets", []):
-            ceiling_map[cat["class2"]] = cat["budget_qty"]
-
-        if ceiling_map:
-            # 카테고리별 합산
-            cat_totals = {}
-            for rec in results:
-                cls2 = rec.get("new_class2", "")
-                qty = rec.get("추천발주량", 0)
-                if cls2 and qty > 0:
-                    cat_totals[cls2] = cat_totals.get(cls2, 0) + qty
-
-            # 스케일링 비율
-            scale_ratios = {}
-            for cls2, total_qty in cat_totals.items():
-                ceiling = ceiling_map.get(cls2)
-                if ceiling is not None and total_qty > ceiling and total_qty > 0:
-                    scale_ratios[cls2] = ceiling / total_qty
-
-            # 적용
-            for rec in results:
-                cls2 = rec.get("new_class2", "")
-                ratio = scale_ratios.get(cls2)
-                if ratio is not None and rec.get("추천발주량", 0) > 0:
-                    rec["original_recommendation"] = rec["추천발주량"]
-                    rec["추천발주량"] = _ceil_10(rec["추천발주량"] * ratio)
-                    rec["budget_scaled"] = True
-
-    # 5. 컬러별 배분
-    for rec in results:
-        ref_cd = rec.get("ref_part_cd")
+            "manual_input": True,
+        }
+
+    # 유사스타일 기반 발주량
+    ref_info = {}
+    ai_order = 0
+    if m.selected_ref_part_cd:
+        ref_match = style_summary[style_summary[_COL_PART_CD] == m.selected_ref_part_cd]
+        if not ref_match.empty:
+            row = ref_match.iloc[0]
+            ai_order = int(row.get(_COL_AI_ORDER, 0))
+            ref_info = {
+                "ref_part_cd": m.selected_ref_part_cd,
+                "ref_score": m.selected_ref_score,
+                "ref_총판매": int(row.get(_COL_TOTAL_SALE, 0)),
+                "ref_총입고": int(row.get(_COL_TOTAL_INBOUND, 0)),
+                "ref_판매율": float(row.get(_COL_SELL_RATE, 0)),
+                "ref_진단": str(row.get(_COL_AI_DIAG, "-")),
+                "ref_AI발주량": ai_order,
+                "판매가": int(row.get(_COL_PRICE, 0)),
+            }
+
+    return {
+        "new_part_cd": m.new_part_cd,
+        "new_item_nm": m.new_item_nm,
+        "new_class2": m.new_class2,
+        "추천발주량": _ceil_10(ai_order),
+        "budget_scaled": False,
+        **ref_info,
+    }
+
+
+def _ceiling_map(budget_config: Optional[dict]) -> dict:
+    """카테고리별 예산 천장 (수량)"""
+    if not budget_config:
+        return {}
+    return {cat["class2"]: cat["budget_qty"] for cat in budget_config.get("category_budgets", [])}
+
+
+def _scale_ratio(base_recs: list, ceiling: Optional[int]) -> Optional[float]:
+    """카테고리 1개의 예산 천장 스케일링 비율 (천장 이하이거나 천장이 없으면 None)"""
+    total_qty = sum(rec.get("추천발주량", 0) for rec in base_recs if rec.get("추천발주량", 0) > 0)
+    if ceiling is not None and total_qty > ceiling and total_qty > 0:
+        return ceiling / total_qty
+    return None
+
+
+def _scale_style(base: dict, ratio: Optional[float]) -> dict:
+    """스케일링 전 추천 → 예산 천장 스케일링 적용"""
+    rec = dict(base)
+    if ratio is not None and rec.get("추천발주량", 0) > 0:
+        rec["original_recommendation"] = rec["추천발주량"]
+        rec["추천발주량"] = _ceil_10(rec["추천발주량"] * ratio)
+        rec["budget_scaled"] = True
+    return rec
+
+
+def _attach_colors(recs: list, color_table: ColorAllocationTable) -> list:
+    """추천 목록 전체의 컬러별 배분 (ref 스타일 배분은 한 번의 벡터 연산)"""
+    allocated = [i for i, rec in enumerate(recs) if rec.get("ref_part_cd") and rec.get("추천발주량", 0) > 0]
+    breakdowns = color_table.allocate([recs[i]["ref_part_cd"] for i in allocated],
+                                      [recs[i]["추천발주량"] for i in allocated])
+    for rec in recs:
         qty = rec.get("추천발주량", 0)
-        if ref_cd and qty > 0:
-            rec["colors"] = _get_color_breakdown(ref_cd, color_df, qty)
-        elif rec.get("manual_input") and qty > 0:
+        if rec.get("manual_input") and not rec.get("ref_part_cd") and qty > 0:
             rec["colors"] = [{"color_cd": "-", "ratio": 100.0, "qty": qty}]
         else:
             rec["colors"] = []
+    for i, colors in zip(allocated, breakdowns):
+        recs[i]["colors"] = colors
+    return recs
 
-    # 6. 예산 천장 정보 수집 (프론트엔드용)
-    budget_info = None
-    if os.path.exists(BUDGET_CONFIG_PATH):
-        with open(BUDGET_CONFIG_PATH, "r", encoding="utf-8") as f:
-            budget_info = json.load(f)
 
-    # 카테고리별 합산 (프론트엔드 표시용)
+def _category_budgets(results: list, budget_info: Optional[dict]) -> list:
+    """카테고리별 예산 천장 대비 추천 합계 (프론트엔드 표시용)"""
     cat_summary = {}
     for rec in results:
         cls2 = rec.get("new_class2", "")
         qty = rec.get("추천발주량", 0)
         orig = rec.get("original_recommendation", qty)
-        price = rec.get("ref_AI발주량", 0)  # 판매가 조회 필요
         if cls2:
             if cls2 not in cat_summary:
                 cat_summary[cls2] = {"추천합계": 0, "스케일링전합계": 0}
@@ -632,64 +892,394 @@ async def save_confirmed_mapping(req: ConfirmedMappingRequest):
                 "recommended_qty": cs["추천합계"],
                 "pre_scale_qty": cs["스케일링전합계"],
             })
+    return category_budgets
 
-    # 7. JSON 저장
-    total = len(results)
-    matched = sum(1 for r in results if r.get("추천발주량", 0) > 0)
-    total_qty = sum(r.get("추천발주량", 0) for r in results)
-    scaled_count = sum(1 for r in results if r.get("budget_scaled"))
 
-    output_json = {
+def _build_recommendation_output(season: str, confirmed_at: str, results: list, budget_info: Optional[dict]) -> dict:
+    """26S_Order_Recommendation.json 내용 (metadata + recommendations)"""
+    return {
         "metadata": {
-            "season": req.season,
-            "confirmed_at": confirmed["confirmed_at"],
-            "total_styles": total,
-            "matched_styles": matched,
-            "total_recommendation_qty": total_qty,
-            "scaled_count": scaled_count,
-            "category_budgets": category_budgets,
+            "season": season,
+            "confirmed_at": confirmed_at,
+            "total_styles": len(results),
+            "matched_styles": sum(1 for r in results if r.get("추천발주량", 0) > 0),
+            "total_recommendation_qty": sum(r.get("추천발주량", 0) for r in results),
+            "scaled_count": sum(1 for r in results if r.get("budget_scaled")),
+            "category_budgets": _category_budgets(results, budget_info),
         },
         "recommendations": results,
     }
 
-    with open(ORDER_REC_JSON, "w", encoding="utf-8") as f:
-        json.dump(output_json, f, ensure_ascii=False, indent=2)
-
-    # 프론트엔드용 public JSON
-    os.makedirs(PUBLIC_DIR, exist_ok=True)
-    with open(ORDER_REC_PUBLIC_JSON, "w", encoding="utf-8") as f:
-        json.dump(output_json, f, ensure_ascii=False, indent=2)
-
-    # 8. Excel 저장 (컬러별 전개)
-    if results:
-        excel_rows = []
-        for rec in results:
-            for c in rec.get("colors", []):
-                excel_rows.append({
-                    "NEW_PART_CD": rec["new_part_cd"],
-                    "NEW_ITEM_NM": rec["new_item_nm"],
-                    "NEW_CLASS2": rec["new_class2"],
-                    "COLOR_CD": c["color_cd"],
-                    "비중(%)": c["ratio"],
-                    "AI추천수량": c["qty"],
-                    "스타일합계": rec["추천발주량"],
-                    "budget_scaled": rec.get("budget_scaled", False),
-                })
-        if not excel_rows:
-            excel_rows = [{"message": "추천 데이터 없음"}]
-        edf = pd.DataFrame(excel_rows)
-        with pd.ExcelWriter(ORDER_REC_EXCEL, engine="openpyxl") as writer:
+
+def _artifact_stamp(path: str) -> tuple:
+    """산출물 변경 감지용 (저장소 버전, (inode, 수정시각, 크기)) - 파이프라인 / 다른 서버 프로세스의 교체도 감지"""
+    try:
+        st = os.stat(path)
+        file_key = (st.st_ino, st.st_mtime_ns, st.st_size)
+    except FileNotFoundError:
+        file_key = None
+    return _artifact_store().version(path), file_key
+
+
+class _RecommendationState:
+    """
+    확정 맵핑 / 추천 결과 메모리 상태
+
+    - rebuild: 전체 맵핑 재계산 (POST 확정, 서버 재시작 후 첫 PATCH,
+      예산 / 확정 맵핑 / 분석 결과 파일이 다른 경로로 바뀐 경우)
+    - patch: 스타일 1건만 재계산 + 소속 카테고리 스케일링 비율 갱신
+      (비율이 바뀌면 같은 카테고리 스타일만 수량 / 컬러 배분 재계산)
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.clear()
+
+    def clear(self):
+        self.loaded = False
+        self.analysis_mtime = None
+        self.season = None
+        self.confirmed_at = None
+        self.budget_info = None
+        self.mappings = {}  # new_part_cd → ConfirmedMappingItem (확정 순서 유지)
+        self.base = {}      # new_part_cd → 스케일링 전 추천
+        self.results = {}   # new_part_cd → 최종 추천 (스케일링 + 컬러 배분)
+        self.ratios = {}    # class2 → 예산 천장 스케일링 비율 (None: 스케일링 없음)
+        self.stamps = {}    # 경로 → 상태 구성 시점의 _artifact_stamp (budget_config / confirmed_mapping)
+
+    def _class_members(self, cls2: str) -> list:
+        return [cd for cd, rec in self.base.items() if rec.get("new_class2") == cls2]
+
+    def rebuild(self, season: str, confirmed_at: str, mappings: List[ConfirmedMappingItem]):
+        style_summary, color_table, self.analysis_mtime = _analysis_tables()
+        self.stamps = {BUDGET_CONFIG_PATH: _artifact_stamp(BUDGET_CONFIG_PATH)}  # 읽기 전에 기록 (사이 변경은 다음에 감지)
+        self.budget_info = _load_budget_config()
+        ceilings = _ceiling_map(self.budget_info)
+        self.season, self.confirmed_at = season, confirmed_at
+        self.mappings = {m.new_part_cd: m for m in mappings}
+        self.base = {cd: _recommend_style(m, style_summary) for cd, m in self.mappings.items()}
+
+        classes = {rec["new_class2"] for rec in self.base.values() if rec.get("new_class2")}
+        self.ratios = {cls2: _scale_ratio([self.base[cd] for cd in self._class_members(cls2)], ceilings.get(cls2))
+                       for cls2 in classes}
+        results = _attach_colors([_scale_style(rec, self.ratios.get(rec.get("new_class2", "")))
+                                  for rec in self.base.values()], color_table)
+        self.results = dict(zip(self.base.keys(), results))
+        self.loaded = True
+
+    def reload(self) -> bool:
+        """confirmed_mapping.json에서 전체 재구성 (파일이 없으면 False)"""
+        stamp = _artifact_stamp(CONFIRMED_MAPPING_PATH)
+        confirmed, _ = _artifact_store().read_json(CONFIRMED_MAPPING_PATH)
+        if confirmed is None:
+            return False
+        self.rebuild(confirmed.get("season", "26S"), confirmed.get("confirmed_at"),
+                     [ConfirmedMappingItem(**m) for m in confirmed.get("mappings", [])])
+        self.stamps[CONFIRMED_MAPPING_PATH] = stamp
+        print(f"[Mapping API] 메모리 상태 재구성: {len(self.mappings)}개 스타일")
+        return True
+
+    def is_stale(self) -> bool:
+        """아직 로드하지 않았거나, 상태 구성 후 분석 결과 / 예산 / 확정 맵핑 파일이 바뀐 상태"""
+        if not self.loaded:
+            return True
+        if os.path.getmtime(ANALYSIS_RESULT_PATH) != self.analysis_mtime:
+            return True
+        return any(_artifact_stamp(path) != stamp for path, stamp in self.stamps.items())
+
+    def patch(self, new_part_cd: str, fields: dict) -> dict:
+        """
+        스타일 1건 맵핑 갱신
+
+        Returns:
+            {"changed": 값이 바뀐 최종 추천 목록, "class2", "scale_ratio"}
+        """
+        style_summary, color_table, _ = _analysis_tables()
+        m = self.mappings[new_part_cd].model_copy(update=fields)
+        self.mappings[new_part_cd] = m
+        self.base[new_part_cd] = _recommend_style(m, style_summary)
+        self.confirmed_at = datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+        cls2 = m.new_class2
+        members = self._class_members(cls2) if cls2 else [new_part_cd]
+        ratio = _scale_ratio([self.base[cd] for cd in members], _ceiling_map(self.budget_info).get(cls2))
+        targets = members if cls2 and ratio != self.ratios.get(cls2) else [new_part_cd]
+        if cls2:
+            self.ratios[cls2] = ratio
+
+        changed = []
+        recs = _attach_colors([_scale_style(self.base[cd], ratio if cls2 else None) for cd in targets], color_table)
+        for cd, rec in zip(targets, recs):
+            if rec != self.results.get(cd):
+                changed.append(rec)
+            self.results[cd] = rec
+        return {"changed": changed, "class2": cls2, "scale_ratio": ratio}
+
+    def confirmed_json(self) -> dict:
+        return {
+            "season": self.season,
+            "confirmed_at": self.confirmed_at,
+            "mappings": [m.model_dump() for m in self.mappings.values()],
+        }
+
+    def output(self) -> dict:
+        return _build_recommendation_output(self.season, self.confirmed_at,
+                                            list(self.results.values()), self.budget_info)
+
+
+_recommendation_state = _RecommendationState()
+
+
+def _save_recommendation_json(output_json: dict) -> int:
+    """26S_Order_Recommendation.json + 프론트엔드용 public JSON 저장 → 추천 JSON 버전"""
+    store = _artifact_store()
+    version = store.write_json(ORDER_REC_JSON, output_json)
+    store.write_json(ORDER_REC_PUBLIC_JSON, output_json)
+    return version
+
+
+def _save_recommendation_excel(results: list, source_version: int) -> Optional[int]:
+    """
+    26S_Order_Recommendation.xlsx 저장 (컬러별 전개)
+
+    source_version: 엑셀의 기준이 된 추천 JSON 버전. 그 사이 더 새 JSON이 저장됐으면
+    (뒤따르는 작업이 최신 엑셀을 만들므로) 건너뛰어 늦게 끝난 작업이 최신 엑셀을 덮어쓰지 않게 함
+    """
+    if not results:
+        return None
+    excel_rows = []
+    for rec in results:
+        for c in rec.get("colors", []):
+            excel_rows.append({
+                "NEW_PART_CD": rec["new_part_cd"],
+                "NEW_ITEM_NM": rec["new_item_nm"],
+                "NEW_CLASS2": rec["new_class2"],
+                "COLOR_CD": c["color_cd"],
+                "비중(%)": c["ratio"],
+                "AI추천수량": c["qty"],
+                "스타일합계": rec["추천발주량"],
+                "budget_scaled": rec.get("budget_scaled", False),
+            })
+    if not excel_rows:
+        excel_rows = [{"message": "추천 데이터 없음"}]
+    edf = pd.DataFrame(excel_rows)
+    store = _artifact_store()
+
+    def _write(tmp: str):
+        if store.version(ORDER_REC_JSON) != source_version:
+            print(f"[Mapping API] 엑셀 생성 건너뜀 (추천 JSON v{source_version} → 더 새 버전 있음)")
+            return False
+        with pd.ExcelWriter(tmp, engine="openpyxl") as writer:
             edf.to_excel(writer, index=False, sheet_name="26S 발주 추천")
 
+    return store.write_file(ORDER_REC_EXCEL, _write)
+
+
+def _recommendation_summary(output_json: dict, version: int) -> dict:
+    """API 응답 / 작업 결과용 요약"""
+    meta = output_json["metadata"]
+    return {
+        "version": version,
+        "total_styles": meta["total_styles"],
+        "matched_styles": meta["matched_styles"],
+        "total_recommendation_qty": meta["total_recommendation_qty"],
+        "results": output_json["recommendations"],
+    }
+
+
+def _confirmed_mapping_job(report, mapping_version: int) -> dict:
+    """
+    확정 맵핑 작업: confirmed_mapping.json(mapping_version) 기준 추천 계산 → JSON 저장(중간 결과 기록) → 엑셀 저장
+
+    작업이 실행되기 전에 다른 확정 저장 / PATCH로 맵핑 버전이 바뀌었으면 계산 / 저장을 건너뜀
+    (더 새 맵핑을 저장한 쪽이 추천 JSON / 엑셀도 저장하므로, 늦게 실행된 작업이 덮어쓰지 않게 함)
+    """
+    report(0.1, "추천발주량 계산")
+    state, store = _recommendation_state, _artifact_store()
+    with state.lock:
+        stamp = _artifact_stamp(CONFIRMED_MAPPING_PATH)
+        confirmed, current_version = store.read_json(CONFIRMED_MAPPING_PATH)
+        if confirmed is None or current_version != mapping_version:
+            print(f"[Mapping API] 확정 맵핑 v{mapping_version} 작업 건너뜀 (현재 v{current_version})")
+            if state.is_stale() and not state.reload():
+                raise RuntimeError("confirmed_mapping.json이 없습니다.")
+            summary = _recommendation_summary(state.output(), store.version(ORDER_REC_JSON))
+            return {**summary, "superseded": True}
+
+        state.rebuild(confirmed.get("season", "26S"), confirmed.get("confirmed_at"),
+                      [ConfirmedMappingItem(**m) for m in confirmed.get("mappings", [])])
+        state.stamps[CONFIRMED_MAPPING_PATH] = stamp
+        output_json = state.output()
+        # PATCH 저장과 순서가 뒤바뀌지 않도록 메모리 상태 잠금 안에서 저장
+        report(0.6, "추천 JSON 저장")
+        version = _save_recommendation_json(output_json)
+    summary = _recommendation_summary(output_json, version)
+    report(0.7, "엑셀 생성", result=summary)
+
+    _save_recommendation_excel(output_json["recommendations"], version)
+    return summary
+
+
+@lru_cache(maxsize=1)
+def _job_runner() -> JobRunner:
+    """백그라운드 작업 실행기 (첫 사용 시 output/jobs.sqlite3 생성)"""
+    return JobRunner(JobStore(JOB_DB_PATH), JOB_WORKERS)
+
+
+def _write_confirmed_mapping(confirmed: dict) -> int:
+    """
+    confirmed_mapping.json 저장 후 메모리 상태 폐기 (메모리 상태 잠금 안에서)
+
+    저장과 폐기 사이에 PATCH가 끼어들어 이전 메모리 상태로 새 맵핑 파일을 덮어쓰지 않도록,
+    이후 PATCH / 작업은 새 파일에서 상태를 다시 구성
+    """
+    with _recommendation_state.lock:
+        version = _artifact_store().write_json(CONFIRMED_MAPPING_PATH, confirmed)
+        _recommendation_state.clear()
+    return version
+
+
+@app.post("/api/confirmed-mapping", status_code=202)
+async def save_confirmed_mapping(req: ConfirmedMappingRequest):
+    """
+    유사스타일 확정 저장 후 추천발주량 계산 작업 등록 (작업 ID 즉시 반환)
+    1. confirmed_mapping.json 저장
+    2. 백그라운드 작업: 추천 계산 → 26S_Order_Recommendation.json (결과 기록) → .xlsx
+       진행 상황은 GET /api/jobs/{job_id}
+    """
+    os.makedirs(OUTPUT_DIR, exist_ok=True)
+
+    # 1. confirmed_mapping.json 저장
+    confirmed = {
+        "season": req.season,
+        "confirmed_at": datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ"),
+        "mappings": [m.model_dump() for m in req.mappings],
+    }
+    mapping_version = await asyncio.to_thread(_write_confirmed_mapping, confirmed)
+
+    # 2. 분석 결과 확인 후 작업 등록
+    if not os.path.exists(ANALYSIS_RESULT_PATH):
+        raise HTTPException(
+            status_code=404,
+            detail="25S_TimeSeries_Analysis_Result.xlsx가 없습니다. 파이프라인을 먼저 실행하세요."
+        )
+
+    job_id = _job_runner().submit("confirmed_mapping", _confirmed_mapping_job, mapping_version)
+    return {"status": "accepted", "job_id": job_id, "status_url": f"/api/jobs/{job_id}",
+            "mapping_version": mapping_version}
+
+
+class MappingPatchRequest(BaseModel):
+    selected_ref_part_cd: Optional[str] = None
+    selected_ref_score: Optional[float] = None
+    manual_order_qty: Optional[int] = None
+
+
+def _excel_job(report, results: list, source_version: int):
+    report(0.1, "엑셀 생성")
+    _save_recommendation_excel(results, source_version)
+
+
+def _patch_mapping(new_part_cd: str, fields: dict) -> dict:
+    """PATCH 처리 (워커 스레드): 메모리 상태 갱신 → 확정 맵핑 + 추천 JSON 저장 → 엑셀은 백그라운드 작업"""
+    state, store = _recommendation_state, _artifact_store()
+    with state.lock:
+        if state.is_stale() and not state.reload():
+            raise HTTPException(status_code=404, detail="confirmed_mapping.json이 없습니다. 먼저 전체 확정을 저장하세요.")
+        if new_part_cd not in state.mappings:
+            raise HTTPException(status_code=404, detail=f"확정 맵핑에 없는 스타일입니다: {new_part_cd}")
+
+        delta = state.patch(new_part_cd, fields)
+        output_json = state.output()
+
+        # 변경분 1회 저장 (확정 맵핑 + 추천 JSON)
+        mapping_version = store.write_json(CONFIRMED_MAPPING_PATH, state.confirmed_json())
+        state.stamps[CONFIRMED_MAPPING_PATH] = _artifact_stamp(CONFIRMED_MAPPING_PATH)
+        version = _save_recommendation_json(output_json)
+
+    job_id = _job_runner().submit("order_excel", _excel_job, output_json["recommendations"], version)
+    metadata = output_json["metadata"]
+    category = next((c for c in metadata["category_budgets"] if c["class2"] == delta["class2"]), None)
     return {
         "status": "ok",
-        "total_styles": total,
-        "matched_styles": matched,
-        "total_recommendation_qty": total_qty,
-        "results": results,
+        "new_part_cd": new_part_cd,
+        "changed": delta["changed"],
+        "class2": delta["class2"],
+        "scale_ratio": delta["scale_ratio"],
+        "category_budget": category,
+        "metadata": {k: v for k, v in metadata.items() if k != "category_budgets"},
+        "excel_job_id": job_id,
+        "mapping_version": mapping_version,
+        "version": version,
+    }
+
+
+@app.patch("/api/confirmed-mapping/{new_part_cd}")
+async def patch_confirmed_mapping(new_part_cd: str, req: MappingPatchRequest):
+    """
+    확정 맵핑 스타일 1건 갱신 (ref 변경 / 수동 발주량)
+    - 해당 스타일 + 소속 카테고리 예산 스케일링만 재계산하고 변경분(delta) 반환
+    - 요청에 포함된 필드만 반영 (null을 보내면 해당 값 해제)
+    """
+    if not os.path.exists(ANALYSIS_RESULT_PATH):
+        raise HTTPException(
+            status_code=404,
+            detail="25S_TimeSeries_Analysis_Result.xlsx가 없습니다. 파이프라인을 먼저 실행하세요."
+        )
+    return await asyncio.to_thread(_patch_mapping, new_part_cd, req.model_dump(exclude_unset=True))
+
+
+@app.get("/api/jobs")
+async def list_jobs(limit: int = 20, kind: Optional[str] = None):
+    """최근 작업 목록 (결과 본문 제외)"""
+    return {"jobs": _job_runner().store.recent(limit, kind)}
+
+
+@app.get("/api/jobs/{job_id}")
+async def get_job(job_id: str):
+    """작업 상태 / 진행률 / 단계 / 결과 (result_ready면 엑셀 생성 전이라도 결과 사용 가능)"""
+    job = _job_runner().store.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"작업을 찾을 수 없습니다: {job_id}")
+    return job
+
+
+# ── 대시보드 산출물 서빙 ──────────────────────────────────
+
+def _dashboard_artifact_paths() -> dict:
+    """API로 제공하는 산출물 이름 → 경로 (public/ 의 파이프라인 / 서버 산출물)"""
+    return {
+        "season_closing_data.json": SEASON_CLOSING_PATH,
+        "dashboard_data.json": os.path.join(PUBLIC_DIR, "dashboard_data.json"),
+        "style_mapping_data.json": os.path.join(PUBLIC_DIR, "style_mapping_data.json"),
+        "order_recommendation_data.json": ORDER_REC_PUBLIC_JSON,
     }
 
 
+_artifact_cache = ArtifactCache()
+
+
+def _read_artifact(path: str) -> Optional[bytes]:
+    data, _ = _artifact_store().snapshot(path)
+    return data
+
+
+@app.api_route("/api/artifacts/{name}", methods=["GET", "HEAD"])
+async def get_dashboard_artifact(name: str, request: Request):
+    """
+    대시보드 산출물 JSON (정적 파일 대신 API로 제공)
+    - 내용 해시 ETag + Cache-Control: no-cache → 재방문 시 If-None-Match 조건부 요청으로 304
+    - Accept-Encoding에 따라 미리 만들어 둔 brotli / gzip 본문, Range 요청은 원본 기준 206
+    """
+    path = _dashboard_artifact_paths().get(name)
+    if path is None:
+        raise HTTPException(status_code=404, detail=f"제공하지 않는 산출물입니다: {name}")
+    artifact = await asyncio.to_thread(_artifact_cache.load, path, _read_artifact)
+    if artifact is None:
+        raise HTTPException(status_code=404, detail=f"{name}이 없습니다. 파이프라인을 먼저 실행하세요.")
+    return artifact_response(artifact, request.headers, head=request.method == "HEAD")
+
+
 @app.get("/api/health")
 async def health():
     return {"status": "ok"}
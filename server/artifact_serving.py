@@ -0,0 +1,169 @@
+"""
+대시보드 산출물(JSON) HTTP 서빙
+- 파일이 바뀔 때(inode / 크기 / 수정시각)만 다시 읽어 내용 해시 ETag와 gzip / brotli 압축본을 미리 만들어 둠
+  → 이후 요청은 해시 / 압축 없이 메모리의 바이트를 그대로 응답
+- If-None-Match 일치 → 304 (재방문 시 조건부 요청 1회로 끝남)
+- Range(bytes 단일 구간) → 206 / 416, 압축 없는 원본 기준 (If-Range 불일치 시 전체 응답)
+- brotli 패키지가 없으면 gzip만 제공
+"""
+
+import gzip
+import hashlib
+import os
+import threading
+from typing import Callable, Dict, Optional, Tuple
+
+from fastapi import Response
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+GZIP_LEVEL = 9
+BROTLI_QUALITY = 9          # 11은 수 MB JSON에서 첫 요청이 수 초 걸려 9 사용
+MIN_COMPRESS_BYTES = 1024   # 이보다 작으면 압축본을 만들지 않음
+CACHE_CONTROL = "no-cache"  # 매 방문 재검증 (ETag 일치 시 304)
+
+_ENCODERS = {"gzip": lambda body: gzip.compress(body, compresslevel=GZIP_LEVEL, mtime=0)}
+if brotli is not None:
+    _ENCODERS["br"] = lambda body: brotli.compress(body, quality=BROTLI_QUALITY)
+_PREFERENCE = ("br", "gzip")
+
+
+class ServedArtifact:
+    """파일 1개 버전의 원본 / 압축본 / ETag"""
+
+    def __init__(self, body: bytes, stat_key: tuple):
+        self.stat_key = stat_key
+        digest = hashlib.sha256(body).hexdigest()[:32]
+        self.bodies = {"identity": body}
+        for encoding, encode in _ENCODERS.items():
+            if len(body) < MIN_COMPRESS_BYTES:
+                break
+            compressed = encode(body)
+            if len(compressed) < len(body):
+                self.bodies[encoding] = compressed
+        # 강한 ETag는 표현(인코딩)마다 달라야 함
+        self.etags = {encoding: f'"{digest}"' if encoding == "identity" else f'"{digest}-{encoding}"'
+                      for encoding in self.bodies}
+
+
+class ArtifactCache:
+    """경로별 ServedArtifact 캐시 (파일 변경 시 갱신)"""
+
+    def __init__(self):
+        self._entries: Dict[str, ServedArtifact] = {}
+        self._lock = threading.Lock()
+
+    def load(self, path: str, read: Callable[[str], Optional[bytes]]) -> Optional[ServedArtifact]:
+        """파일이 없으면 None"""
+        try:
+            st = os.stat(path)
+        except FileNotFoundError:
+            return None
+        stat_key = (st.st_ino, st.st_size, st.st_mtime_ns)
+        with self._lock:
+            entry = self._entries.get(path)
+            if entry is not None and entry.stat_key == stat_key:
+                return entry
+            body = read(path)
+            if body is None:
+                return None
+            entry = ServedArtifact(body, stat_key)
+            self._entries[path] = entry
+            sizes = ", ".join(f"{enc} {len(data):,}B" for enc, data in entry.bodies.items())
+            print(f"[Artifacts] {os.path.basename(path)} 갱신: {sizes}")
+            return entry
+
+
+def _negotiate(accept_encoding: str, available) -> str:
+    """Accept-Encoding(q값 포함)에서 제공 가능한 최선의 인코딩"""
+    accepted = {}
+    for part in accept_encoding.split(","):
+        token, _, params = part.strip().partition(";")
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        if token:
+            accepted[token.lower()] = q
+    for encoding in _PREFERENCE:
+        q = accepted.get(encoding, accepted.get("*", 0.0))
+        if encoding in available and q > 0:
+            return encoding
+    return "identity"
+
+
+def _etag_matches(if_none_match: str, artifact: ServedArtifact) -> bool:
+    if if_none_match.strip() == "*":
+        return True
+    tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+    return not tags.isdisjoint(artifact.etags.values())
+
+
+def _parse_range(header: str, size: int) -> Optional[Tuple[int, int]]:
+    """
+    'bytes=a-b' / 'bytes=a-' / 'bytes=-n' → (시작, 끝) 포함 구간
+
+    Returns:
+        None: 형식 오류 / 다중 구간 (전체 응답), (size, size): 만족 불가 (416)
+    """
+    unit, _, spec = header.partition("=")
+    if unit.strip().lower() != "bytes" or "," in spec:
+        return None
+    start, sep, end = spec.strip().partition("-")
+    if not sep:
+        return None
+    try:
+        if not start:
+            suffix = int(end)
+            if suffix <= 0:
+                return size, size
+            return max(size - suffix, 0), size - 1
+        first = int(start)
+        last = int(end) if end else size - 1
+    except ValueError:
+        return None
+    if first >= size:
+        return size, size
+    if first > last:
+        return None
+    return first, min(last, size - 1)
+
+
+def artifact_response(artifact: ServedArtifact, headers, head: bool = False) -> Response:
+    """요청 헤더에 맞춘 200 / 206 / 304 / 416 응답"""
+    encoding = _negotiate(headers.get("accept-encoding", ""), artifact.bodies)
+    common = {"Cache-Control": CACHE_CONTROL, "Vary": "Accept-Encoding", "Accept-Ranges": "bytes"}
+
+    if_none_match = headers.get("if-none-match")
+    if if_none_match is not None and _etag_matches(if_none_match, artifact):
+        return Response(status_code=304, headers={**common, "ETag": artifact.etags[encoding]})
+
+    range_header = headers.get("range")
+    if_range = headers.get("if-range")
+    if range_header and not head and (if_range is None or if_range.strip() == artifact.etags["identity"]):
+        body = artifact.bodies["identity"]
+        byte_range = _parse_range(range_header, len(body))
+        if byte_range is not None:
+            first, last = byte_range
+            if first >= len(body):
+                return Response(status_code=416, headers={**common, "Content-Range": f"bytes */{len(body)}"})
+            return Response(
+                content=body[first:last + 1], status_code=206, media_type="application/json",
+                headers={**common, "ETag": artifact.etags["identity"],
+                         "Content-Range": f"bytes {first}-{last}/{len(body)}"},
+            )
+
+    body = artifact.bodies[encoding]
+    response_headers = {**common, "ETag": artifact.etags[encoding]}
+    if encoding != "identity":
+        response_headers["Content-Encoding"] = encoding
+    if head:
+        response_headers["Content-Length"] = str(len(body))
+        return Response(status_code=200, media_type="application/json", headers=response_headers)
+    return Response(content=body, status_code=200, media_type="application/json", headers=response_headers)
@@ -0,0 +1,175 @@
+"""
+서버 산출물 저장소 (원자적 교체 + 산출물별 잠금 + 버전 카운터)
+- write_json / write_file: 같은 디렉터리 임시 파일에 기록 → fsync → os.replace
+  (scripts/artifact_io.py와 같은 방식, 쓰다 만 파일이 노출되지 않음)
+- 산출물별 잠금: 프로세스 내 스레드 잠금 + 잠금 파일(fcntl, 지원 OS에서만)
+  → 동시 요청 / 여러 서버 워커 프로세스의 쓰기가 섞이지 않음
+- 버전 카운터: SQLite에 산출물별 시퀀스 기록 (교체 직전 홀수, 교체 후 짝수, 버전 = 시퀀스 // 2)
+- snapshot / read_json: 잠금 없이 읽고 읽는 동안 시퀀스가 바뀌었으면 다시 읽음
+  → 읽는 쪽이 쓰기를 막지 않으면서 항상 (내용, 버전)이 일치하는 스냅샷을 받음
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Optional, Tuple
+
+try:
+    import fcntl
+except ImportError:  # Windows: 프로세스 간 잠금 없이 프로세스 내 잠금만 사용
+    fcntl = None
+
+READ_RETRIES = 50          # 쓰기 중(홀수 시퀀스)일 때 재시도 횟수
+READ_RETRY_SEC = 0.01
+
+
+def _temp_path(path: str) -> str:
+    """대상 파일과 같은 디렉터리의 임시 파일 경로 (같은 파일시스템이어야 rename이 원자적)"""
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    # 확장자 유지 (엑셀 엔진 등이 확장자로 형식을 판단)
+    fd, tmp = tempfile.mkstemp(prefix=f".{os.path.basename(path)}.", suffix=".tmp" + os.path.splitext(path)[1],
+                               dir=directory)
+    os.close(fd)
+    os.chmod(tmp, 0o644)  # mkstemp 기본 권한(0600) 대신 일반 산출물 권한
+    return tmp
+
+
+class ArtifactStore:
+    """산출물 파일 원자적 쓰기 / 일관된 스냅샷 읽기"""
+
+    def __init__(self, state_dir: str):
+        self.state_dir = state_dir
+        self._db_path = os.path.join(state_dir, "artifacts.sqlite3")
+        self._locks = {}
+        self._locks_guard = threading.Lock()
+        os.makedirs(state_dir, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute(
+                """CREATE TABLE IF NOT EXISTS artifacts (
+                       path TEXT PRIMARY KEY,
+                       seq INTEGER NOT NULL,
+                       updated_at REAL NOT NULL)"""
+            )
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self._db_path, timeout=10)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    @staticmethod
+    def _key(path: str) -> str:
+        return os.path.abspath(path)
+
+    def _seq(self, key: str) -> int:
+        with self._connect() as conn:
+            row = conn.execute("SELECT seq FROM artifacts WHERE path = ?", (key,)).fetchone()
+        return row[0] if row else 0
+
+    def _bump(self, key: str) -> int:
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT INTO artifacts (path, seq, updated_at) VALUES (?, 1, ?) "
+                "ON CONFLICT(path) DO UPDATE SET seq = seq + 1, updated_at = excluded.updated_at",
+                (key, time.time()),
+            )
+            return conn.execute("SELECT seq FROM artifacts WHERE path = ?", (key,)).fetchone()[0]
+
+    @contextmanager
+    def lock(self, path: str):
+        """산출물별 배타 잠금 (재진입 불가)"""
+        key = self._key(path)
+        with self._locks_guard:
+            thread_lock = self._locks.setdefault(key, threading.Lock())
+        with thread_lock:
+            if fcntl is None:
+                yield
+                return
+            lock_name = f"{os.path.basename(key)}.{hashlib.sha1(key.encode()).hexdigest()[:8]}.lock"
+            with open(os.path.join(self.state_dir, lock_name), "a") as lock_file:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+                try:
+                    yield
+                finally:
+                    fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+
+    def version(self, path: str) -> int:
+        """완료된 쓰기 횟수"""
+        return self._seq(self._key(path)) // 2
+
+    def write_file(self, path: str, write: Callable[[str], Optional[bool]]) -> Optional[int]:
+        """
+        write(임시 파일 경로)로 내용을 만든 뒤 원자적으로 교체 (잠금 안에서 실행)
+
+        Returns:
+            새 버전 (write가 False를 반환하면 교체하지 않고 None)
+        """
+        key = self._key(path)
+        with self.lock(path):
+            tmp = _temp_path(path)
+            try:
+                if write(tmp) is False:
+                    return None
+                with open(tmp, "rb") as f:
+                    os.fsync(f.fileno())
+                # 홀수 구간은 교체 순간뿐 (임시 파일 생성이 오래 걸려도 읽는 쪽은 기다리지 않음)
+                seq = self._bump(key)
+                try:
+                    os.replace(tmp, path)
+                finally:
+                    seq = self._bump(key)
+            finally:
+                if os.path.exists(tmp):
+                    os.remove(tmp)
+        return seq // 2
+
+    def write_json(self, path: str, data, indent: int = 2) -> int:
+        def _dump(tmp: str):
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(data, f, ensure_ascii=False, indent=indent)
+
+        return self.write_file(path, _dump)
+
+    def snapshot(self, path: str) -> Tuple[Optional[bytes], int]:
+        """
+        (파일 내용, 버전) - 파일이 없으면 내용은 None
+
+        읽기 전후 시퀀스가 같고 짝수일 때만 반환 (쓰기 중이면 잠시 후 재시도)
+        """
+        key = self._key(path)
+        for _ in range(READ_RETRIES):
+            before = self._seq(key)
+            if before % 2 == 0:
+                data = self._read_bytes(path)
+                if self._seq(key) == before:
+                    return data, before // 2
+            time.sleep(READ_RETRY_SEC)
+
+        # 쓰던 프로세스가 중단돼 시퀀스가 홀수로 남은 경우: 잠금을 잡고 정리
+        with self.lock(path):
+            seq = self._seq(key)
+            if seq % 2 == 1:
+                seq = self._bump(key)
+            return self._read_bytes(path), seq // 2
+
+    def read_json(self, path: str) -> Tuple[Optional[dict], int]:
+        """(JSON 내용, 버전) - 파일이 없으면 (None, 버전)"""
+        data, version = self.snapshot(path)
+        return (json.loads(data) if data is not None else None), version
+
+    @staticmethod
+    def _read_bytes(path: str) -> Optional[bytes]:
+        try:
+            with open(path, "rb") as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
@@ -0,0 +1,88 @@
+"""
+컬러 배분 테이블 (스타일별 컬러 코드 / AI발주량 비중 사전 계산)
+- 분석 결과 로드 시 1회 구축: PART_CD → (컬러 코드 배열, 정규화 비중 배열) 을 연속 배열 + 오프셋으로 보관
+- allocate: 여러 스타일의 추천 수량을 한 번의 벡터 연산으로 배분
+  (컬러별 10단위 올림, 마지막 컬러는 나머지로 보정해 스타일 합계 유지)
+"""
+
+from typing import List, Sequence
+
+import numpy as np
+import pandas as pd
+
+
+class ColorAllocationTable:
+    """스타일별 컬러 비중 테이블"""
+
+    def __init__(self, part_cds: np.ndarray, offsets: np.ndarray, color_cds: np.ndarray,
+                 ratios: np.ndarray, ratio_pcts: list):
+        self.position = {code: i for i, code in enumerate(part_cds)}
+        self.offsets = offsets        # 스타일 i의 컬러 = [offsets[i], offsets[i + 1])
+        self.color_cds = color_cds
+        self.ratios = ratios
+        self.ratio_pcts = ratio_pcts  # 표시용 비중(%) 소수 1자리
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame, part_col: str, color_col: str, weight_col: str) -> 'ColorAllocationTable':
+        """컬러 단위 데이터프레임 → 테이블 (원본 행 순서 유지, PART_CD 없는 행 / 가중치 합계가 0 이하인 스타일 제외)"""
+        if df.empty or weight_col not in df.columns:
+            return cls(np.array([], dtype=object), np.zeros(1, dtype=np.int64),
+                       np.array([], dtype=object), np.array([]), [])
+
+        codes, uniques = pd.factorize(df[part_col])
+        weights = df[weight_col].to_numpy(dtype=float)
+        colors = (df[color_col].astype(str).to_numpy() if color_col in df.columns
+                  else np.full(len(codes), "", dtype=object))
+        # PART_CD가 비어 있는 행(코드 -1)은 어떤 스타일에도 속하지 않으므로 제외
+        known = codes >= 0
+        order = np.argsort(codes[known], kind="stable")
+        codes, weights, colors = codes[known][order], weights[known][order], colors[known][order]
+
+        totals = np.bincount(codes, weights=weights, minlength=len(uniques))
+        keep = (totals > 0)[codes]
+        codes, weights, colors = codes[keep], weights[keep], colors[keep]
+        ratios = weights / totals[codes]
+
+        kept_parts = np.flatnonzero(totals > 0)
+        counts = np.bincount(codes, minlength=len(uniques))[kept_parts]
+        offsets = np.concatenate([[0], np.cumsum(counts)]).astype(np.int64)
+        part_cds = np.array([str(code) for code in uniques[kept_parts]], dtype=object)
+        return cls(part_cds, offsets, colors, ratios, [round(float(r) * 100, 1) for r in ratios])
+
+    def allocate(self, part_cds: Sequence[str], total_qtys: Sequence[int]) -> List[list]:
+        """
+        스타일별 total_qty를 컬러 비중으로 배분 (요청 전체를 한 번에 계산)
+
+        Returns:
+            요청 순서대로 [{"color_cd", "ratio", "qty"}] 목록 (테이블에 없는 스타일은 [])
+        """
+        index = np.array([self.position.get(str(code), -1) for code in part_cds], dtype=np.int64)
+        totals = np.asarray(total_qtys, dtype=float)
+        out = [[] for _ in index]
+        found = np.flatnonzero(index >= 0)
+        if len(found) == 0:
+            return out
+
+        starts = self.offsets[index[found]]
+        counts = self.offsets[index[found] + 1] - starts
+        # 요청별 컬러 구간을 이어 붙인 평탄 인덱스
+        seg_start = np.concatenate([[0], np.cumsum(counts)[:-1]])
+        rows = np.repeat(starts - seg_start, counts) + np.arange(counts.sum())
+        seg = np.repeat(np.arange(len(found)), counts)
+
+        # 마지막 컬러 외: 10단위 올림 / 마지막 컬러: 스타일 합계 - 나머지 컬러 합
+        raw = totals[found][seg] * self.ratios[rows]
+        qty = np.where(raw > 0, np.ceil(raw / 10) * 10, 0)
+        last = seg_start + counts - 1
+        qty[last] = 0
+        qty[last] = totals[found] - np.bincount(seg, weights=qty, minlength=len(found))
+        qty = np.maximum(qty, 0).astype(np.int64)
+
+        colors = self.color_cds[rows]
+        for k, i in enumerate(found):
+            lo, hi = seg_start[k], seg_start[k] + counts[k]
+            out[i] = [
+                {"color_cd": colors[j], "ratio": self.ratio_pcts[rows[j]], "qty": int(qty[j])}
+                for j in range(lo, hi)
+            ]
+        return out
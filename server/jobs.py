@@ -0,0 +1,146 @@
+"""
+로컬 백그라운드 작업 실행기 (프로세스 내 워커 풀 + SQLite 작업 테이블)
+- submit: 작업을 등록하고 작업 ID를 즉시 반환, 실제 처리는 워커 스레드에서 실행
+- 작업 함수는 report(progress, stage, result=None)로 진행률 / 단계 / 중간 결과를 기록
+  (예: 추천 JSON을 먼저 결과로 기록하고 엑셀은 이어서 생성)
+- 상태: queued → running → succeeded / failed
+- 서버 재시작 시 끝나지 않은 작업은 failed로 정리
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+import traceback
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import List, Optional
+
+_UNFINISHED = ("queued", "running")
+
+
+class JobStore:
+    """SQLite 작업 테이블"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with self._connect() as conn:
+            conn.execute(
+                """CREATE TABLE IF NOT EXISTS jobs (
+                       id TEXT PRIMARY KEY,
+                       kind TEXT NOT NULL,
+                       status TEXT NOT NULL,
+                       progress REAL NOT NULL DEFAULT 0,
+                       stage TEXT NOT NULL DEFAULT '',
+                       result TEXT,
+                       error TEXT,
+                       created_at REAL NOT NULL,
+                       updated_at REAL NOT NULL)"""
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_jobs_created ON jobs(created_at)")
+
+    @contextmanager
+    def _connect(self):
+        """커밋 후 닫히는 연결 (워커 스레드 / 요청마다 짧게 사용)"""
+        conn = sqlite3.connect(self.path, timeout=10)
+        conn.row_factory = sqlite3.Row
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def create(self, kind: str) -> str:
+        job_id = uuid.uuid4().hex[:12]
+        now = time.time()
+        with self._lock, self._connect() as conn:
+            conn.execute("INSERT INTO jobs (id, kind, status, created_at, updated_at) VALUES (?, ?, 'queued', ?, ?)",
+                         (job_id, kind, now, now))
+        return job_id
+
+    def update(self, job_id: str, **fields):
+        """status / progress / stage / result(dict) / error 갱신"""
+        if "result" in fields:
+            fields["result"] = json.dumps(fields["result"], ensure_ascii=False)
+        fields["updated_at"] = time.time()
+        columns = ", ".join(f"{name} = ?" for name in fields)
+        with self._lock, self._connect() as conn:
+            conn.execute(f"UPDATE jobs SET {columns} WHERE id = ?", (*fields.values(), job_id))
+
+    def get(self, job_id: str) -> Optional[dict]:
+        with self._connect() as conn:
+            row = conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return self._to_dict(row) if row else None
+
+    def recent(self, limit: int = 20, kind: Optional[str] = None) -> List[dict]:
+        query, params = "SELECT * FROM jobs", []
+        if kind:
+            query, params = query + " WHERE kind = ?", [kind]
+        with self._connect() as conn:
+            rows = conn.execute(query + " ORDER BY created_at DESC LIMIT ?", (*params, limit)).fetchall()
+        return [self._to_dict(row, with_result=False) for row in rows]
+
+    def fail_unfinished(self, reason: str) -> int:
+        with self._lock, self._connect() as conn:
+            cursor = conn.execute(
+                f"UPDATE jobs SET status = 'failed', error = ?, updated_at = ? "
+                f"WHERE status IN ({', '.join('?' * len(_UNFINISHED))})",
+                (reason, time.time(), *_UNFINISHED),
+            )
+        return cursor.rowcount
+
+    @staticmethod
+    def _to_dict(row: sqlite3.Row, with_result: bool = True) -> dict:
+        job = {key: row[key] for key in ("id", "kind", "status", "progress", "stage", "error", "created_at", "updated_at")}
+        job["result_ready"] = row["result"] is not None
+        if with_result:
+            job["result"] = json.loads(row["result"]) if row["result"] else None
+        return job
+
+
+class JobRunner:
+    """워커 풀에서 작업 함수를 실행하고 진행 상황을 JobStore에 기록"""
+
+    def __init__(self, store: JobStore, max_workers: int):
+        self.store = store
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="job")
+        stale = store.fail_unfinished("서버 재시작으로 중단됨")
+        if stale:
+            print(f"[Jobs] 미완료 작업 {stale}건 failed 처리 (서버 재시작)")
+
+    def submit(self, kind: str, fn, *args, **kwargs) -> str:
+        """
+        작업 등록 후 ID 반환
+
+        fn(report, *args, **kwargs) 형태로 호출되며 반환값(dict)이 있으면 최종 결과로 기록
+        """
+        job_id = self.store.create(kind)
+        self._pool.submit(self._run, job_id, kind, fn, args, kwargs)
+        return job_id
+
+    def _run(self, job_id: str, kind: str, fn, args, kwargs):
+        started = time.perf_counter()
+        self.store.update(job_id, status="running", stage="시작")
+
+        def report(progress: float, stage: str, result: Optional[dict] = None):
+            fields = {"progress": round(progress, 3), "stage": stage}
+            if result is not None:
+                fields["result"] = result
+            self.store.update(job_id, **fields)
+
+        try:
+            result = fn(report, *args, **kwargs)
+        except Exception as e:
+            traceback.print_exc()
+            self.store.update(job_id, status="failed", error=f"{type(e).__name__}: {e}")
+            print(f"[Jobs] {kind} {job_id} 실패: {type(e).__name__}: {e}")
+            return
+        fields = {"status": "succeeded", "progress": 1.0, "stage": "완료"}
+        if result is not None:
+            fields["result"] = result
+        self.store.update(job_id, **fields)
+        print(f"[Jobs] {kind} {job_id} 완료 ({time.perf_counter() - started:.1f}s)")
@@ -0,0 +1,96 @@
+"""
+LLM 예산 제안 디스크 캐시 (SQLite)
+- 키: sha256(렌더링된 프롬프트 + 모델명 + temperature) → 같은 마감 데이터 / 같은 모델 설정이면 LLM 재호출 없이 즉시 응답
+- TTL 만료 항목은 조회 시 무시, 저장 시 정리
+- 항목 수 / 총 용량 상한 초과 시 마지막 사용 시각이 오래된 순으로 삭제 (LRU)
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from typing import Optional, Sequence
+
+
+def prompt_fingerprint(prompt: str, models: Sequence[str], temperature: float) -> str:
+    """프롬프트 + 모델명(헤지 호출 순서) + temperature 해시"""
+    payload = json.dumps({"prompt": prompt, "models": list(models), "temperature": temperature},
+                         ensure_ascii=False, sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class ProposalCache:
+    """SQLite 기반 LLM 응답 캐시 (TTL + 항목 수 / 용량 기반 LRU 정리)"""
+
+    def __init__(self, path: str, ttl_sec: float, max_entries: int, max_bytes: int):
+        self.path = path
+        self.ttl_sec = ttl_sec
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with self._connect() as conn:
+            conn.execute(
+                """CREATE TABLE IF NOT EXISTS llm_cache (
+                       key TEXT PRIMARY KEY,
+                       models TEXT NOT NULL,
+                       created_at REAL NOT NULL,
+                       last_used_at REAL NOT NULL,
+                       size INTEGER NOT NULL,
+                       payload TEXT NOT NULL)"""
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_llm_cache_last_used ON llm_cache(last_used_at)")
+
+    @contextmanager
+    def _connect(self):
+        """커밋 후 닫히는 연결 (요청마다 짧게 사용, 스레드 간 공유하지 않음)"""
+        conn = sqlite3.connect(self.path, timeout=5)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def get(self, key: str) -> Optional[dict]:
+        """캐시 조회 (없거나 TTL 만료면 None), 적중 시 마지막 사용 시각 갱신"""
+        now = time.time()
+        with self._lock, self._connect() as conn:
+            row = conn.execute("SELECT created_at, payload FROM llm_cache WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            created_at, payload = row
+            if now - created_at > self.ttl_sec:
+                conn.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+                return None
+            conn.execute("UPDATE llm_cache SET last_used_at = ? WHERE key = ?", (now, key))
+        return json.loads(payload)
+
+    def put(self, key: str, models: Sequence[str], value: dict):
+        """캐시 저장 (같은 키는 교체) 후 만료 / 상한 초과 항목 정리"""
+        payload = json.dumps(value, ensure_ascii=False)
+        now = time.time()
+        with self._lock, self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO llm_cache (key, models, created_at, last_used_at, size, payload) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (key, ",".join(models), now, now, len(payload.encode("utf-8")), payload),
+            )
+            self._evict(conn, now)
+
+    def _evict(self, conn: sqlite3.Connection, now: float):
+        """TTL 만료 삭제 후 항목 수 / 용량 상한 초과분을 오래 사용하지 않은 순으로 삭제"""
+        conn.execute("DELETE FROM llm_cache WHERE created_at < ?", (now - self.ttl_sec,))
+        count, total = conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM llm_cache").fetchone()
+        if count <= self.max_entries and total <= self.max_bytes:
+            return
+        victims = []
+        for key, size in conn.execute("SELECT key, size FROM llm_cache ORDER BY last_used_at"):
+            if count <= self.max_entries and total <= self.max_bytes:
+                break
+            victims.append((key,))
+            count -= 1
+            total -= size
+        conn.executemany("DELETE FROM llm_cache WHERE key = ?", victims)
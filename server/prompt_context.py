@@ -0,0 +1,128 @@
+"""
+예산 제안 프롬프트 컨텍스트 압축
+- season_closing_data.json 전체(json.dumps) 대신 토큰 예산 안의 요약 텍스트를 생성
+- 필수: 시즌 요약, 카테고리(CLASS2)별 지표 표, 등급 / 액션 분포
+- 예산 내 선택: 판매율 상위 / 하위 스타일 샘플(각 SAMPLE_STYLES개 이내), 아이템 표(판매수량 상위부터)
+  → 스타일 수가 늘어도 프롬프트 크기(= LLM 지연 / 비용)는 일정
+"""
+
+from typing import List, Tuple
+
+CONTEXT_TOKEN_BUDGET = 1500   # 컨텍스트 토큰 상한 (추정치)
+SAMPLE_STYLES = 8             # 상위 / 하위 스타일 샘플 최대 개수
+COMMENT_CHARS = 40            # 샘플 코멘트 최대 글자 수
+
+
+def estimate_tokens(text: str) -> int:
+    """토큰 수 추정 (ASCII 약 4자당 1토큰, 한글 등 비ASCII 1자당 1토큰)"""
+    ascii_chars = sum(1 for ch in text if ord(ch) < 128)
+    return (ascii_chars + 3) // 4 + (len(text) - ascii_chars)
+
+
+def _short(text, limit: int = COMMENT_CHARS) -> str:
+    text = " ".join(str(text or "").split())
+    return text if len(text) <= limit else text[:limit - 1] + "…"
+
+
+def _summary_lines(closing_data: dict) -> List[str]:
+    summary = closing_data.get("summary", {})
+    meta = closing_data.get("metadata", {})
+    return [
+        "[시즌 요약]",
+        f"스타일 {meta.get('total_styles', 0)}개, 입고 {summary.get('total_inbound', 0):,}장, "
+        f"판매 {summary.get('total_sales', 0):,}장, 재고 {summary.get('total_stock', 0):,}장, "
+        f"판매율 {summary.get('sell_through_rate', 0)}%, 재고리스크 {summary.get('stock_risk', 0)}%, "
+        f"목표달성 {summary.get('target_achievement', '-')}",
+        f"매출 {summary.get('total_sale_amt', 0):,}원, 입고금액 {summary.get('total_in_amt', 0):,}원",
+        f"진단: {_short(summary.get('ai_comment', ''), 120)}",
+    ]
+
+
+def _class_lines(closing_data: dict) -> List[str]:
+    lines = ["[카테고리별 지표] 카테고리 | 입고 | 판매 | 매출(원) | 평균단가 | 물량비중% | 판매비중% | 판매율% | 비중차이 | 판정"]
+    for cat in closing_data.get("class_analysis", []):
+        lines.append(
+            f"{cat.get('class2', '')} | {cat.get('in_qty', 0):,} | {cat.get('sale_qty', 0):,} | "
+            f"{cat.get('sale_amt', 0):,} | {cat.get('avg_price', 0):,} | {cat.get('volume_share', 0)} | "
+            f"{cat.get('sales_share', 0)} | {cat.get('sell_through_rate', 0)} | {cat.get('balance_delta', 0)} | "
+            f"{cat.get('balance_judgment', '')}"
+        )
+    return lines
+
+
+def _distribution_lines(closing_data: dict) -> List[str]:
+    style_summary = closing_data.get("style_summary", {})
+
+    def _fmt(dist: dict) -> str:
+        return ", ".join(f"{k} {v}" for k, v in dist.items()) or "없음"
+
+    lines = [
+        f"[등급 분포] {_fmt(style_summary.get('grade_distribution', {}))}",
+        f"[액션 분포] {_fmt(style_summary.get('action_distribution', {}))}",
+    ]
+    # 액션별 카테고리 구성 (스타일 목록 대신 건수만)
+    for action, styles in style_summary.get("action_styles", {}).items():
+        if not styles:
+            continue
+        by_class = {}
+        for style in styles:
+            by_class[style.get("class2", "")] = by_class.get(style.get("class2", ""), 0) + 1
+        lines.append(f"- {action}: " + ", ".join(f"{k} {v}" for k, v in sorted(by_class.items(), key=lambda kv: -kv[1])))
+    return lines
+
+
+def _item_lines(closing_data: dict) -> List[str]:
+    items = sorted(closing_data.get("item_analysis", []), key=lambda it: -it.get("sale_qty", 0))
+    return [
+        f"{it.get('class2', '')}/{it.get('item_nm', '')} | 등급 {it.get('grade', '')} | {it.get('bcg_class', '')} | "
+        f"판매율 {it.get('sell_through_rate', 0)}% | 판매 {it.get('sale_qty', 0):,}"
+        for it in items
+    ]
+
+
+def _style_lines(styles: list) -> List[str]:
+    return [
+        f"{s.get('style_cd', '')} ({s.get('class2', '')}/{s.get('item_nm', '')}) 등급 {s.get('grade', '')}, "
+        f"{s.get('action', '')}, 판매율 {s.get('sell_through_rate', 0)}% - {_short(s.get('ai_comment', ''))}"
+        for s in styles[:SAMPLE_STYLES]
+    ]
+
+
+def build_budget_context(closing_data: dict, token_budget: int = CONTEXT_TOKEN_BUDGET) -> Tuple[str, dict]:
+    """
+    토큰 예산 안의 압축 컨텍스트 생성
+
+    Returns:
+        (컨텍스트 텍스트, {'tokens', 'chars', 'items', 'sample_styles', 'truncated'} 통계)
+    """
+    lines = _summary_lines(closing_data) + [""] + _class_lines(closing_data) + [""] + _distribution_lines(closing_data)
+    used = estimate_tokens("\n".join(lines))
+    truncated = False
+    counts = {"items": 0, "sample_styles": 0}
+
+    style_summary = closing_data.get("style_summary", {})
+    optional = [
+        ("sample_styles", "[판매율 상위 스타일]", _style_lines(style_summary.get("top_performers", []))),
+        ("sample_styles", "[판매율 하위 스타일]", _style_lines(style_summary.get("bottom_performers", []))),
+        ("items", "[아이템별 지표 (판매수량 순)]", _item_lines(closing_data)),
+    ]
+    for key, header, section in optional:
+        if not section:
+            continue
+        cost = estimate_tokens("\n\n" + header)
+        if used + cost > token_budget:
+            truncated = True
+            continue
+        lines += ["", header]
+        used += cost
+        for line in section:
+            cost = estimate_tokens("\n" + line)
+            if used + cost > token_budget:
+                truncated = True
+                break
+            lines.append(line)
+            used += cost
+            counts[key] += 1
+
+    context = "\n".join(lines)
+    return context, {"tokens": estimate_tokens(context), "chars": len(context), "truncated": truncated, **counts}
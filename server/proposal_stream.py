@@ -0,0 +1,129 @@
+"""
+예산 제안 스트리밍 (SSE) 보조 모듈
+- ProposalStreamParser: LLM이 토큰 단위로 보내는 JSON 응답을 누적하면서
+  ai_commentary 문자열은 도착한 만큼, category_targets 항목은 객체가 닫히는 즉시 추출
+- sse_event: Server-Sent Events 메시지 직렬화
+"""
+
+import json
+import re
+from typing import List, Tuple
+
+_COMMENTARY_RE = re.compile(r'"ai_commentary"\s*:\s*"')
+_CATEGORIES_RE = re.compile(r'"category_targets"\s*:\s*\[')
+
+
+def sse_event(event: str, data) -> str:
+    """SSE 메시지 1건 (data는 JSON 직렬화)"""
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+class ProposalStreamParser:
+    """부분 JSON 응답에서 코멘터리 증분 / 완성된 카테고리 항목을 추출하는 점진 파서"""
+
+    def __init__(self):
+        self.text = ""
+        self._commentary_start = None   # ai_commentary 문자열 값 시작 위치
+        self._commentary_raw_end = None  # 지금까지 디코딩한 원문 끝 위치
+        self._commentary_done = False
+        self._categories_pos = None     # category_targets 배열에서 다음에 살펴볼 위치
+        self._categories_done = False
+
+    def feed(self, chunk: str) -> Tuple[str, List[dict]]:
+        """
+        응답 조각 추가
+
+        Returns:
+            (새로 확정된 코멘터리 텍스트, 새로 완성된 category_targets 항목 목록)
+        """
+        self.text += chunk
+        return self._commentary_delta(), self._new_categories()
+
+    def _commentary_delta(self) -> str:
+        if self._commentary_done:
+            return ""
+        if self._commentary_start is None:
+            match = _COMMENTARY_RE.search(self.text)
+            if match is None:
+                return ""
+            self._commentary_start = self._commentary_raw_end = match.end()
+
+        # 닫는 따옴표 또는 미완성 이스케이프(\, \uXXXX 일부) 직전까지만 디코딩
+        i, end = self._commentary_raw_end, len(self.text)
+        safe = i
+        while i < end:
+            ch = self.text[i]
+            if ch == '"':
+                self._commentary_done = True
+                safe = i
+                break
+            if ch == "\\":
+                width = 6 if self.text[i + 1:i + 2] == "u" else 2
+                if i + width > end:
+                    break
+                i += width
+            else:
+                i += 1
+            safe = i
+        raw = self.text[self._commentary_raw_end:safe]
+        self._commentary_raw_end = safe
+        return json.loads(f'"{raw}"') if raw else ""
+
+    def _new_categories(self) -> List[dict]:
+        if self._categories_done:
+            return []
+        if self._categories_pos is None:
+            match = _CATEGORIES_RE.search(self.text)
+            if match is None:
+                return []
+            self._categories_pos = match.end()
+
+        found = []
+        while True:
+            start = self._skip_separators(self._categories_pos)
+            if start >= len(self.text):
+                break
+            if self.text[start] == "]":
+                self._categories_done = True
+                break
+            if self.text[start] != "{":
+                # 예상하지 못한 형식 → 증분 추출 중단 (최종 응답 파싱에 맡김)
+                self._categories_done = True
+                break
+            close = self._object_end(start)
+            if close is None:
+                break
+            try:
+                found.append(json.loads(self.text[start:close + 1]))
+            except json.JSONDecodeError:
+                self._categories_done = True
+                break
+            self._categories_pos = close + 1
+        return found
+
+    def _skip_separators(self, pos: int) -> int:
+        while pos < len(self.text) and self.text[pos] in " \t\r\n,":
+            pos += 1
+        return pos
+
+    def _object_end(self, start: int):
+        """start의 '{'에 대응하는 '}' 위치 (문자열 내부 괄호 무시), 아직 닫히지 않았으면 None"""
+        depth, in_string, escaped = 0, False, False
+        for i in range(start, len(self.text)):
+            ch = self.text[i]
+            if in_string:
+                if escaped:
+                    escaped = False
+                elif ch == "\\":
+                    escaped = True
+                elif ch == '"':
+                    in_string = False
+            elif ch == '"':
+                in_string = True
+            elif ch == "{":
+                depth += 1
+            elif ch == "}":
+                depth -= 1
+                if depth == 0:
+                    return i
+        return None
@@ -0,0 +1,14 @@
+// 파이프라인 산출물 JSON 로드
+// 1차: API 서버(/api/artifacts, ETag + 압축) → 재방문 시 브라우저가 If-None-Match로 재검증해 304
+// 2차: API 서버가 없으면(정적 배포 등) public/ 정적 파일
+export async function fetchArtifact(name) {
+  try {
+    const res = await fetch(`/api/artifacts/${name}`);
+    const isJson = (res.headers.get('content-type') || '').includes('application/json');
+    // 정적 배포에서는 /api 경로가 index.html로 응답하므로 JSON일 때만 API 응답으로 사용
+    if (isJson && (res.ok || res.status === 404)) return res;
+  } catch (e) {
+    // API 서버 미실행 → 정적 파일
+  }
+  return fetch(`/${name}`);
+}
@@ -1,5 +1,5 @@
-import React, { useState } from 'react';
-import { Loader2, Check, AlertTriangle, TrendingUp, Info, ArrowRight, X, Sparkles } from 'lucide-react';
+import React, { useRef, useState } from 'react';
+import { Loader2, Check, AlertTriangle, TrendingUp, Info, ArrowRight, X, Sparkles, RefreshCw } from 'lucide-react';
 
 // 금액 포맷 헬퍼
 const formatRevenue = (amt) => {
@@ -10,6 +10,7 @@ const formatRevenue = (amt) => {
 
 const BudgetControl = ({ classAnalysis, summary, season, onClose }) => {
   const [loading, setLoading] = useState(false);
+  const [streaming, setStreaming] = useState(false);
   const [proposal, setProposal] = useState(null);
   const [aiCommentary, setAiCommentary] = useState('');
   const [confirmed, setConfirmed] = useState(false);
@@ -23,17 +24,76 @@ const BudgetControl = ({ classAnalysis, summary, season, onClose }) => {
   // 카테고리별 상태
   const [categories, setCategories] = useState({});
 
+  // 스트리밍 중 잠정안 (재시도 시 실패한 모델이 보낸 증분을 되돌리는 기준)
+  const provisionalRef = useRef(null);
+
   const nextSeason = '26S';
 
-  // AI 예산 제안 요청
-  const requestProposal = async () => {
+  // 제안 결과를 화면 상태로 반영
+  const applyProposal = (data) => {
+    setProposal(data);
+    setAiCommentary(data.ai_commentary || '');
+    setTargetTotalRevenue(data.target_total_revenue || 0);
+    setPrevTotalRevenue(data.prev_total_revenue || 0);
+    setPrevTotalSales(data.prev_total_sales || 0);
+
+    // 카테고리 초기화
+    const cats = {};
+    (data.category_targets || []).forEach(cat => {
+      const inAmt = classAnalysis?.find(c => c.class2 === cat.class2)?.in_amt || 0;
+      cats[cat.class2] = {
+        share: cat.share_pct || 0,
+        targetSTR: cat.prev_sell_through_rate || 50,
+        prevSales: cat.prev_sales || 0,
+        prevRevenue: cat.prev_revenue || 0,
+        avgPrice: cat.avg_price || 0,
+        prevSTR: cat.prev_sell_through_rate || 0,
+        aiTargetRevenue: cat.target_revenue || 0,
+        prevInAmt: inAmt,
+      };
+    });
+    setCategories(cats);
+  };
+
+  // AI 예산 제안 요청 (SSE 스트리밍, forceRefresh: 서버 캐시 무시하고 LLM 재호출)
+  // provisional(룰 기반 잠정안) → commentary / category 증분 → final 순으로 수신
+  const requestProposal = async (forceRefresh = false) => {
     setLoading(true);
     setError(null);
+    let commentary = '';
+    const handleEvent = (event, data) => {
+      if (event === 'provisional') {
+        provisionalRef.current = data;
+        applyProposal(data);
+        setStreaming(true);
+        setLoading(false);
+      } else if (event === 'commentary') {
+        commentary += data.delta;
+        setAiCommentary(commentary);
+      } else if (event === 'retry') {
+        // 다음 모델로 재시도: 실패한 모델의 코멘트 / 카테고리 증분을 버리고 잠정안으로 복원
+        commentary = '';
+        if (provisionalRef.current) applyProposal(provisionalRef.current);
+        setAiCommentary('');
+      } else if (event === 'category') {
+        setCategories(prev => prev[data.class2] ? {
+          ...prev,
+          [data.class2]: {
+            ...prev[data.class2],
+            share: data.share_pct ?? prev[data.class2].share,
+            aiTargetRevenue: data.target_revenue ?? prev[data.class2].aiTargetRevenue,
+          }
+        } : prev);
+      } else if (event === 'final') {
+        applyProposal(data);
+      }
+    };
+
     try {
-      const response = await fetch('/api/budget-proposal', {
+      const response = await fetch('/api/budget-proposal/stream', {
         method: 'POST',
         headers: { 'Content-Type': 'application/json' },
-        body: JSON.stringify({ season })
+        body: JSON.stringify({ season, force_refresh: forceRefresh })
       });
 
       if (!response.ok) {
@@ -41,33 +101,27 @@ const BudgetControl = ({ classAnalysis, summary, season, onClose }) => {
         throw new Error(errData.detail || '예산 제안 요청 실패');
       }
 
-      const data = await response.json();
-      setProposal(data);
-      setAiCommentary(data.ai_commentary || '');
-      setTargetTotalRevenue(data.target_total_revenue || 0);
-      setPrevTotalRevenue(data.prev_total_revenue || 0);
-      setPrevTotalSales(data.prev_total_sales || 0);
-
-      // 카테고리 초기화
-      const cats = {};
-      (data.category_targets || []).forEach(cat => {
-        const inAmt = classAnalysis?.find(c => c.class2 === cat.class2)?.in_amt || 0;
-        cats[cat.class2] = {
-          share: cat.share_pct || 0,
-          targetSTR: cat.prev_sell_through_rate || 50,
-          prevSales: cat.prev_sales || 0,
-          prevRevenue: cat.prev_revenue || 0,
-          avgPrice: cat.avg_price || 0,
-          prevSTR: cat.prev_sell_through_rate || 0,
-          aiTargetRevenue: cat.target_revenue || 0,
-          prevInAmt: inAmt,
-        };
-      });
-      setCategories(cats);
+      const reader = response.body.getReader();
+      const decoder = new TextDecoder();
+      let buffer = '';
+      while (true) {
+        const { value, done } = await reader.read();
+        if (done) break;
+        buffer += decoder.decode(value, { stream: true });
+        let sep;
+        while ((sep = buffer.indexOf('\n\n')) >= 0) {
+          const message = buffer.slice(0, sep);
+          buffer = buffer.slice(sep + 2);
+          const event = message.match(/^event: (.*)$/m)?.[1];
+          const data = message.match(/^data: (.*)$/m)?.[1];
+          if (event && data) handleEvent(event, JSON.parse(data));
+        }
+      }
     } catch (err) {
       setError(err.message);
     } finally {
       setLoading(false);
+      setStreaming(false);
     }
   };
 
@@ -200,7 +254,7 @@ const BudgetControl = ({ classAnalysis, summary, season, onClose }) => {
             </div>
           )}
           <button
-            onClick={requestProposal}
+            onClick={() => requestProposal()}
             disabled={loading}
             className="px-6 py-2.5 bg-violet-600 text-white rounded-lg hover:bg-violet-700 transition-colors font-medium text-sm disabled:opacity-50 disabled:cursor-not-allowed flex items-center gap-2"
           >
@@ -264,7 +318,25 @@ const BudgetControl = ({ classAnalysis, summary, season, onClose }) => {
                 </div>
               </div>
               <div>
-                <h4 className="text-sm font-bold text-gray-800 mb-1">AI Strategy Insight</h4>
+                <div className="flex items-center gap-2 mb-1">
+                  <h4 className="text-sm font-bold text-gray-800">AI Strategy Insight</h4>
+                  {proposal?.cached && (
+                    <span className="text-[11px] text-gray-400">이전 제안 (캐시)</span>
+                  )}
+                  {streaming && (
+                    <span className="text-[11px] text-violet-500 flex items-center gap-1">
+                      <Loader2 size={11} className="animate-spin" /> AI 분석 중 (잠정안 표시)
+                    </span>
+                  )}
+                  <button
+                    onClick={() => requestProposal(true)}
+                    disabled={loading || streaming}
+                    title="캐시를 무시하고 AI 제안 다시 받기"
+                    className="text-gray-400 hover:text-violet-600 disabled:opacity-50"
+                  >
+                    <RefreshCw size={13} />
+                  </button>
+                </div>
                 <p className="text-sm text-gray-600 leading-relaxed text-pretty">
                   {aiCommentary || "AI 코멘터리가 없습니다."}
                 </p>
@@ -445,7 +517,7 @@ const BudgetControl = ({ classAnalysis, summary, season, onClose }) => {
 
           <button
             onClick={confirmBudget}
-            disabled={loading || totalOrderBudgetAmt === 0 || Math.abs(totalShare - 100) > 0.5}
+            disabled={loading || streaming || totalOrderBudgetAmt === 0 || Math.abs(totalShare - 100) > 0.5}
             className="px-8 py-3 bg-gray-900 text-white rounded-xl hover:bg-gray-800 transition-all font-bold text-sm disabled:opacity-50 disabled:cursor-not-allowed flex items-center gap-2 shadow-lg shadow-gray-200 transform hover:-translate-y-0.5"
           >
             {loading ? (
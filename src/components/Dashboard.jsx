@@ -13,6 +13,7 @@ import {
   ReferenceLine
 } from 'recharts';
 import { TrendingUp, AlertTriangle, Package, ShoppingCart, ArrowRight, Loader2, Percent, TrendingDown } from 'lucide-react';
+import { fetchArtifact } from '../artifacts';
 
 // --- 1. 툴팁 컴포넌트 (기회비용 표시 로직 포함) ---
 const CustomTooltip = ({ active, payload, label, isSuccess }) => {
@@ -375,7 +376,7 @@ const App = () => {
     // 실제 데이터 파일 로드
     const loadDashboardData = async () => {
       try {
-        const response = await fetch('./dashboard_data.json'); // Vite public 폴더 기준
+        const response = await fetchArtifact('dashboard_data.json');
         if (!response.ok) {
           throw new Error('데이터 파일을 찾을 수 없습니다.');
         }
@@ -1,5 +1,6 @@
 import React, { useState, useEffect, useMemo } from 'react';
 import { Loader2, AlertTriangle, Package, DollarSign, BarChart2, Filter, Info } from 'lucide-react';
+import { fetchArtifact } from '../artifacts';
 
 const KPICard = ({ label, value, sub, icon: Icon, color }) => (
   <div className="bg-white rounded-xl shadow-sm border border-gray-100 p-5 flex flex-col">
@@ -82,7 +83,7 @@ export default function OrderSuggest() {
 
   useEffect(() => {
     // 1차: 확정 데이터 시도 → 없으면 2차: 맵핑 데이터로 프리뷰
-    fetch('/order_recommendation_data.json')
+    fetchArtifact('order_recommendation_data.json')
       .then(res => {
         if (!res.ok) throw new Error('no confirmed');
         return res.json();
@@ -94,7 +95,7 @@ export default function OrderSuggest() {
       })
       .catch(() => {
         // 확정 데이터 없음 → 맵핑 데이터로 프리뷰
-        fetch('/style_mapping_data.json')
+        fetchArtifact('style_mapping_data.json')
           .then(res => {
             if (!res.ok) throw new Error('style_mapping_data.json이 없습니다. 파이프라인을 먼저 실행하세요.');
             return res.json();
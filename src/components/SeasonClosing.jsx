@@ -17,6 +17,7 @@ import {
 } from 'recharts';
 import { Loader2, AlertTriangle, TrendingUp, TrendingDown, Package, ShoppingCart, Sparkles, DollarSign, HelpCircle, X } from 'lucide-react';
 import BudgetControl from './BudgetControl.jsx';
+import { fetchArtifact } from '../artifacts';
 
 // BCG 색상 매핑
 const BCG_COLORS = {
@@ -126,7 +127,7 @@ const SeasonClosing = () => {
   useEffect(() => {
     const loadData = async () => {
       try {
-        const response = await fetch('./season_closing_data.json');
+        const response = await fetchArtifact('season_closing_data.json');
         if (!response.ok) throw new Error('데이터 파일을 찾을 수 없습니다.');
         const json = await response.json();
         setData(json);
@@ -1,5 +1,6 @@
 import React, { useState, useEffect, useMemo } from 'react';
 import { Loader2, CheckCircle2, AlertTriangle, Filter, Save } from 'lucide-react';
+import { fetchArtifact } from '../artifacts';
 
 export default function StyleMapping() {
   const [data, setData] = useState(null);
@@ -10,10 +11,11 @@ export default function StyleMapping() {
   const [categoryFilter, setCategoryFilter] = useState('all');
   const [saving, setSaving] = useState(false);
   const [saveResult, setSaveResult] = useState(null);
+  const [confirmedCodes, setConfirmedCodes] = useState(new Set()); // 마지막 확정 저장에 포함된 new_part_cd
 
   // 데이터 로딩
   useEffect(() => {
-    fetch('/style_mapping_data.json')
+    fetchArtifact('style_mapping_data.json')
       .then(res => {
         if (!res.ok) throw new Error('style_mapping_data.json을 찾을 수 없습니다. 파이프라인을 먼저 실행하세요.');
         return res.json();
@@ -55,17 +57,63 @@ export default function StyleMapping() {
   const manualEntries = Object.values(manualQty).filter(v => v > 0).length;
   const confirmedCount = matchedSelections + manualEntries;
 
-  // 선택 핸들러
-  const handleSelect = (newPartCd, refPartCd) => {
+  // 확정 저장에 포함된 스타일 1건 PATCH → 변경된 추천 결과 / 메타데이터만 저장 결과에 반영
+  const patchMapping = async (newPartCd, fields) => {
+    try {
+      const res = await fetch(`http://localhost:8000/api/confirmed-mapping/${encodeURIComponent(newPartCd)}`, {
+        method: 'PATCH',
+        headers: { 'Content-Type': 'application/json' },
+        body: JSON.stringify(fields),
+      });
+      if (!res.ok) {
+        const errData = await res.json().catch(() => ({}));
+        throw new Error(errData.detail || `서버 오류 (${res.status})`);
+      }
+      const delta = await res.json();
+      const changed = Object.fromEntries(delta.changed.map(r => [r.new_part_cd, r]));
+      setSaveResult(prev => ({
+        success: true,
+        data: {
+          ...prev.data,
+          ...delta.metadata,
+          version: delta.version,
+          results: (prev.data.results || []).map(r => changed[r.new_part_cd] || r),
+        },
+      }));
+    } catch (err) {
+      setSaveResult({ success: false, message: err.message });
+    }
+  };
+
+  // 선택 핸들러 (확정 저장에 포함된 스타일의 변경은 해당 스타일만 PATCH → 변경분만 재계산,
+  // 확정 맵핑에 없던 스타일은 다시 저장하도록 결과 초기화)
+  const handleSelect = async (newPartCd, refPartCd) => {
     setSelections(prev => ({ ...prev, [newPartCd]: refPartCd }));
-    setSaveResult(null);
+    if (!saveResult?.success || !confirmedCodes.has(newPartCd)) {
+      setSaveResult(null);
+      return;
+    }
+    const style = data.styles.find(s => s.new_part_cd === newPartCd);
+    const ref = style?.references.find(r => r.part_cd === refPartCd);
+    await patchMapping(newPartCd, { selected_ref_part_cd: refPartCd, selected_ref_score: ref ? ref.score : 0 });
   };
 
-  // 수동 발주량 핸들러
+  // 수동 발주량 핸들러 (입력 중에는 값만 보관, 확정된 스타일은 입력을 마칠 때 PATCH)
   const handleManualQty = (newPartCd, value) => {
     const qty = parseInt(value, 10);
     setManualQty(prev => ({ ...prev, [newPartCd]: isNaN(qty) ? 0 : qty }));
-    setSaveResult(null);
+    if (!saveResult?.success || !confirmedCodes.has(newPartCd)) setSaveResult(null);
+  };
+
+  const handleManualQtyCommit = async (newPartCd) => {
+    if (!saveResult?.success || !confirmedCodes.has(newPartCd)) return;
+    const qty = manualQty[newPartCd] || 0;
+    if (qty <= 0) {
+      // 확정 맵핑에서 빠지는 변경 → 전체 다시 저장
+      setSaveResult(null);
+      return;
+    }
+    await patchMapping(newPartCd, { manual_order_qty: qty });
   };
 
   // 확정 저장
@@ -107,8 +155,20 @@ export default function StyleMapping() {
         const errData = await res.json().catch(() => ({}));
         throw new Error(errData.detail || `서버 오류 (${res.status})`);
       }
-      const result = await res.json();
-      setSaveResult({ success: true, data: result });
+      // 백그라운드 작업: 추천 결과가 기록되면 표시 (엑셀은 이어서 생성)
+      const { status_url } = await res.json();
+      while (true) {
+        await new Promise(resolve => setTimeout(resolve, 500));
+        const jobRes = await fetch(`http://localhost:8000${status_url}`);
+        if (!jobRes.ok) throw new Error(`작업 조회 실패 (${jobRes.status})`);
+        const job = await jobRes.json();
+        if (job.status === 'failed') throw new Error(job.error || '추천 계산 실패');
+        if (job.result_ready) {
+          setConfirmedCodes(new Set(mappings.map(m => m.new_part_cd)));
+          setSaveResult({ success: true, data: job.result });
+          break;
+        }
+      }
     } catch (err) {
       setSaveResult({ success: false, message: err.message });
     } finally {
@@ -241,6 +301,7 @@ export default function StyleMapping() {
                         placeholder="수량 입력"
                         value={manualQty[style.new_part_cd] || ''}
                         onChange={e => handleManualQty(style.new_part_cd, e.target.value)}
+                        onBlur={() => handleManualQtyCommit(style.new_part_cd)}
                         className="w-24 text-xs text-right border border-amber-300 rounded px-2 py-1 focus:outline-none focus:ring-2 focus:ring-amber-400 bg-white"
                       />
                     </td>
@@ -0,0 +1,109 @@
+"""산출물 서빙(/api/artifacts) ETag / 압축 / Range 테스트 (실행: python -m pytest test)"""
+
+import json
+import os
+import sys
+
+import pytest
+from fastapi.testclient import TestClient
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from server import api  # noqa: E402
+from server import artifact_serving  # noqa: E402
+
+URL = "/api/artifacts/season_closing_data.json"
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    path = tmp_path / "season_closing_data.json"
+    data = {"summary": {"total_sales": 1}, "class_analysis": [{"class2": f"C{i}", "sale_amt": i} for i in range(200)]}
+    path.write_text(json.dumps(data, ensure_ascii=False), encoding="utf-8")
+    monkeypatch.setattr(api, "SEASON_CLOSING_PATH", str(path))
+    monkeypatch.setattr(api, "ARTIFACT_STATE_DIR", str(tmp_path / "artifact_state"))
+    monkeypatch.setattr(api, "_artifact_cache", artifact_serving.ArtifactCache())
+    api._artifact_store.cache_clear()
+    yield TestClient(api.app), path.read_bytes()
+    api._artifact_store.cache_clear()
+
+
+def _get(client, **headers):
+    return client.get(URL, headers={"Accept-Encoding": "identity", **headers})
+
+
+def test_full_response_and_304_on_matching_etag(client):
+    client, body = client
+    res = _get(client)
+    assert res.status_code == 200
+    assert res.content == body
+    assert res.headers["cache-control"] == "no-cache"
+
+    etag = res.headers["etag"]
+    assert _get(client, **{"If-None-Match": etag}).status_code == 304
+    assert _get(client, **{"If-None-Match": f'"other", W/{etag}'}).status_code == 304
+    assert _get(client, **{"If-None-Match": '"other"'}).status_code == 200
+
+
+def test_each_encoding_has_its_own_etag(client):
+    client, body = client
+    identity = _get(client)
+    gzipped = _get(client, **{"Accept-Encoding": "gzip"})
+
+    assert gzipped.headers["content-encoding"] == "gzip"
+    assert gzipped.content == body  # 클라이언트가 압축 해제
+    assert gzipped.headers["etag"] != identity.headers["etag"]
+    assert "Accept-Encoding" in gzipped.headers["vary"]
+    # q=0은 거부
+    assert "content-encoding" not in _get(client, **{"Accept-Encoding": "gzip;q=0"}).headers
+
+    etags = {identity.headers["etag"], gzipped.headers["etag"]}
+    if artifact_serving.brotli is not None:
+        br = client.get(URL, headers={"Accept-Encoding": "br, gzip"})
+        assert br.headers["content-encoding"] == "br"
+        etags.add(br.headers["etag"])
+    assert len(etags) == (3 if artifact_serving.brotli is not None else 2)
+
+
+@pytest.mark.parametrize("spec, first, last", [
+    ("bytes=0-99", 0, 99),
+    ("bytes=-100", None, None),
+    ("bytes=100-", 100, None),
+])
+def test_range_requests(client, spec, first, last):
+    client, body = client
+    size = len(body)
+    first = size - 100 if first is None else first
+    last = size - 1 if last is None else last
+
+    res = _get(client, Range=spec)
+    assert res.status_code == 206
+    assert res.content == body[first:last + 1]
+    assert res.headers["content-range"] == f"bytes {first}-{last}/{size}"
+
+
+def test_range_past_eof_is_416(client):
+    client, body = client
+    res = _get(client, Range=f"bytes={len(body)}-")
+    assert res.status_code == 416
+    assert res.headers["content-range"] == f"bytes */{len(body)}"
+
+
+def test_if_range_mismatch_returns_full_body(client):
+    client, body = client
+    etag = _get(client).headers["etag"]
+
+    assert _get(client, Range="bytes=0-9", **{"If-Range": etag}).status_code == 206
+    res = _get(client, Range="bytes=0-9", **{"If-Range": '"stale"'})
+    assert res.status_code == 200
+    assert res.content == body
+
+
+def test_changed_file_gets_new_etag(client):
+    client, body = client
+    etag = _get(client).headers["etag"]
+    api._artifact_store().write_json(api.SEASON_CLOSING_PATH, {"summary": {}})
+
+    res = _get(client, **{"If-None-Match": etag})
+    assert res.status_code == 200
+    assert res.headers["etag"] != etag
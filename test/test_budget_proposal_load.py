@@ -0,0 +1,64 @@
+"""
+예산 제안 비동기 호출 부하 테스트 (실행: python -m pytest test)
+- 느린 LLM(스텁) 호출이 동시에 몰려도 이벤트 루프가 막히지 않고 (/api/health 즉시 응답)
+  LLM_MAX_CONCURRENCY 단위로 나뉘어 처리되는지 확인
+"""
+
+import asyncio
+import json
+import os
+import sys
+
+import httpx
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from server import api  # noqa: E402
+
+LLM_DELAY_SEC = 0.5
+REQUESTS = 8
+
+CLOSING_DATA = {
+    "summary": {"total_sale_amt": 1_000_000_000, "total_sales": 20_000},
+    "class_analysis": [{"class2": "자켓", "sale_amt": 1_000_000_000, "avg_price": 50_000, "in_amt": 0}],
+}
+
+
+def test_slow_llm_does_not_block_event_loop(tmp_path, monkeypatch):
+    closing_path = tmp_path / "season_closing_data.json"
+    closing_path.write_text(json.dumps(CLOSING_DATA, ensure_ascii=False), encoding="utf-8")
+    monkeypatch.setattr(api, "SEASON_CLOSING_PATH", str(closing_path))
+    monkeypatch.setattr(api, "LLM_CACHE_PATH", str(tmp_path / "llm_cache.sqlite3"))
+    monkeypatch.setenv("OPENAI_API_KEY", "sk-test")
+    monkeypatch.delenv("ANTHROPIC_API_KEY", raising=False)
+
+    async def slow_openai(prompt, api_key):
+        await asyncio.sleep(LLM_DELAY_SEC)
+        return '{"ai_commentary": "stub", "target_total_revenue": 1, "category_targets": []}'
+
+    monkeypatch.setattr(api, "_call_openai", slow_openai)
+
+    async def run():
+        # 세마포어는 실행 중인 이벤트 루프에 묶이므로 테스트 루프에서 새로 생성
+        monkeypatch.setattr(api, "_llm_slots", asyncio.Semaphore(api.LLM_MAX_CONCURRENCY))
+        loop = asyncio.get_running_loop()
+        transport = httpx.ASGITransport(app=api.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            started = loop.time()
+            proposals = [asyncio.create_task(client.post("/api/budget-proposal", json={"force_refresh": True}))
+                         for _ in range(REQUESTS)]
+            await asyncio.sleep(0.05)
+            health = []
+            for _ in range(10):
+                t = loop.time()
+                res = await client.get("/api/health")
+                health.append((res.status_code, loop.time() - t))
+            responses = await asyncio.gather(*proposals)
+            return health, responses, loop.time() - started
+
+    health, responses, elapsed = asyncio.run(run())
+
+    assert all(status == 200 and latency < 0.2 for status, latency in health)
+    assert [res.json()["ai_commentary"] for res in responses] == ["stub"] * REQUESTS
+    waves = -(-REQUESTS // api.LLM_MAX_CONCURRENCY)
+    assert waves * LLM_DELAY_SEC <= elapsed < (waves + 1) * LLM_DELAY_SEC
@@ -0,0 +1,93 @@
+"""ColorAllocationTable 동등성 테스트: 기존 스타일별 반복 배분(_get_color_breakdown)과 결과 비교 (실행: python -m pytest test)"""
+
+import math
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from server.color_allocation import ColorAllocationTable  # noqa: E402
+
+PART, COLOR, WEIGHT = "PART_CD", "COLOR_CD", "AI제안 발주량"
+
+
+def _ceil_10(x):
+    if x is None or x != x or x <= 0:
+        return 0
+    return int(math.ceil(x / 10) * 10)
+
+
+def _reference_breakdown(ref_part_cd, color_df, total_qty):
+    """벡터화 이전 server/api.py의 _get_color_breakdown"""
+    rows = color_df[color_df[PART] == ref_part_cd]
+    if rows.empty or WEIGHT not in rows.columns:
+        return []
+    color_orders = [{"color_cd": str(r.get(COLOR, "")), "ai_order": float(r.get(WEIGHT, 0))}
+                    for _, r in rows.iterrows()]
+    total_ai = sum(c["ai_order"] for c in color_orders)
+    if total_ai <= 0:
+        return []
+    colors, distributed = [], 0
+    for i, c in enumerate(color_orders):
+        ratio = c["ai_order"] / total_ai
+        if i == len(color_orders) - 1:
+            qty = total_qty - distributed
+        else:
+            qty = _ceil_10(total_qty * ratio)
+            distributed += qty
+        colors.append({"color_cd": c["color_cd"], "ratio": round(ratio * 100, 1), "qty": max(qty, 0)})
+    return colors
+
+
+def _assert_equivalent(df, part_cds, total_qtys):
+    table = ColorAllocationTable.from_frame(df, PART, COLOR, WEIGHT)
+    expected = [_reference_breakdown(code, df, qty) for code, qty in zip(part_cds, total_qtys)]
+    assert table.allocate(part_cds, total_qtys) == expected
+
+
+def test_edge_cases():
+    df = pd.DataFrame({
+        PART:   ["A", "A", None, "B", "C", "C", "D", "D", "E", "", "A", "F"],
+        COLOR:  ["BK", "WH", "RD", "NV", "GR", "BE", "BK", "WH", "BK", "XX", "NV", "BK"],
+        WEIGHT: [30.0, 70.0, 50.0, 120.0, 0.0, 0.0, -10.0, 25.0, -5.0, 40.0, 0.0, 10.0],
+    })
+    # A: 3컬러(비중 0 포함) / B: 단일 컬러 / C: 가중치 합 0 / D: 음수 비중 포함 / E: 합계 음수
+    # None PART_CD 행 / 빈 문자열 스타일 / 테이블에 없는 ref / 추천 수량 0
+    _assert_equivalent(df, ["A", "B", "C", "D", "E", "", "ZZ", "A", "F", "B"],
+                       [1005, 333, 100, 95, 50, 70, 40, 0, 0, 7])
+
+
+def test_blank_part_cd_rows_only():
+    df = pd.DataFrame({PART: [None, np.nan], COLOR: ["BK", "WH"], WEIGHT: [1.0, 2.0]})
+    _assert_equivalent(df, ["A"], [100])
+
+
+def test_missing_weight_column_and_empty_frame():
+    df = pd.DataFrame({PART: ["A"], COLOR: ["BK"]})
+    _assert_equivalent(df, ["A"], [100])
+    _assert_equivalent(pd.DataFrame(columns=[PART, COLOR, WEIGHT]), ["A"], [100])
+
+
+def test_missing_color_column():
+    df = pd.DataFrame({PART: ["A", "A"], WEIGHT: [1.0, 3.0]})
+    _assert_equivalent(df, ["A"], [100])
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_random_frames(seed):
+    rng = np.random.default_rng(seed)
+    n = 400
+    parts = rng.choice([f"P{i:03d}" for i in range(60)] + [None], size=n)
+    df = pd.DataFrame({
+        PART: parts,
+        COLOR: rng.choice(["BK", "WH", "NV", "RD", "GR"], size=n),
+        # 정수 가중치 → 합계 순서와 무관하게 비중이 같은 부동소수점 값
+        WEIGHT: rng.integers(-20, 200, size=n).astype(float) * (rng.random(n) > 0.1),
+    })
+    refs = list(rng.choice([f"P{i:03d}" for i in range(70)], size=80))
+    qtys = list(rng.integers(0, 3000, size=80))
+    _assert_equivalent(df, refs, qtys)
@@ -0,0 +1,32 @@
+"""demand_forecasters 공통 후처리 회귀 테스트 (실행: python -m pytest test)"""
+
+import os
+import sys
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "scripts"))
+
+from demand_forecasters import WeeklyPanel, finalize_predictions, opportunity_loss  # noqa: E402
+
+
+def _panel(sales, dates):
+    return WeeklyPanel(np.array([sales], dtype=float), np.array([dates], dtype="datetime64[ns]"),
+                       np.array([len(sales)]))
+
+
+def test_return_after_cutoff_is_not_loss():
+    # 시즌 마감(2025-10-30) 이후 주차의 반품(-3)은 기회비용에 포함되지 않아야 함
+    panel = _panel([10, 4, -3], ["2025-10-16", "2025-10-23", "2025-11-06"])
+    predicted = finalize_predictions(np.array([[12.0, 8.0, 6.0]]), panel)
+
+    assert predicted.tolist() == [[12, 8, 0]]
+    assert opportunity_loss(panel, predicted).tolist() == [[2, 4, 0]]
+
+
+def test_no_prediction_and_pre_cutoff_return():
+    # 예측 없는 칸은 0, 마감 전 반품은 기존처럼 예측 - 실판매
+    panel = _panel([5, -2, 3], ["2025-09-04", "2025-09-11", "2025-09-18"])
+    predicted = finalize_predictions(np.array([[np.nan, 6.0, 2.0]]), panel)
+
+    assert opportunity_loss(panel, predicted).tolist() == [[0, 8, 0]]
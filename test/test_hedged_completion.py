@@ -0,0 +1,81 @@
+"""헤지 LLM 호출(_hedged_completion) 회귀 테스트 (실행: python -m pytest test)"""
+
+import asyncio
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from server import api  # noqa: E402
+
+
+def _provider(delay, text=None, exc=None, calls=None, name=None):
+    async def call(prompt):
+        if calls is not None:
+            calls.append(name)
+        await asyncio.sleep(delay)
+        if exc is not None:
+            raise exc
+        return text
+    return call
+
+
+def _run(providers, hedge_delay=0.2, deadline=2.0):
+    async def run():
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        result = await api._hedged_completion("p", providers, api._parse_llm_response,
+                                              hedge_delay=hedge_delay, deadline=deadline)
+        return result, loop.time() - started
+    return asyncio.run(run())
+
+
+def test_fast_primary_does_not_hedge():
+    calls = []
+    result, _ = _run([("A", _provider(0.01, '{"m": "A"}', calls=calls, name="A")),
+                      ("B", _provider(0.01, '{"m": "B"}', calls=calls, name="B"))])
+    assert result == {"m": "A"}
+    assert calls == ["A"]
+
+
+def test_slow_primary_is_hedged():
+    result, elapsed = _run([("A", _provider(1.5, '{"m": "A"}')), ("B", _provider(0.05, '{"m": "B"}'))])
+    assert result == {"m": "B"}
+    assert elapsed < 1.0
+
+
+def test_failing_primary_launches_next_without_waiting():
+    result, elapsed = _run([("A", _provider(0.01, exc=RuntimeError("boom"))), ("B", _provider(0.01, '{"m": "B"}'))],
+                           hedge_delay=5.0)
+    assert result == {"m": "B"}
+    assert elapsed < 1.0
+
+
+def test_invalid_json_falls_through_to_next_provider():
+    result, elapsed = _run([("A", _provider(0.01, "not json")), ("B", _provider(0.01, '```json\n{"m": "B"}\n```'))],
+                           hedge_delay=5.0)
+    assert result == {"m": "B"}
+    assert elapsed < 1.0
+
+
+def test_hedged_call_still_accepts_primary_if_it_finishes_first():
+    # 헤지 이후에도 먼저 끝난 유효 응답을 채택
+    result, _ = _run([("A", _provider(0.3, '{"m": "A"}')), ("B", _provider(1.5, '{"m": "B"}'))], hedge_delay=0.1)
+    assert result == {"m": "A"}
+
+
+def test_deadline_returns_none():
+    result, elapsed = _run([("A", _provider(5, '{"m": "A"}')), ("B", _provider(5, '{"m": "B"}'))],
+                           hedge_delay=0.1, deadline=0.4)
+    assert result is None
+    assert elapsed < 1.0
+
+
+def test_all_providers_fail_returns_none():
+    result, _ = _run([("A", _provider(0.01, "x")), ("B", _provider(0.01, exc=ValueError("y")))])
+    assert result is None
+
+
+def test_no_providers_returns_none():
+    result, _ = _run([])
+    assert result is None
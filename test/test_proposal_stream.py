@@ -0,0 +1,117 @@
+"""예산 제안 스트리밍 회귀 테스트: 점진 파서 / 제공자 전환 시 retry 이벤트 (실행: python -m pytest test)"""
+
+import asyncio
+import json
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from server import api  # noqa: E402
+from server.proposal_stream import ProposalStreamParser  # noqa: E402
+
+PROPOSAL = {
+    "ai_commentary": '줄바꿈\n따옴표 "인용" 역슬래시 \\ 유니코드 é☃ {괄호} [배열]',
+    "target_total_revenue": 1000,
+    "category_targets": [
+        {"class2": "자켓 {A}", "share_pct": 40.0, "target_revenue": 400},
+        {"class2": '팬츠 "}"', "share_pct": 60.0, "target_revenue": 600},
+    ],
+}
+
+
+def _feed_all(parser, chunks):
+    commentary, categories = "", []
+    for chunk in chunks:
+        delta, found = parser.feed(chunk)
+        commentary += delta
+        categories.extend(found)
+    return commentary, categories
+
+
+@pytest.mark.parametrize("ensure_ascii", [False, True])
+def test_char_by_char_split_escapes(ensure_ascii):
+    # 1글자씩 보내면 \n, \", \\, \uXXXX 이스케이프가 모든 위치에서 조각 경계에 걸림
+    text = json.dumps(PROPOSAL, ensure_ascii=ensure_ascii)
+    commentary, categories = _feed_all(ProposalStreamParser(), list(text))
+
+    assert commentary == PROPOSAL["ai_commentary"]
+    assert categories == PROPOSAL["category_targets"]
+
+
+def test_unicode_escape_split_inside_digits():
+    parser = ProposalStreamParser()
+    assert parser.feed('{"ai_commentary": "a\\u00') == ("a", [])
+    assert parser.feed('e9b"') == ("éb", [])
+
+
+def test_categories_emitted_when_object_closes():
+    parser = ProposalStreamParser()
+    assert parser.feed('{"category_targets": [{"class2": "}{", "share_pct": 1') == ("", [])
+    assert parser.feed('}, {"class2"') == ("", [{"class2": "}{", "share_pct": 1}])
+    assert parser.feed(': "B"}]}') == ("", [{"class2": "B"}])
+
+
+def test_invalid_category_stops_incremental_extraction():
+    # 잘못된 JSON 객체 → 이후 항목은 증분으로 내보내지 않고 최종 파싱에 맡김
+    parser = ProposalStreamParser()
+    _, categories = _feed_all(parser, ['{"category_targets": [{"class2": x}, ', '{"class2": "B"}]}'])
+    assert categories == []
+
+
+def test_non_object_items_stop_extraction():
+    parser = ProposalStreamParser()
+    assert parser.feed('{"category_targets": [1, {"class2": "B"}]}') == ("", [])
+
+
+def _stream(chunks, exc=None):
+    async def stream(prompt):
+        for chunk in chunks:
+            await asyncio.sleep(0)
+            yield chunk
+        if exc is not None:
+            raise exc
+    return stream
+
+
+def _collect(providers, deadline=5):
+    async def run():
+        return [event async for event in
+                api._streamed_completion("p", providers, api._parse_llm_response, deadline=deadline)]
+    return asyncio.run(run())
+
+
+def test_failover_emits_retry_then_final():
+    good = json.dumps(PROPOSAL, ensure_ascii=False)
+    providers = [
+        ("A", 5, _stream(['{"ai_commentary": "부분', ' 응답"'], exc=RuntimeError("boom"))),
+        ("B", 5, _stream([good[:20], good[20:]])),
+    ]
+    events = _collect(providers)
+    names = [name for name, _ in events]
+
+    assert names.index("retry") < names.index("final") == len(names) - 1
+    assert events[names.index("retry")][1] == {"model": "A", "error": "RuntimeError"}
+    after_retry = [data for name, data in events[names.index("retry") + 1:] if name == "category"]
+    assert after_retry == PROPOSAL["category_targets"]
+    assert events[-1][1] == PROPOSAL
+
+
+def test_invalid_json_response_triggers_retry():
+    providers = [("A", 5, _stream(["not json"])), ("B", 5, _stream(['{"ai_commentary": "ok"}']))]
+    events = _collect(providers)
+
+    assert [name for name, _ in events] == ["retry", "commentary", "final"]
+    assert events[-1][1] == {"ai_commentary": "ok"}
+
+
+def test_all_providers_fail_without_final():
+    async def hang(prompt):
+        await asyncio.sleep(10)
+        yield "{}"
+
+    events = _collect([("A", 0.05, hang), ("B", 5, _stream([], exc=ValueError("x")))])
+    assert events == [("retry", {"model": "A", "error": "TimeoutError"}),
+                      ("retry", {"model": "B", "error": "ValueError"})]